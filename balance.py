@@ -0,0 +1,252 @@
+# Barrido de balance: corre partidas sin ventana para cada combinacion de
+# variantes de estadisticas y disposiciones de torretas, repartidas en un
+# pool de procesos (un proceso por nucleo), y resume por combinacion la tasa
+# de victoria, las fugas por oleada, el dinero al inicio de cada oleada y el
+# tiempo hasta la derrota.
+#
+# Uso:
+#   python balance.py sweep.json --output balance.json
+#
+# sweep.json:
+#   {
+#     "turrets": {"shortbow.damage": [0.9, 1.0, 1.1], "mortar.2.cooldown": [0.8, 1.0]},
+#     "enemies": {"troll.health": [1.0, 1.25]},
+#     "waves": {"interval": [25, 30], "growth.goblin.every": [1, 2]},
+#     "layouts": ["layout_a.json", [{"type": "mortar", "tile": [9, 8]}]],
+#     "samples": 8,
+#     "jitter": 0.05
+#   }
+#
+# En "turrets" y "enemies" los valores son factores sobre TURRET_DATA y
+# ENEMY_DATA ("tipo.estadistica" escala todos los niveles, "tipo.N.estadistica"
+# solo el nivel N). En "waves" son valores absolutos de WAVE_DATA. Se prueba el
+# producto cartesiano de todas las listas.
+#
+# La simulacion es determinista: con "jitter" cada muestra escala la vida y la
+# velocidad de los enemigos por un factor al azar en [1 - jitter, 1 + jitter]
+# (semilla = numero de muestra, asi el barrido es repetible).
+
+# Modulos de python.
+import os
+import sys
+import copy
+import json
+import random
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Sin video ni audio: se configura antes de importar pygame.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Modulos custom.
+from utils import constants as c
+from data.turret_data import TURRET_DATA
+from data.enemy_data import ENEMY_DATA
+from data.wave_data import WAVE_DATA
+from classes.level import load_level_data
+from classes.simulation import create_headless_simulation
+
+# Copia intacta de TURRET_DATA: cada tarea parte de ella (Turret lee el
+# diccionario del modulo, que se modifica solo dentro del proceso trabajador).
+BASE_TURRET_DATA = copy.deepcopy(TURRET_DATA)
+
+def scale_value(value, factor):
+    # Escala un valor conservando los enteros.
+    if isinstance(value, int):
+        return int(round(value * factor))
+    return value * factor
+
+def apply_turret_scales(scales: dict) -> None:
+    # Restaura TURRET_DATA y aplica los factores "tipo[.nivel].estadistica".
+    for name, levels in BASE_TURRET_DATA.items():
+        TURRET_DATA[name] = copy.deepcopy(levels)
+    for key, factor in scales.items():
+        parts = key.split(".")
+        levels = TURRET_DATA[parts[0]]
+        targets = levels if len(parts) == 2 else [levels[int(parts[1]) - 1]]
+        for data in targets:
+            if parts[-1] in data:
+                data[parts[-1]] = scale_value(data[parts[-1]], factor)
+
+def build_enemy_data(scales: dict, jitter: float, rng: random.Random) -> dict:
+    # ENEMY_DATA con los factores "tipo.estadistica" y el ruido de la muestra.
+    enemy_data = copy.deepcopy(ENEMY_DATA)
+    for key, factor in scales.items():
+        name, stat = key.split(".")
+        enemy_data[name][stat] = scale_value(enemy_data[name][stat], factor)
+    if jitter:
+        for data in enemy_data.values():
+            for stat in ("health", "speed"):
+                data[stat] = scale_value(data[stat], rng.uniform(1 - jitter, 1 + jitter))
+    return enemy_data
+
+def build_wave_data(overrides: dict) -> dict:
+    # WAVE_DATA con valores absolutos en rutas con puntos ("growth.troll.every").
+    wave_data = copy.deepcopy(WAVE_DATA)
+    for key, value in overrides.items():
+        parts = key.split(".")
+        node = wave_data
+        for part in parts[:-1]:
+            node = node[int(part)] if isinstance(node, list) else node[part]
+        node[parts[-1]] = value
+    return wave_data
+
+# Niveles ya cargados en el proceso trabajador. Se cargan antes de escalar
+# TURRET_DATA: la cobertura de rangos escalados se calcula al pedirla.
+worker_levels = {}
+
+def run_match(task: dict) -> dict:
+    # Corre una partida y sigue oleada a oleada las fugas y el dinero.
+    level_data = worker_levels.get(task["level"])
+    if level_data is None:
+        level_data = worker_levels[task["level"]] = load_level_data(task["level"])
+    apply_turret_scales(task["turrets"])
+    rng = random.Random(task["sample"])
+    sim = create_headless_simulation(task["level"], task["layout"],
+                                     level_data=level_data,
+                                     enemy_data=build_enemy_data(task["enemies"], task["jitter"], rng),
+                                     wave_data=build_wave_data(task["waves"]),
+                                     game_duration=task["duration"],
+                                     start_money=task["money"])
+    sim.start()
+    leaks = []       # fugas durante cada oleada
+    money_curve = [] # dinero al empezar cada oleada
+    wave = 0
+    health = sim.base_health
+    max_time = task["duration"] * 2000.0 # corta partidas que no terminan
+    while not sim.finished and sim.time < max_time:
+        sim.step(task["dt"])
+        if sim.wave_manager.wave_number != wave:
+            wave = sim.wave_manager.wave_number
+            leaks.append(0)
+            money_curve.append(sim.money)
+        if sim.base_health < health:
+            if leaks:
+                leaks[-1] += health - sim.base_health
+            health = sim.base_health
+    if not sim.finished:
+        sim.finish()
+    return {
+        "variant": task["variant"],
+        "layout": task["layout_index"],
+        "victory": sim.victory,
+        "leaks_per_wave": leaks,
+        "money_curve": money_curve,
+        "time_to_defeat": sim.time / 1000.0 if sim.game_over else None,
+        "waves_completed": sim.stats["waves_completed"],
+        "enemies_killed": sim.stats["enemies_killed"]
+    }
+
+def mean_by_index(series: list) -> list:
+    # Promedio posicion a posicion de listas de distinto largo.
+    length = max((len(s) for s in series), default=0)
+    means = []
+    for i in range(length):
+        values = [s[i] for s in series if len(s) > i]
+        means.append(sum(values) / len(values))
+    return means
+
+def aggregate(matches: list) -> dict:
+    # Resumen de las muestras de una combinacion.
+    defeats = [m["time_to_defeat"] for m in matches if m["time_to_defeat"] is not None]
+    return {
+        "matches": len(matches),
+        "win_rate": sum(m["victory"] for m in matches) / len(matches),
+        "leaks_per_wave": mean_by_index([m["leaks_per_wave"] for m in matches]),
+        "money_curve": mean_by_index([m["money_curve"] for m in matches]),
+        "time_to_defeat": {
+            "mean": sum(defeats) / len(defeats) if defeats else None,
+            "min": min(defeats, default=None),
+            "max": max(defeats, default=None)
+        },
+        "waves_completed": sum(m["waves_completed"] for m in matches) / len(matches),
+        "enemies_killed": sum(m["enemies_killed"] for m in matches) / len(matches)
+    }
+
+def expand_grid(section: dict) -> list:
+    # Producto cartesiano de {"clave": [valores]} como lista de dicts.
+    keys = list(section)
+    return [dict(zip(keys, values))
+            for values in itertools.product(*(section[key] for key in keys))]
+
+def load_layouts(entries: list) -> list:
+    # Cada disposicion es una lista de torretas o la ruta de un JSON con ella.
+    layouts = []
+    for entry in entries or [[]]:
+        if isinstance(entry, str):
+            with open(entry, 'r') as file:
+                entry = json.load(file)
+        layouts.append(entry)
+    return layouts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Barrido de balance de Pomodoro TD.")
+    parser.add_argument("sweep", help="Archivo JSON con las variantes y disposiciones.")
+    parser.add_argument("--level", default="level1")
+    parser.add_argument("--samples", type=int, default=None,
+                        help="Muestras por combinacion (por defecto la del archivo o 1).")
+    parser.add_argument("--jitter", type=float, default=None,
+                        help="Ruido relativo de vida y velocidad de enemigos por muestra.")
+    parser.add_argument("--dt", type=float, default=c.SIM_STEP, help="Paso de simulacion (s).")
+    parser.add_argument("--duration", type=int, default=300, help="Duracion de la partida (s).")
+    parser.add_argument("--money", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos del pool (por defecto uno por nucleo).")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados.")
+    args = parser.parse_args()
+
+    with open(args.sweep, 'r') as file:
+        sweep = json.load(file)
+    samples = args.samples if args.samples is not None else sweep.get("samples", 1)
+    jitter = args.jitter if args.jitter is not None else sweep.get("jitter", 0.0)
+    layouts = load_layouts(sweep.get("layouts"))
+    variants = [{"turrets": t, "enemies": e, "waves": w}
+                for t in expand_grid(sweep.get("turrets", {}))
+                for e in expand_grid(sweep.get("enemies", {}))
+                for w in expand_grid(sweep.get("waves", {}))]
+
+    tasks = [dict(variant, variant=v, layout=layout, layout_index=l, sample=s,
+                  jitter=jitter, level=args.level, dt=args.dt,
+                  duration=args.duration, money=args.money)
+             for v, variant in enumerate(variants)
+             for l, layout in enumerate(layouts)
+             for s in range(samples)]
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"{len(tasks)} partidas ({len(variants)} variantes x {len(layouts)} "
+          f"disposiciones x {samples} muestras) en {workers} procesos", file=sys.stderr)
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Lotes grandes: cada partida dura poco y el envio entre procesos pesa.
+        chunksize = max(1, len(tasks) // (workers * 4))
+        matches = list(pool.map(run_match, tasks, chunksize=chunksize))
+    wall = time.perf_counter() - t0
+
+    results = []
+    for v, variant in enumerate(variants):
+        for l in range(len(layouts)):
+            group = [m for m in matches if m["variant"] == v and m["layout"] == l]
+            results.append(dict(variant, layout=l, **aggregate(group)))
+    results.sort(key=lambda r: (-r["win_rate"], sum(r["leaks_per_wave"])))
+
+    report = {
+        "config": {"level": args.level, "samples": samples, "jitter": jitter,
+                   "dt": args.dt, "duration": args.duration, "money": args.money,
+                   "workers": workers},
+        "matches": len(matches),
+        "wall_time": wall,
+        "results": results
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+
+if __name__ == "__main__":
+    main()
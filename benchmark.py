@@ -0,0 +1,206 @@
+# Benchmarks de la simulacion sin ventana ni audio. Cada escenario llena la
+# ruta con N enemigos y coloca M torretas de cada tipo de TURRET_DATA junto
+# al camino, y mide ticks por segundo, latencia por tick (p50/p95/p99),
+# tiempo por fase (movimiento, torretas, proyectiles/area) y memoria pico.
+#
+# Uso:
+#   python benchmark.py --output bench.json
+#   python benchmark.py --scenarios 100x10 1000x50 --baseline bench.json
+#
+# Con --baseline se compara contra un reporte anterior y el proceso termina
+# con codigo 1 si algun escenario empeora mas que --tolerance. Si el reporte
+# anterior se midio con otra configuracion (nivel, ticks, dt o EnemyStore) no
+# se compara y el proceso termina con codigo 2.
+
+# Modulos de python.
+import os
+import sys
+import json
+import argparse
+import time
+import tracemalloc
+
+# Sin video ni audio: se configura antes de importar pygame.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Modulos custom.
+from utils import constants as c
+from data.turret_data import TURRET_DATA
+from data.enemy_data import ENEMY_DATA
+from classes.simulation import create_headless_simulation
+from classes.profiler import PROFILER
+
+ENEMY_COUNTS = (100, 1000, 10000)
+TURRET_COUNTS = (10, 50, 200) # por cada tipo de torreta
+
+# Fases de Simulation.step que se reportan.
+PHASES = ("sim.enemies", "sim.index", "sim.turrets", "sim.projectiles", "sim.events")
+
+def percentiles(values) -> dict:
+    # p50, p95 y p99 de una lista de duraciones en ns, en milisegundos.
+    values = sorted(values)
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    last = len(values) - 1
+    return {name: values[int(last * p)] / 1e6
+            for name, p in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))}
+
+def build_scenario(level_name: str, enemies: int, turrets: int, use_enemy_store: bool):
+    # Simulacion con enemigos repartidos en las primeras 3/4 partes de la
+    # ruta (asi no escapan durante la medicion) y torretas a los lados.
+    sim = create_headless_simulation(level_name, use_enemy_store=use_enemy_store)
+    sim.base_health = 10 ** 9
+    path = sim.level.path
+
+    # Torretas: puntos equidistantes de la ruta, una casilla a cada lado. Si
+    # la casilla ya tiene torreta (rutas que pasan cerca) se saltea.
+    types = list(TURRET_DATA)
+    total = turrets * len(types)
+    for i in range(total):
+        distance = path.length * (i + 0.5) / total
+        segment = path.segment_at(distance)
+        x, y = path.point_at(distance, segment)
+        ux, uy = path.directions[segment]
+        side = 1 if i % 2 == 0 else -1
+        tile_x = min(max(int((x - uy * side * c.TILE_SIZE) // c.TILE_SIZE), 0), sim.level.w - 1)
+        tile_y = min(max(int((y + ux * side * c.TILE_SIZE) // c.TILE_SIZE), 0), sim.level.h - 1)
+        if sim.is_tile_occupied(tile_x, tile_y):
+            continue
+        turret = sim.add_turret(types[i % len(types)], tile_x, tile_y)
+        # Recargas escalonadas: hay disparos (y danio en area) desde el primer tick.
+        turret.last_shot = -turret.cooldown * ((i % 10) + 1) / 10
+
+    # Enemigos con vida de sobra para que el escenario no se vacie.
+    names = list(ENEMY_DATA)
+    for i in range(enemies):
+        data = ENEMY_DATA[names[i % len(names)]]
+        enemy = sim.enemy_group.spawn(names[i % len(names)], None, 10 ** 9,
+                                      data["speed"], data["reward"])
+        distance = path.length * 0.75 * i / max(enemies, 1)
+        if hasattr(enemy, "store"):
+            enemy.store.distance[enemy.slot] = distance
+        else:
+            enemy.distance = distance
+    sim.enemy_group.update(0.0)
+    return sim
+
+def run_scenario(level_name: str, enemies: int, turrets: int, ticks: int,
+                 dt: float, use_enemy_store: bool) -> dict:
+    # Mide un escenario: una pasada de tiempos y otra corta de memoria.
+    sim = build_scenario(level_name, enemies, turrets, use_enemy_store)
+    PROFILER.samples = ticks
+    PROFILER.reset()
+    PROFILER.enabled = True
+    tick_times = []
+    start = time.perf_counter_ns()
+    for _ in range(ticks):
+        tick_start = time.perf_counter_ns()
+        sim.step(dt)
+        tick_times.append(time.perf_counter_ns() - tick_start)
+    elapsed = time.perf_counter_ns() - start
+    PROFILER.enabled = False
+    phases = {phase: percentiles(PROFILER.timings.get(phase, ())) for phase in PHASES}
+
+    # tracemalloc vuelve lento todo, por eso la memoria se mide aparte.
+    tracemalloc.start()
+    sim = build_scenario(level_name, enemies, turrets, use_enemy_store)
+    for _ in range(min(ticks, 10)):
+        sim.step(dt)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "enemies": enemies,
+        "turrets_per_type": turrets,
+        "turrets_placed": len(sim.turret_group),
+        "ticks": ticks,
+        "ticks_per_second": ticks * 1e9 / elapsed,
+        "tick_ms": percentiles(tick_times),
+        "phases_ms": phases,
+        "peak_memory_bytes": peak
+    }
+
+def get_config_mismatch(report: dict, baseline: dict) -> dict:
+    # Ajustes de config distintos entre el reporte y baseline: {clave: (actual, baseline)}.
+    base_config = baseline.get("config", {})
+    return {key: (value, base_config.get(key))
+            for key, value in report["config"].items() if base_config.get(key) != value}
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    # Escenarios que empeoraron mas que tolerance respecto de baseline.
+    regressions = []
+    for name, result in report["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        checks = (
+            ("ticks_per_second", base["ticks_per_second"] / max(result["ticks_per_second"], 1e-9)),
+            ("tick_ms.p95", result["tick_ms"]["p95"] / max(base["tick_ms"]["p95"], 1e-9)),
+            ("peak_memory_bytes", result["peak_memory_bytes"] / max(base["peak_memory_bytes"], 1))
+        )
+        for metric, ratio in checks:
+            if ratio > 1 + tolerance:
+                regressions.append({"scenario": name, "metric": metric, "ratio": ratio})
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de la simulacion de Pomodoro TD.")
+    parser.add_argument("--level", default="level1")
+    parser.add_argument("--scenarios", nargs="*", default=None,
+                        help="Escenarios ENEMIGOSxTORRETAS (por defecto todos).")
+    parser.add_argument("--ticks", type=int, default=120, help="Ticks medidos por escenario.")
+    parser.add_argument("--dt", type=float, default=c.SIM_STEP, help="Paso de simulacion (s).")
+    parser.add_argument("--enemy-store", action="store_true",
+                        help="Guardar enemigos en arreglos de NumPy.")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados.")
+    parser.add_argument("--baseline", default=None, help="Reporte JSON para comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Empeoramiento relativo permitido (0.15 = 15%%).")
+    args = parser.parse_args()
+
+    if args.scenarios:
+        scenarios = [tuple(int(n) for n in name.split("x")) for name in args.scenarios]
+    else:
+        scenarios = [(e, t) for e in ENEMY_COUNTS for t in TURRET_COUNTS]
+
+    report = {
+        "config": {"level": args.level, "ticks": args.ticks, "dt": args.dt,
+                   "enemy_store": args.enemy_store},
+        "scenarios": {}
+    }
+    for enemies, turrets in scenarios:
+        name = f"{enemies}x{turrets}"
+        result = run_scenario(args.level, enemies, turrets, args.ticks, args.dt,
+                              args.enemy_store)
+        report["scenarios"][name] = result
+        print(f"{name}: {result['ticks_per_second']:.1f} ticks/s, "
+              f"p95 {result['tick_ms']['p95']:.2f} ms", file=sys.stderr)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        mismatch = get_config_mismatch(report, baseline)
+        if mismatch:
+            report["config_mismatch"] = mismatch
+            print("No se compara con la base: configuracion distinta "
+                  + ", ".join(f"{key}={value!r} (base {base!r})"
+                              for key, (value, base) in mismatch.items()), file=sys.stderr)
+            exit_code = 2
+        else:
+            report["regressions"] = compare(report, baseline, args.tolerance)
+            if report["regressions"]:
+                exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
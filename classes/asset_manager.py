@@ -0,0 +1,141 @@
+# Modulos de python.
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+# Modulos de pygame.
+import pygame as pg
+
+# Modulos custom.
+from classes.logger import LOGGER
+
+class AssetInfo():
+    # Datos de una imagen cargada: tiempo de carga (lectura y decodificacion,
+    # mas la conversion), bytes de sus pixeles y si ya esta en el formato de
+    # la ventana.
+    __slots__ = ("path", "alpha", "load_time", "convert_time", "nbytes", "converted", "preloaded")
+
+    def __init__(self, path: str, alpha: bool) -> None:
+        self.path = path
+        self.alpha = alpha
+        self.load_time = 0.0    # segundos
+        self.convert_time = 0.0 # segundos
+        self.nbytes = 0
+        self.converted = False
+        self.preloaded = False  # decodificada en el hilo de precarga
+
+class AssetManager():
+    # Imagenes del juego, cargadas una sola vez por (ruta, alpha). Cuando ya
+    # existe la ventana se convierten a su formato (convert_alpha si la
+    # imagen tiene transparencia, convert si no), asi ningun blit convierte
+    # pixeles. preload() decodifica en un hilo aparte las imagenes del
+    # proximo estado; la conversion se hace en el hilo principal al pedirlas.
+    def __init__(self) -> None:
+        self.images: Dict[Tuple[str, bool], pg.Surface] = {}
+        self.info: Dict[Tuple[str, bool], AssetInfo] = {}
+        self.pending = {} # (ruta, alpha) -> Future de la precarga
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def get_image(self, path, alpha: bool = True) -> pg.Surface:
+        # Devuelve la imagen de path, cargandola (o esperando su precarga) y
+        # convirtiendola si hace falta.
+        key = (str(path), alpha)
+        image = self.images.get(key)
+        if image is None:
+            with self.lock:
+                future = self.pending.pop(key, None)
+            if future is not None:
+                image = future.result()
+            else:
+                image = self.decode(key)
+            self.images[key] = image
+        if not self.info[key].converted and pg.display.get_surface() is not None:
+            image = self.convert(key)
+        return image
+
+    def decode(self, key: Tuple[str, bool]) -> pg.Surface:
+        # Lee y decodifica el archivo (sin convertir), midiendo el tiempo.
+        t0 = time.perf_counter()
+        image = pg.image.load(key[0])
+        info = AssetInfo(key[0], key[1])
+        info.load_time = time.perf_counter() - t0
+        info.nbytes = image.get_width() * image.get_height() * image.get_bytesize()
+        with self.lock:
+            self.info[key] = info
+        return image
+
+    def convert(self, key: Tuple[str, bool]) -> pg.Surface:
+        # Pasa la imagen al formato de la ventana, una sola vez.
+        info = self.info[key]
+        t0 = time.perf_counter()
+        image = self.images[key]
+        image = image.convert_alpha() if info.alpha else image.convert()
+        info.convert_time = time.perf_counter() - t0
+        info.nbytes = image.get_width() * image.get_height() * image.get_bytesize()
+        info.converted = True
+        self.images[key] = image
+        return image
+
+    def convert_all(self) -> None:
+        # Convierte las imagenes cargadas antes de crear la ventana. Quien
+        # guarde una referencia debe volver a pedirla con get_image.
+        for key in list(self.images):
+            if not self.info[key].converted:
+                self.convert(key)
+
+    def preload(self, assets) -> None:
+        # Decodifica en segundo plano las imagenes de assets, una lista de
+        # rutas o de pares (ruta, alpha), que aun no esten cargadas.
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        for asset in assets:
+            path, alpha = asset if isinstance(asset, tuple) else (asset, True)
+            key = (str(path), alpha)
+            with self.lock:
+                if key in self.images or key in self.pending:
+                    continue
+                self.pending[key] = self.executor.submit(self.run_preload, key)
+
+    def run_preload(self, key: Tuple[str, bool]) -> pg.Surface:
+        image = self.decode(key)
+        self.info[key].preloaded = True
+        return image
+
+    def release(self, path, alpha: bool = True) -> None:
+        # Olvida una imagen (por ejemplo, la de un nivel descargado).
+        key = (str(path), alpha)
+        self.images.pop(key, None)
+        with self.lock:
+            self.info.pop(key, None)
+            future = self.pending.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def get_memory(self) -> int:
+        # Bytes de pixeles de las imagenes en memoria.
+        return sum(self.info[key].nbytes for key in self.images)
+
+    def report(self) -> List[Dict]:
+        # Tiempo de carga y memoria de cada imagen, de mas lenta a mas rapida.
+        rows = [{"path": info.path, "alpha": info.alpha,
+                 "load_ms": info.load_time * 1000.0, "convert_ms": info.convert_time * 1000.0,
+                 "bytes": info.nbytes, "converted": info.converted, "preloaded": info.preloaded}
+                for key, info in self.info.items() if key in self.images]
+        rows.sort(key=lambda row: row["load_ms"] + row["convert_ms"], reverse=True)
+        return rows
+
+    def log_report(self) -> None:
+        # Escribe el reporte en el registro (categoria "assets"): el detalle
+        # por imagen en DEBUG y el total en INFO.
+        rows = self.report()
+        for row in rows:
+            LOGGER.debug("assets", "%s: %.1f ms + %.1f ms conv, %.1f KB%s", row["path"],
+                         row["load_ms"], row["convert_ms"], row["bytes"] / 1024,
+                         " (precargada)" if row["preloaded"] else "")
+        LOGGER.info("assets", "%d imagenes, %.1f KB", len(rows), self.get_memory() / 1024)
+
+# Imagenes compartidas por todos los estados.
+ASSETS = AssetManager()
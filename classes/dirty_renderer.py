@@ -0,0 +1,55 @@
+# Modulos de python.
+import sys
+from typing import List
+
+# Modulos de pygame.
+import pygame as pg
+
+class DirtyRenderer():
+    # Dibujo por rectangulos sucios sobre una capa estatica pre-compuesta.
+    # Antes de dibujar se restaura el fondo solo donde hubo elementos en el
+    # frame anterior; luego se dibujan los elementos dinamicos registrando su
+    # rectangulo con mark(). end() devuelve las zonas que cambiaron, que son
+    # las unicas que hace falta presentar con pg.display.update(rects).
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.full_redraw = True
+        self.prev_rects: List[pg.Rect] = []
+        self.rects: List[pg.Rect] = []
+        self.drawn_full = False
+
+    def invalidate(self) -> None:
+        # El proximo frame se dibuja completo.
+        self.full_redraw = True
+
+    def begin(self, surface: pg.Surface, background: pg.Surface) -> bool:
+        # Prepara el frame. Devuelve True si se dibujo el fondo completo.
+        self.rects = []
+        self.drawn_full = self.full_redraw or not self.enabled
+        if self.drawn_full:
+            surface.blit(background, (0, 0))
+            self.full_redraw = False
+        else:
+            for rect in self.prev_rects:
+                surface.blit(background, rect, rect)
+        return self.drawn_full
+
+    def mark(self, rect) -> None:
+        # Registra la zona ocupada por un elemento dinamico.
+        if rect:
+            self.rects.append(pg.Rect(rect))
+
+    def blit(self, surface: pg.Surface, image: pg.Surface, dest) -> pg.Rect:
+        # Dibuja una imagen y registra su rectangulo.
+        rect = surface.blit(image, dest)
+        self.rects.append(rect)
+        return rect
+
+    def end(self, surface: pg.Surface) -> List[pg.Rect]:
+        # Cierra el frame y devuelve los rectangulos a presentar.
+        if self.drawn_full:
+            dirty = [surface.get_rect()]
+        else:
+            dirty = self.prev_rects + self.rects
+        self.prev_rects = self.rects
+        return dirty
@@ -1,105 +1,302 @@
 # Modulos de python.
 import sys
 import math
+from bisect import bisect_left, bisect_right
 
 # Modulos de pygame.
 import pygame as pg
 from pygame.locals import *
-from pygame.math import Vector2
 from utils import constants as c
 
 # Modulos custom.
+from classes.spatial_hash import SpatialHash
+from classes.rotation_cache import ROTATION_CACHE
+from classes.event_queue import ESCAPE
+
+# Imagenes de barra de vida por tamano (ancho, alto).
+health_bar_ramps = {}
+
+def get_health_bar_ramp(w, h) -> list:
+    # Devuelve las w + 1 imagenes posibles de una barra de w x h, indexadas
+    # por pixeles de vida (fondo rojo, vida actual verde). Se crean una vez.
+    ramp = health_bar_ramps.get((w, h))
+    if ramp is None:
+        ramp = []
+        for filled in range(w + 1):
+            image = pg.Surface((w, h))
+            image.fill(c.COLOUR_RED)
+            image.fill(c.COLOUR_GREEN, (0, 0, filled, h))
+            if pg.display.get_surface() is not None:
+                image = image.convert()
+            ramp.append(image)
+        health_bar_ramps[(w, h)] = ramp
+    return ramp
 
 class HealthBar():
-    # Barra de vida para una entidad.
+    # Barra de vida para una entidad. Se dibuja con una imagen de la rampa
+    # precalculada; la posicion la decide quien la dibuja.
+    __slots__ = ("w", "h", "hp", "max_hp", "ramp")
+    OWNED_ATTRS = () # la rampa es compartida
+
     def __init__(self,
-                 x, # posicion en x de la barra de vida
-                 y, # posicion en y de la barra de vida
                  w, # ancho de la barra de vida
                  h, # alto de la barra de vida
                  max_hp # Vida maxima de la entidad
                  ) -> None:
-        # Inicializa la posicion y dimensiones de la barra.
-        self.x = x
-        self.y = y
+        # Inicializa las dimensiones de la barra.
         self.w = w
         self.h = h
         self.hp = max_hp
         self.max_hp = max_hp
+        self.ramp = get_health_bar_ramp(w, h)
+
+    @property
+    def full(self) -> bool:
+        return self.hp >= self.max_hp
+
+    def get_image(self) -> pg.Surface:
+        # Imagen de la barra para la vida actual.
+        filled = int(self.w * self.hp / self.max_hp)
+        return self.ramp[min(max(filled, 0), self.w)]
 
-    def draw(self, surface) -> None:
-        # Dibuja la barra de vida (fondo rojo, vida actual verde).
-        ratio = self.hp/self.max_hp
-        pg.draw.rect(surface, c.COLOUR_RED, (self.x, self.y, self.w, self.h))
-        pg.draw.rect(surface, c.COLOUR_GREEN, (self.x, self.y, self.w * ratio, self.h))
+    def draw(self, surface, x, y) -> pg.Rect:
+        # Dibuja la barra de vida con su esquina superior izquierda en (x, y).
+        return surface.blit(self.get_image(), (x, y))
 
 class Enemy(pg.sprite.Sprite):
     # Representa un enemigo que se mueve a lo largo de una ruta.
+    # Los atributos propios (y el conjunto de grupos de Sprite) van en
+    # __slots__. Sprite no declara __slots__, asi que la instancia sigue
+    # teniendo __dict__; queda vacio y CPython solo lo reserva si alguien lo
+    # pide. La ruta y las imagenes son compartidas.
+    __slots__ = ("_Sprite__g", "path", "health_bar", "distance", "segment",
+                 "pos", "prev_pos", "speed", "angle", "original_image", "image",
+                 "rect", "max_health", "current_health", "events",
+                 "enemy_type", "reward")
+    OWNED_ATTRS = ("_Sprite__g", "health_bar", "pos", "prev_pos", "rect")
+
     def __init__(self,
-                 waypoints, # lista de puntos (x,y) que forman la ruta
-                 image,     # imagen del enemigo
+                 path,      # ruta precalculada (Path) compartida por los enemigos
+                 image,     # imagen del enemigo (None en simulacion sin video)
                  health,    # vida maxima del enemigo
                  speed,     # velocidad de movimiento
-                 on_escape=None # funcion a llamar cuando el enemigo escapa
+                 events=None # EventQueue donde se publica el escape
                  ) -> None:
         # Inicializar la clase padre.
         pg.sprite.Sprite.__init__(self)
 
-        # Parametros.
-        self.waypoints = waypoints
-        self.pos = Vector2(waypoints[0])
+        self.path = path
+        self.health_bar = HealthBar(35, 5, health)
+        self.reset(image, health, speed, events)
+
+    def reset(self, image, health, speed, events=None) -> None:
+        # Deja al enemigo como recien creado al inicio de la ruta. El
+        # EnemyPool lo usa para reutilizar instancias.
+        self.distance = 0.0 # distancia recorrida sobre la ruta
+        self.segment = 0    # tramo actual de la ruta
+        self.pos = self.path.start
+        self.prev_pos = self.pos # posicion del paso anterior, para interpolar
         self.speed = speed
-        self.target_waypoint = 1
-        self.angle = 0
+        self.angle = self.path.heading_at(0.0)
         self.original_image = image
-        self.image = pg.transform.rotate(self.original_image, self.angle)
-        self.rect = self.image.get_rect()
+        if self.original_image is not None:
+            self.image = ROTATION_CACHE.get(self.original_image, self.angle)
+            self.rect = self.image.get_rect()
+        else:
+            self.image = None
+            self.rect = pg.Rect(0, 0, c.TILE_SIZE, c.TILE_SIZE)
         self.rect.center = (self.pos)
 
         self.max_health = health
         self.current_health = health
-        self.health_bar = HealthBar(self.rect.centerx - 17, self.rect.top + 5, 35, 5, self.max_health)
-        self.on_escape = on_escape
+        self.health_bar.max_hp = health
+        self.health_bar.hp = health
+        self.events = events
+
+    @property
+    def progress(self) -> float:
+        # Fraccion de la ruta recorrida (0 a 1).
+        if self.path.length == 0:
+            return 1.0
+        return self.distance / self.path.length
 
     def update(self, dt: float) -> None:
         # Actualiza el movimiento, rotacion y barra de vida.
-        self.move(dt)
+        if not self.move(dt):
+            return
         self.rotate()
 
         self.health_bar.hp = self.current_health
 
-    def move(self, dt: float):
-        # Mueve al enemigo hacia el siguiente punto de ruta.
-        if self.target_waypoint < len(self.waypoints):
-            self.target = Vector2(self.waypoints[self.target_waypoint])
-            self.movement = self.target - self.pos
-        else:
+    def move(self, dt: float) -> bool:
+        # Avanza al enemigo sobre la ruta. Devuelve False si escapo.
+        # Al avanzar por distancia recorrida, un dt grande nunca se pasa de
+        # una esquina: el sobrante sigue por el tramo siguiente.
+        self.prev_pos = self.pos
+        self.distance += self.speed * dt
+        if self.distance >= self.path.length:
             # Llego al final del camino.
-            if self.on_escape:
-                self.on_escape()
+            if self.events is not None:
+                self.events.post(ESCAPE, self)
             self.kill()
+            return False
 
-        # Distancia restante hasta el objetivo.
-        dist = self.movement.length()
-
-        # Si la distancia es mayor que la velocidad, avanza normalmente.
-        if dist >= self.speed * dt:
-            self.pos += self.movement.normalize() * self.speed * dt
-        else:
-            if dist != 0:
-                self.pos += self.movement.normalize() * dist
-            self.target_waypoint += 1
-
+        self.segment = self.path.segment_at(self.distance, self.segment)
+        self.pos = self.path.point_at(self.distance, self.segment)
         self.rect.center = self.pos
+        return True
 
-        # Actualiza la posicion de la barra de vida.
-        self.health_bar.x = self.rect.centerx - 17
-        self.health_bar.y = self.rect.top + 5
+    def get_draw_pos(self, alpha: float = 1.0):
+        # Posicion interpolada entre el paso anterior (alpha 0) y el actual.
+        px, py = self.prev_pos
+        x, y = self.pos
+        return (px + (x - px) * alpha, py + (y - py) * alpha)
 
     def rotate(self):
-        # Calcula el angulo hacia el siguiente punto y rota la imagen.
-        dist = self.target - self.pos
-        self.angle = math.degrees(math.atan2(-dist[1], dist[0]))
-        self.image = pg.transform.rotate(self.original_image, self.angle)
+        # Orienta la imagen segun el tramo actual; solo rota al cambiar de tramo.
+        angle = self.path.headings[self.segment]
+        if self.original_image is None or angle == self.angle:
+            self.angle = angle
+            return
+        self.angle = angle
+        self.image = ROTATION_CACHE.get(self.original_image, self.angle)
         self.rect  = self.image.get_rect()
-        self.rect.center = self.pos
\ No newline at end of file
+        self.rect.center = self.pos
+
+class EnemyPool():
+    # Reserva de enemigos por tipo para no crear y descartar un Enemy (con su
+    # rect y su HealthBar) en cada aparicion. Los enemigos liberados quedan
+    # pendientes hasta recycle(), para que ninguna torreta siga apuntando a
+    # una instancia que ya volvio a la ruta como otro enemigo.
+    def __init__(self, max_per_type: int = c.ENEMY_POOL_SIZE) -> None:
+        self.max_per_type = max_per_type
+        self.free = {}    # tipo -> enemigos listos para reutilizar
+        self.pending = [] # enemigos liberados desde el ultimo recycle()
+        self.hits = 0     # apariciones servidas desde la reserva
+        self.misses = 0   # apariciones que crearon un Enemy nuevo
+
+    def acquire(self, enemy_type, path, image, health, speed, events=None) -> Enemy:
+        # Devuelve un enemigo de ese tipo listo al inicio de la ruta.
+        free = self.free.get(enemy_type)
+        if free:
+            enemy = free.pop()
+            enemy.reset(image, health, speed, events)
+            self.hits += 1
+        else:
+            enemy = Enemy(path, image, health, speed, events)
+            enemy.enemy_type = enemy_type
+            self.misses += 1
+        return enemy
+
+    def release(self, enemy: Enemy) -> None:
+        # Recibe un enemigo que salio del juego.
+        self.pending.append(enemy)
+
+    def recycle(self) -> None:
+        # Pasa los enemigos liberados a la reserva de su tipo.
+        for enemy in self.pending:
+            free = self.free.setdefault(enemy.enemy_type, [])
+            if len(free) < self.max_per_type:
+                free.append(enemy)
+        self.pending.clear()
+
+    def clear(self) -> None:
+        # Descarta la reserva y reinicia los contadores.
+        self.free.clear()
+        self.pending.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> dict:
+        # Contadores para dimensionar la reserva con datos de oleadas reales.
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "free": {enemy_type: len(free) for enemy_type, free in self.free.items()}
+        }
+
+class EnemyGroup(pg.sprite.Group):
+    # Grupo de sprites de enemigos que sabe crear enemigos sobre una ruta.
+    def __init__(self,
+                 path, # ruta precalculada (Path) del nivel
+                 events=None, # EventQueue donde se publican los escapes
+                 pool: EnemyPool = None # reserva de enemigos (None crea una)
+                 ) -> None:
+        pg.sprite.Group.__init__(self)
+        self.path = path
+        self.events = events
+        self.index = SpatialHash(c.TILE_SIZE)
+        # Enemigos ordenados por distancia recorrida; se arma en el primer
+        # find_on_path de cada tick.
+        self.path_index = None
+        self.pool = pool if pool is not None else EnemyPool()
+
+    def spawn(self, enemy_type, image, health, speed, reward) -> Enemy:
+        # Toma un enemigo de la reserva al inicio de la ruta y lo agrega al grupo.
+        enemy = self.pool.acquire(enemy_type, self.path, image, health, speed, self.events)
+        enemy.reward = reward
+        self.add(enemy)
+        return enemy
+
+    def remove_internal(self, sprite) -> None:
+        # Todo enemigo que sale del grupo (muerto, escapado o vaciado) vuelve
+        # a la reserva.
+        pg.sprite.Group.remove_internal(self, sprite)
+        self.pool.release(sprite)
+
+    def recycle(self) -> None:
+        # Habilita la reutilizacion de los enemigos liberados. Se llama cuando
+        # las torretas ya soltaron a sus objetivos muertos.
+        self.pool.recycle()
+
+    def build_index(self) -> None:
+        # Reconstruye el indice espacial con las posiciones actuales.
+        self.index.clear()
+        for enemy in self:
+            self.index.insert(enemy, enemy.pos[0], enemy.pos[1])
+        self.path_index = None
+
+    def find_in_range(self, x, y, radius):
+        # Devuelve los enemigos a menos de radius del punto (x, y), en orden
+        # de aparicion, usando el indice construido en este tick.
+        return self.index.query(x, y, radius)
+
+    def find_on_path(self, intervals):
+        # Devuelve los enemigos cuya distancia recorrida cae dentro de algun
+        # intervalo (inicio, fin) de la ruta, en orden de aparicion.
+        if self.path_index is None:
+            enemies = list(self)
+            distances = [enemy.distance for enemy in enemies]
+            order = sorted(range(len(enemies)), key=distances.__getitem__)
+            self.path_index = (enemies, order, [distances[i] for i in order])
+        enemies, order, distances = self.path_index
+        found = []
+        for start, end in intervals:
+            found.extend(order[bisect_right(distances, start):bisect_left(distances, end)])
+        found.sort()
+        return [enemies[i] for i in found]
+
+    def empty(self) -> None:
+        pg.sprite.Group.empty(self)
+        self.index.clear()
+        self.path_index = None
+
+    def draw(self, surface, alpha: float = 1.0) -> list:
+        # Dibuja los enemigos en su posicion interpolada y devuelve los
+        # rectangulos ocupados.
+        return surface.blits([(enemy.image, enemy.image.get_rect(center=enemy.get_draw_pos(alpha)))
+                              for enemy in self])
+
+    def draw_health_bars(self, surface, alpha: float = 1.0,
+                         hide_full: bool = c.HIDE_FULL_HEALTH_BARS) -> list:
+        # Dibuja todas las barras de vida en una sola llamada a blits.
+        # Con hide_full se omiten las de enemigos sin danio.
+        blits = []
+        for enemy in self:
+            bar = enemy.health_bar
+            if hide_full and bar.full:
+                continue
+            x, y = enemy.get_draw_pos(alpha)
+            blits.append((bar.get_image(), (int(x) - 17, int(y) - enemy.rect.height // 2 + 5)))
+        surface.blits(blits, False)
+        return [pg.Rect(pos, image.get_size()) for image, pos in blits]
@@ -0,0 +1,339 @@
+# Modulos de python.
+import sys
+import math
+
+# Modulos de pygame.
+import pygame as pg
+from pygame.locals import *
+
+# NumPy es opcional: sin el, la simulacion usa EnemyGroup (un sprite por enemigo).
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Modulos custom.
+from utils import constants as c
+from classes.rotation_cache import ROTATION_CACHE
+from classes.enemy import get_health_bar_ramp
+from classes.event_queue import ESCAPE
+
+class EnemyHandle():
+    # Referencia ligera a un enemigo guardado en un EnemyStore.
+    # Expone la misma interfaz que usan las torretas con Enemy (pos,
+    # current_health, alive, kill) sin crear un sprite.
+    __slots__ = ("store", "slot", "enemy_type", "reward", "__weakref__")
+    OWNED_ATTRS = () # sus datos viven en los arreglos del EnemyStore
+
+    def __init__(self, store, slot, enemy_type, reward) -> None:
+        self.store = store
+        self.slot = slot
+        self.enemy_type = enemy_type
+        self.reward = reward
+
+    @property
+    def pos(self):
+        x, y = self.store.pos[self.slot]
+        return (float(x), float(y))
+
+    @property
+    def current_health(self):
+        return float(self.store.health[self.slot])
+
+    @current_health.setter
+    def current_health(self, value):
+        self.store.health[self.slot] = value
+
+    @property
+    def max_health(self):
+        return float(self.store.max_health[self.slot])
+
+    @property
+    def distance(self):
+        return float(self.store.distance[self.slot])
+
+    def alive(self) -> bool:
+        return self.slot >= 0
+
+    def kill(self) -> None:
+        if self.slot >= 0:
+            self.store.remove(self.slot)
+
+class EnemyStore():
+    # Almacen de enemigos como estructura de arreglos contiguos de NumPy.
+    # Distancia recorrida, posicion, vida y velocidad de todos los enemigos se
+    # avanzan en un solo paso vectorizado por tick. Los sprites solo se
+    # generan al dibujar.
+    def __init__(self,
+                 path, # ruta precalculada (Path) del nivel
+                 events=None, # EventQueue donde se publican los escapes
+                 capacity: int = 256 # capacidad inicial (crece al doble si hace falta)
+                 ) -> None:
+        if np is None:
+            raise ImportError("EnemyStore (USE_ENEMY_STORE / --enemy-store) requiere numpy: "
+                              "pip install -r requirements.txt")
+        self.path = path
+        # Tablas de la ruta como arreglos para buscar tramos en bloque.
+        self.path_points = np.asarray(path.waypoints, dtype=np.float64)
+        self.path_cumulative = np.asarray(path.cumulative, dtype=np.float64)
+        self.path_directions = np.asarray(path.directions, dtype=np.float64).reshape(-1, 2)
+        self.path_headings = np.asarray(path.headings, dtype=np.float64)
+        self.events = events
+        self.capacity = 0
+        self.count = 0
+        self.spawned = 0 # total de enemigos creados, para conservar el orden
+
+        self.pos = np.zeros((0, 2), dtype=np.float64)
+        self.prev_pos = np.zeros((0, 2), dtype=np.float64) # paso anterior, para interpolar
+        self.health = np.zeros(0, dtype=np.float64)
+        self.max_health = np.zeros(0, dtype=np.float64)
+        self.speed = np.zeros(0, dtype=np.float64)
+        self.distance = np.zeros(0, dtype=np.float64)
+        self.segment = np.zeros(0, dtype=np.int32)
+        self.spawn_order = np.zeros(0, dtype=np.int64)
+        self.active = np.zeros(0, dtype=bool)
+        self.handles = []
+        self.free_slots = []
+
+        # Slots vivos en orden de aparicion y sus posiciones. Se recalculan
+        # solo cuando cambia el conjunto de enemigos o se mueven.
+        self.live = None
+        self.live_pos = None
+
+        # Rejilla de celdas de TILE_SIZE sobre live_pos (ver build_index).
+        self.grid_live = None
+        self.grid_keys = None
+        # Orden por distancia recorrida para find_on_path (se arma al pedirlo).
+        self.path_live = None
+        self.grid_order = None
+
+        # Imagen por tipo de enemigo, solo para dibujar.
+        self.images = {}
+
+        self.grow(capacity)
+
+    def grow(self, new_capacity: int) -> None:
+        # Amplia los arreglos manteniendo los indices existentes.
+        extra = new_capacity - self.capacity
+        if extra <= 0:
+            return
+        self.pos = np.concatenate((self.pos, np.zeros((extra, 2))))
+        self.prev_pos = np.concatenate((self.prev_pos, np.zeros((extra, 2))))
+        self.health = np.concatenate((self.health, np.zeros(extra)))
+        self.max_health = np.concatenate((self.max_health, np.ones(extra)))
+        self.speed = np.concatenate((self.speed, np.zeros(extra)))
+        self.distance = np.concatenate((self.distance, np.zeros(extra)))
+        self.segment = np.concatenate((self.segment, np.zeros(extra, dtype=np.int32)))
+        self.spawn_order = np.concatenate((self.spawn_order, np.zeros(extra, dtype=np.int64)))
+        self.active = np.concatenate((self.active, np.zeros(extra, dtype=bool)))
+        self.handles.extend([None] * extra)
+        # Los slots libres se toman desde el final de la lista.
+        self.free_slots = list(range(new_capacity - 1, self.capacity - 1, -1)) + self.free_slots
+        self.capacity = new_capacity
+
+    def spawn(self, enemy_type, image, health, speed, reward) -> EnemyHandle:
+        # Agrega un enemigo al inicio de la ruta.
+        if not self.free_slots:
+            self.grow(max(1, self.capacity * 2))
+        slot = self.free_slots.pop()
+        self.pos[slot] = self.path.start
+        self.prev_pos[slot] = self.path.start
+        self.health[slot] = health
+        self.max_health[slot] = health
+        self.speed[slot] = speed
+        self.distance[slot] = 0.0
+        self.segment[slot] = 0
+        self.spawn_order[slot] = self.spawned
+        self.active[slot] = True
+        self.live = None
+        self.images[enemy_type] = image
+
+        handle = EnemyHandle(self, slot, enemy_type, reward)
+        self.handles[slot] = handle
+        self.count += 1
+        self.spawned += 1
+        return handle
+
+    def remove(self, slot: int) -> None:
+        # Libera un slot y desactiva su referencia.
+        if not self.active[slot]:
+            return
+        self.active[slot] = False
+        self.live = None
+        self.handles[slot].slot = -1
+        self.handles[slot] = None
+        self.free_slots.append(slot)
+        self.count -= 1
+
+    def empty(self) -> None:
+        # Elimina todos los enemigos.
+        for slot in np.flatnonzero(self.active):
+            self.remove(int(slot))
+
+    def recycle(self) -> None:
+        # Los slots se reutilizan de inmediato y cada aparicion crea un
+        # EnemyHandle nuevo, asi que no hay reserva que liberar.
+        pass
+
+    def get_live(self):
+        # Indices de los slots vivos, en orden de aparicion.
+        if self.live is None:
+            idx = np.flatnonzero(self.active)
+            self.live = idx[np.argsort(self.spawn_order[idx], kind="stable")]
+            self.live_pos = self.pos[self.live]
+        return self.live
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get_array_bytes(self) -> int:
+        # Memoria de los arreglos, reservada segun la capacidad actual.
+        arrays = (self.pos, self.prev_pos, self.health, self.max_health, self.speed,
+                  self.distance, self.segment, self.spawn_order, self.active)
+        return sum(array.nbytes for array in arrays) + sys.getsizeof(self.handles)
+
+    def __iter__(self):
+        # Recorre los enemigos en orden de aparicion, como un pg.sprite.Group.
+        return iter([self.handles[slot] for slot in self.get_live()])
+
+    def update(self, dt: float) -> None:
+        # Avanza a todos los enemigos por la ruta en un paso vectorizado: se
+        # suma la distancia recorrida y la posicion sale de las tablas de Path.
+        idx = self.get_live()
+        if idx.size == 0:
+            return
+        self.prev_pos[idx] = self.live_pos
+        distance = self.distance[idx] + self.speed[idx] * dt
+        self.distance[idx] = distance
+
+        # Enemigos que llegaron al final del camino.
+        escaped = distance >= self.path.length
+        if escaped.any():
+            for slot in idx[escaped]:
+                if self.events is not None:
+                    self.events.post(ESCAPE, self.handles[slot])
+                self.remove(int(slot))
+            idx = idx[~escaped]
+            distance = distance[~escaped]
+            if idx.size == 0:
+                return
+
+        segment = np.searchsorted(self.path_cumulative, distance, "right") - 1
+        np.clip(segment, 0, len(self.path_directions) - 1, out=segment)
+        offset = distance - self.path_cumulative[segment]
+        pos = self.path_points[segment] + self.path_directions[segment] * offset[:, None]
+        self.segment[idx] = segment
+        self.pos[idx] = pos
+        if self.live is idx:
+            self.live_pos = pos
+        else:
+            self.live_pos = None
+            self.live = None
+
+    def build_index(self) -> None:
+        # Ordena los enemigos vivos por celda (fila * columnas + columna) para
+        # que cada consulta de rango solo revise las filas de celdas cercanas.
+        idx = self.get_live()
+        self.grid_live = idx
+        self.path_live = None
+        if idx.size == 0:
+            self.grid_keys = None
+            return
+        cells = np.floor_divide(self.live_pos, c.TILE_SIZE).astype(np.int64)
+        self.grid_min = cells.min(axis=0)
+        cells -= self.grid_min
+        self.grid_cols, self.grid_rows = cells.max(axis=0) + 1
+        keys = cells[:, 1] * self.grid_cols + cells[:, 0]
+        self.grid_order = np.argsort(keys, kind="stable")
+        self.grid_keys = keys[self.grid_order]
+
+    def find_in_range(self, x, y, radius):
+        # Devuelve los enemigos a menos de radius del punto (x, y), en orden
+        # de aparicion.
+        idx = self.get_live()
+        if idx.size == 0:
+            return []
+        if self.grid_keys is None or self.grid_live is not idx:
+            # Sin indice vigente: distancia vectorizada contra todos.
+            delta = self.live_pos - (x, y)
+            near = idx[np.hypot(delta[:, 0], delta[:, 1]) < radius]
+            return [self.handles[slot] for slot in near]
+
+        min_cx = max(int((x - radius) // c.TILE_SIZE) - self.grid_min[0], 0)
+        max_cx = min(int((x + radius) // c.TILE_SIZE) - self.grid_min[0], self.grid_cols - 1)
+        min_cy = max(int((y - radius) // c.TILE_SIZE) - self.grid_min[1], 0)
+        max_cy = min(int((y + radius) // c.TILE_SIZE) - self.grid_min[1], self.grid_rows - 1)
+        if min_cx > max_cx or min_cy > max_cy:
+            return []
+
+        # Cada fila de celdas del rango es un tramo contiguo de grid_keys.
+        rows = np.arange(min_cy, max_cy + 1) * self.grid_cols
+        starts = np.searchsorted(self.grid_keys, rows + min_cx, "left")
+        ends = np.searchsorted(self.grid_keys, rows + max_cx, "right")
+        candidates = [self.grid_order[start:end] for start, end in zip(starts, ends) if end > start]
+        if not candidates:
+            return []
+        candidates = np.sort(np.concatenate(candidates))
+
+        delta = self.live_pos[candidates] - (x, y)
+        near = idx[candidates[np.hypot(delta[:, 0], delta[:, 1]) < radius]]
+        return [self.handles[slot] for slot in near]
+
+    def find_on_path(self, intervals):
+        # Devuelve los enemigos cuya distancia recorrida cae dentro de algun
+        # intervalo (inicio, fin) de la ruta, en orden de aparicion.
+        idx = self.get_live()
+        if idx.size == 0 or not intervals:
+            return []
+        if self.path_live is not idx:
+            self.path_live = idx
+            self.path_order = np.argsort(self.distance[idx], kind="stable")
+            self.path_distances = self.distance[idx][self.path_order]
+        bounds = np.asarray(intervals, dtype=np.float64)
+        starts = np.searchsorted(self.path_distances, bounds[:, 0], "right")
+        ends = np.searchsorted(self.path_distances, bounds[:, 1], "left")
+        found = [self.path_order[start:end] for start, end in zip(starts, ends) if end > start]
+        if not found:
+            return []
+        near = idx[np.sort(np.concatenate(found))]
+        return [self.handles[slot] for slot in near]
+
+    def get_angles(self, idx):
+        # Angulo (grados) de cada enemigo segun su tramo de la ruta.
+        return self.path_headings[self.segment[idx]]
+
+    def get_draw_pos(self, idx, alpha: float = 1.0):
+        # Posiciones interpoladas entre el paso anterior (alpha 0) y el actual.
+        prev = self.prev_pos[idx]
+        return prev + (self.pos[idx] - prev) * alpha
+
+    def draw(self, surface: pg.Surface, alpha: float = 1.0) -> list:
+        # Genera y dibuja el sprite de cada enemigo vivo.
+        idx = self.get_live()
+        angles = self.get_angles(idx)
+        draw_pos = self.get_draw_pos(idx, alpha)
+        rects = []
+        for slot, angle, (x, y) in zip(idx, angles, draw_pos):
+            image = self.images[self.handles[slot].enemy_type]
+            if image is None:
+                continue
+            rotated = ROTATION_CACHE.get(image, float(angle))
+            rect = rotated.get_rect(center=(float(x), float(y)))
+            rects.append(surface.blit(rotated, rect))
+        return rects
+
+    def draw_health_bars(self, surface: pg.Surface, alpha: float = 1.0,
+                         hide_full: bool = c.HIDE_FULL_HEALTH_BARS) -> list:
+        # Dibuja las barras de vida con la misma rampa que HealthBar, en una
+        # sola llamada a blits.
+        idx = self.get_live()
+        if hide_full:
+            idx = idx[self.health[idx] < self.max_health[idx]]
+        ramp = get_health_bar_ramp(35, 5)
+        filled = (35 * self.health[idx] / self.max_health[idx]).astype(np.int64)
+        np.clip(filled, 0, 35, out=filled)
+        corners = self.get_draw_pos(idx, alpha).astype(np.int64)
+        corners -= (17, c.TILE_SIZE // 2 - 5)
+        blits = [(ramp[f], (x, y)) for f, (x, y) in zip(filled.tolist(), corners.tolist())]
+        surface.blits(blits, False)
+        return [pg.Rect(pos, (35, 5)) for _, pos in blits]
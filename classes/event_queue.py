@@ -0,0 +1,41 @@
+# Modulos de python.
+import sys
+
+# Tipos de evento.
+DAMAGE = "damage" # un impacto quito vida (amount = danio)
+DEATH  = "death"  # un enemigo quedo sin vida (amount = recompensa)
+ESCAPE = "escape" # un enemigo llego al final de la ruta
+REWARD = "reward" # se acredito dinero por una muerte (amount = dinero)
+
+class EventQueue():
+    # Cola de eventos de la simulacion. Enemigos, torretas y proyectiles
+    # publican lo que pasa durante el tick y la Simulation la vacia una vez
+    # por tick, asi que el trabajo de recompensas y estadisticas depende de
+    # la cantidad de eventos y no de la de enemigos.
+    def __init__(self) -> None:
+        self.events = [] # (tipo, enemigo, cantidad)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def post(self, kind: str, enemy=None, amount=0) -> None:
+        # Agrega un evento a la cola.
+        self.events.append((kind, enemy, amount))
+
+    def damage(self, enemy, amount) -> None:
+        # Aplica danio a un enemigo. La muerte se publica solo en el impacto
+        # que lo deja sin vida, aunque varios lo alcancen en el mismo tick.
+        was_alive = enemy.current_health > 0
+        enemy.current_health -= amount
+        self.post(DAMAGE, enemy, amount)
+        if was_alive and enemy.current_health <= 0:
+            self.post(DEATH, enemy, enemy.reward)
+
+    def drain(self) -> list:
+        # Devuelve los eventos pendientes y vacia la cola.
+        events = self.events
+        self.events = []
+        return events
+
+    def clear(self) -> None:
+        self.events = []
@@ -0,0 +1,82 @@
+# Modulos de python.
+import sys
+import json
+from pathlib import Path
+from typing import List, Dict
+
+# Acciones del jugador que cambian la partida. Cada entrada del registro es
+# [tick, accion, argumentos...], con tick = pasos de simulacion ya corridos.
+SELECT_TURRET = "s" # [tick, "s", tipo]
+CLICK_TILE = "t"    # [tick, "t", x, y] (casilla bajo el mouse, aun fuera del mapa)
+UPGRADE = "u"       # [tick, "u"]
+START = "g"         # [tick, "g"]
+PAUSE = "p"         # [tick, "p", 1 o 0]
+FREE_TURRET = "f"   # [tick, "f"] (F1)
+FORCE_VICTORY = "v" # [tick, "v"] (F2)
+
+REPLAY_VERSION = 1
+
+class InputRecorder():
+    # Registro compacto de las acciones que aplica TowerDefence. Como la
+    # simulacion avanza con paso fijo y no usa azar ni el reloj real, volver a
+    # aplicar las mismas acciones en los mismos ticks reproduce la partida.
+    def __init__(self) -> None:
+        self.inputs: List[list] = []
+
+    def __len__(self) -> int:
+        return len(self.inputs)
+
+    def clear(self) -> None:
+        self.inputs.clear()
+
+    def record(self, tick: int, action: str, *args) -> None:
+        # Agrega una accion aplicada en el tick dado.
+        self.inputs.append([tick, action, *args])
+
+    def build_log(self, header: Dict, result: Dict = None) -> Dict:
+        # Registro listo para guardar: configuracion de la partida, acciones
+        # y resultado final (para verificar la repeticion).
+        return {"version": REPLAY_VERSION, **header,
+                "inputs": list(self.inputs), "result": result}
+
+    def save(self, path, header: Dict, result: Dict = None, exclusive: bool = False) -> None:
+        # Guarda el registro en JSON sin espacios. Con exclusive no pisa un
+        # archivo existente (lanza FileExistsError).
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'x' if exclusive else 'w') as file:
+            json.dump(self.build_log(header, result), file, separators=(",", ":"))
+
+def load_replay(path) -> Dict:
+    # Carga un registro guardado con InputRecorder.save.
+    with open(path, 'r') as file:
+        log = json.load(file)
+    if log.get("version") != REPLAY_VERSION:
+        raise ValueError(f"Version de registro no soportada: {log.get('version')}")
+    return log
+
+class InputReplay():
+    # Entrega las acciones de un registro cuando la simulacion llega a su tick.
+    def __init__(self, log: Dict) -> None:
+        self.log = log
+        self.inputs = log["inputs"]
+        self.index = 0
+
+    @property
+    def done(self) -> bool:
+        return self.index >= len(self.inputs)
+
+    @property
+    def end_tick(self) -> int:
+        # Tick de la ultima accion o del final de la partida grabada.
+        result = self.log.get("result") or {}
+        last = self.inputs[-1][0] if self.inputs else 0
+        return max(result.get("ticks", 0), last)
+
+    def pop_due(self, tick: int) -> List[list]:
+        # Acciones pendientes con tick menor o igual al actual.
+        due = []
+        while self.index < len(self.inputs) and self.inputs[self.index][0] <= tick:
+            due.append(self.inputs[self.index])
+            self.index += 1
+        return due
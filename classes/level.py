@@ -9,12 +9,18 @@ from pygame.locals import *
 
 # Modulos custom.
 from utils import constants as c
+from classes.logger import LOGGER
+from classes.path import Path
+from classes.path_coverage import PathCoverage
+from classes.level_cache import CompiledLevel, read_level_cache, write_level_cache
+from data.turret_data import TURRET_DATA
+from config import LEVELS_DIR, LEVEL_CACHE_DIR
 
 class Level():
     # Representa un nivel del juego con su imagen y datos de tiles.
     def __init__(self,
-                 level_image, # Imagen que representa el nivel.
-                 level_data,  # Datos del nivel (JSON).
+                 level_image, # Imagen que representa el nivel (None sin video).
+                 level_data,  # Datos del nivel (JSON o CompiledLevel).
                  select_tile_img # Imagen de selector de casilla.
                  ) -> None:
         # Datos del mundo y casillas.
@@ -26,17 +32,37 @@ class Level():
         self.select_tile_img = select_tile_img
 
         # Dimensiones del nivel en casillas.
-        self.w = self.image.get_rect().right  // c.TILE_SIZE
-        self.h = self.image.get_rect().bottom // c.TILE_SIZE
+        if self.image is not None:
+            self.w = self.image.get_rect().right  // c.TILE_SIZE
+            self.h = self.image.get_rect().bottom // c.TILE_SIZE
+        elif isinstance(self.data, CompiledLevel):
+            self.w = self.data.width
+            self.h = self.data.height
+        else:
+            self.w = self.data["width"]
+            self.h = self.data["height"]
 
         # Puntos de control para los enemigos.
         self.waypoint_origin = None
         self.waypoints = []
+        self.path = None # Ruta precalculada compartida por todos los enemigos.
+        self.coverage = None # Tramos de ruta al alcance de cada casilla y rango.
+
+        # Rejilla de casillas, por filas (indice = y * w + x): si se puede
+        # construir y la torreta que la ocupa. Es la unica fuente para
+        # colocar, seleccionar y resaltar casillas.
+        self.buildable = None
+        self.occupants = [None] * (self.w * self.h)
 
         # Variables de estado del nivel.
         self.selected_tile = None # Posicion de la casilla seleccionada.
 
-        self.parse_data()
+        if isinstance(self.data, CompiledLevel):
+            self.load_compiled(self.data)
+        else:
+            self.parse_data()
+            self.build_buildable()
+            self.build_coverage()
 
     def parse_data(self) -> None:
         # Extrae la informacion de las capas del JSON.
@@ -57,14 +83,104 @@ class Level():
             temp_x = point.get("x")
             temp_y = point.get("y")
             self.waypoints.append((original_x + temp_x, original_y + temp_y))
+        self.path = Path(self.waypoints)
+
+    def load_compiled(self, compiled: CompiledLevel) -> None:
+        # Toma casillas, waypoints y cobertura de un nivel compilado, sin
+        # recorrer capas ni recalcular geometria.
+        self.tiles = compiled.tiles
+        self.buildable = compiled.buildable
+        self.waypoints = list(compiled.waypoints)
+        self.path = Path(self.waypoints)
+        self.coverage = PathCoverage.from_tables(self.path, compiled.width, compiled.height,
+                                                 self.buildable,
+                                                 compiled.get_coverage_tables())
+
+    def build_buildable(self) -> None:
+        # Marca las casillas de construccion de la capa Tilemap.
+        size = self.w * self.h
+        tiles = self.tiles or []
+        self.buildable = bytearray(1 if tile_id == c.BUILDABLE_TILE else 0
+                                   for tile_id in tiles[:size])
+        self.buildable.extend(bytes(size - len(self.buildable)))
+
+    def in_bounds(self, tile_x: int, tile_y: int) -> bool:
+        return 0 <= tile_x < self.w and 0 <= tile_y < self.h
+
+    def is_buildable(self, tile_x: int, tile_y: int) -> bool:
+        # La casilla es de construccion (ocupada o no).
+        return self.in_bounds(tile_x, tile_y) and self.buildable[tile_y * self.w + tile_x] == 1
+
+    def get_occupant(self, tile_x: int, tile_y: int):
+        # Torreta que ocupa la casilla, o None.
+        if not self.in_bounds(tile_x, tile_y):
+            return None
+        return self.occupants[tile_y * self.w + tile_x]
+
+    def is_free(self, tile_x: int, tile_y: int) -> bool:
+        # Se puede construir y no hay torreta.
+        return self.is_buildable(tile_x, tile_y) and self.occupants[tile_y * self.w + tile_x] is None
+
+    def occupy(self, tile_x: int, tile_y: int, turret) -> None:
+        # Registra la torreta colocada en una casilla.
+        if self.in_bounds(tile_x, tile_y):
+            self.occupants[tile_y * self.w + tile_x] = turret
+
+    def vacate(self, tile_x: int, tile_y: int, turret=None) -> None:
+        # Libera una casilla (si se da turret, solo si es la que la ocupa).
+        if self.in_bounds(tile_x, tile_y):
+            i = tile_y * self.w + tile_x
+            if turret is None or self.occupants[i] is turret:
+                self.occupants[i] = None
+
+    def clear_occupants(self) -> None:
+        # Libera todas las casillas.
+        self.occupants = [None] * (self.w * self.h)
+
+    def build_coverage(self) -> None:
+        # Precalcula la cobertura de la ruta de cada casilla de construccion
+        # para todos los rangos de TURRET_DATA.
+        if self.path is None or self.tiles is None:
+            return
+        self.coverage = PathCoverage(self.path, self.buildable, self.w, self.h, get_turret_ranges())
 
     def draw(self, surface: pg.Surface) -> None:
         # Dibuja la imagen de fondo del nivel.
         surface.blit(self.image, (0, 0))
 
-    def draw_overlay(self, surface: pg.Surface) -> None:
-        # Dibuja el selector de casilla si hay una seleccionada.
+    def draw_overlay(self, surface: pg.Surface):
+        # Dibuja el selector de casilla si hay una seleccionada. Devuelve el
+        # rectangulo dibujado, o None.
         if self.selected_tile != None:
-            surface.blit(self.select_tile_img,
-                         (self.selected_tile[0] * c.TILE_SIZE,
-                          self.selected_tile[1] * c.TILE_SIZE))
\ No newline at end of file
+            return surface.blit(self.select_tile_img,
+                                (self.selected_tile[0] * c.TILE_SIZE,
+                                 self.selected_tile[1] * c.TILE_SIZE))
+        return None
+
+def get_turret_ranges() -> List[int]:
+    # Todos los rangos de TURRET_DATA (uno por tipo y nivel).
+    return [stats["range"] for levels in TURRET_DATA.values() for stats in levels]
+
+def load_level_json(name: str) -> dict:
+    # Lee el archivo .tmj de un nivel desde LEVELS_DIR.
+    with open(LEVELS_DIR / f"{name}.tmj", 'r') as file:
+        return json.load(file)
+
+def load_level_data(name: str):
+    # Datos de un nivel para Level. Con c.LEVEL_CACHE se usa el nivel
+    # compilado en LEVEL_CACHE_DIR, que se recompila si el .tmj cambio; si
+    # no se puede escribir la cache se devuelve el JSON.
+    if not c.LEVEL_CACHE:
+        return load_level_json(name)
+    source = LEVELS_DIR / f"{name}.tmj"
+    cache_path = LEVEL_CACHE_DIR / f"{name}.lvl"
+    compiled = read_level_cache(cache_path, source, get_turret_ranges())
+    if compiled is not None:
+        return compiled
+    data = load_level_json(name)
+    try:
+        write_level_cache(cache_path, source, Level(None, data, None))
+        return CompiledLevel(cache_path)
+    except OSError as e:
+        LOGGER.warning("level", "No se pudo compilar el nivel %s: %s", name, e)
+        return data
@@ -0,0 +1,197 @@
+# Modulos de python.
+import sys
+import os
+import json
+import mmap
+import struct
+import hashlib
+from array import array
+from pathlib import Path as FilePath
+from typing import Dict, List, Tuple
+
+LEVEL_CACHE_MAGIC = b"PTDLEVEL"
+LEVEL_CACHE_VERSION = 1
+ALIGNMENT = 8 # los arreglos empiezan en multiplos de 8 bytes
+
+class CompiledLevel():
+    # Nivel compilado desde un .tmj y abierto con mmap. Los arreglos son
+    # memoryviews sobre el archivo (sin copiar ni parsear): se indexan como
+    # listas y numpy los envuelve sin copia con np.asarray(view).
+    #
+    # Formato: magic (8 bytes), largo del encabezado (uint32), encabezado JSON
+    # y luego cada arreglo alineado a 8 bytes, en el orden del byte del equipo
+    # que lo compilo. El encabezado guarda la version, el origen (tamanio,
+    # mtime y sha1 del .tmj), las dimensiones, los rangos de cobertura y la
+    # posicion de cada arreglo.
+    def __init__(self, cache_path) -> None:
+        self.cache_path = str(cache_path)
+        with open(self.cache_path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.buffer)
+        self.sections: List[memoryview] = [] # vistas entregadas por section()
+        try:
+            if bytes(self.view[:len(LEVEL_CACHE_MAGIC)]) != LEVEL_CACHE_MAGIC:
+                raise ValueError("magic distinto")
+            (header_len,) = struct.unpack_from("<I", self.buffer, len(LEVEL_CACHE_MAGIC))
+            start = len(LEVEL_CACHE_MAGIC) + 4
+            self.header = json.loads(bytes(self.view[start:start + header_len]).decode("utf-8"))
+
+            self.name = self.header["name"]
+            self.width = self.header["width"]
+            self.height = self.header["height"]
+            self.tiles = self.section("tiles")
+            self.buildable = self.section("buildable")
+            points = self.section("waypoints")
+            self.waypoints = [(points[i], points[i + 1]) for i in range(0, len(points), 2)]
+            self.ranges = self.header["ranges"]
+        except (ValueError, KeyError, TypeError, struct.error):
+            # Archivo truncado o de otro formato: se libera y se recompila.
+            self.close()
+            raise ValueError(f"{self.cache_path} no es un nivel compilado valido")
+
+    def __reduce__(self):
+        # Al enviarse a otro proceso se vuelve a abrir el mismo archivo.
+        return (CompiledLevel, (self.cache_path,))
+
+    def section(self, name: str) -> memoryview:
+        # Arreglo guardado con ese nombre, como memoryview tipado.
+        offset, nbytes, typecode = self.header["sections"][name]
+        section = self.view[offset:offset + nbytes].cast(typecode)
+        self.sections.append(section)
+        return section
+
+    def close(self) -> None:
+        # Libera las vistas y el mmap (el archivo queda libre para
+        # reemplazarlo). Los arreglos del nivel dejan de ser validos.
+        for section in self.sections:
+            section.release()
+        self.sections = []
+        self.view.release()
+        self.buffer.close()
+
+    def get_coverage_tables(self) -> Dict[int, Tuple[memoryview, memoryview, memoryview]]:
+        # Tablas de PathCoverage por rango: (offsets, bounds, lengths).
+        return {radius: (self.section(f"coverage.{radius}.offsets"),
+                         self.section(f"coverage.{radius}.bounds"),
+                         self.section(f"coverage.{radius}.lengths"))
+                for radius in self.ranges}
+
+def get_source_hash(source) -> str:
+    # sha1 del contenido del archivo de origen.
+    with open(source, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def write_level_cache(cache_path, source, level) -> None:
+    # Compila un Level ya construido desde el .tmj source. Se escribe a un
+    # archivo temporal y se reemplaza de una vez, asi ningun proceso lee un
+    # archivo a medias.
+    cache_path = FilePath(cache_path)
+    stat = os.stat(source)
+    sections: List[Tuple[str, array]] = [
+        ("tiles", array('I', level.tiles[:level.w * level.h])),
+        ("buildable", array('B', level.buildable)),
+        ("waypoints", array('d', [v for point in level.waypoints for v in point]))
+    ]
+    ranges = sorted(level.coverage.offsets)
+    for radius in ranges:
+        offsets, bounds, lengths = level.coverage.get_tables(radius)
+        sections.append((f"coverage.{radius}.offsets", array('I', offsets)))
+        sections.append((f"coverage.{radius}.bounds", array('f', bounds)))
+        sections.append((f"coverage.{radius}.lengths", array('f', lengths)))
+
+    header = {
+        "version": LEVEL_CACHE_VERSION,
+        "byteorder": sys.byteorder,
+        "name": cache_path.stem,
+        "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                   "sha1": get_source_hash(source)},
+        "width": level.w,
+        "height": level.h,
+        "ranges": ranges,
+        "sections": {}
+    }
+    dump_level_cache(cache_path, header,
+                     [(name, data, data.typecode) for name, data in sections])
+
+def dump_level_cache(cache_path, header: dict, sections) -> None:
+    # Escribe el encabezado y las secciones, pares (nombre, datos, typecode)
+    # con datos de cualquier objeto con buffer (array, bytes).
+    cache_path = FilePath(cache_path)
+    # Las posiciones dependen del largo del encabezado: se calcula dos veces.
+    for _ in range(2):
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        offset = len(LEVEL_CACHE_MAGIC) + 4 + len(header_bytes)
+        layout = {}
+        for name, data, typecode in sections:
+            offset += -offset % ALIGNMENT
+            nbytes = memoryview(data).nbytes
+            layout[name] = [offset, nbytes, typecode]
+            offset += nbytes
+        header["sections"] = layout
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'wb') as file:
+        file.write(LEVEL_CACHE_MAGIC)
+        file.write(struct.pack("<I", len(header_bytes)))
+        file.write(header_bytes)
+        for name, data, typecode in sections:
+            file.write(bytes(layout[name][0] - file.tell()))
+            file.write(data)
+    os.replace(temp_path, cache_path)
+
+def refresh_level_cache(compiled: CompiledLevel, source) -> CompiledLevel:
+    # El .tmj cambio de mtime pero no de contenido (checkout, copia): se
+    # reescribe la cache con el mtime nuevo para no volver a calcular el sha1
+    # en cada carga. Las secciones se copian tal cual; la cache se cierra
+    # antes de reemplazar el archivo. Si no se puede escribir se reabre la
+    # anterior, que sigue siendo valida.
+    header = json.loads(json.dumps(compiled.header))
+    header["source"]["mtime_ns"] = os.stat(source).st_mtime_ns
+    sections = [(name, bytes(compiled.view[offset:offset + nbytes]), typecode)
+                for name, (offset, nbytes, typecode) in compiled.header["sections"].items()]
+    cache_path = compiled.cache_path
+    compiled.close()
+    try:
+        dump_level_cache(cache_path, header, sections)
+    except OSError:
+        pass
+    return CompiledLevel(cache_path)
+
+def read_level_cache(cache_path, source, ranges) -> CompiledLevel:
+    # Abre el nivel compilado si sigue vigente: misma version y orden de
+    # bytes, mismos rangos de torreta y el .tmj sin cambios (mismo tamanio y
+    # mtime o, si el mtime cambio, mismo sha1; en ese caso se actualiza el
+    # mtime guardado). Devuelve None si hay que volver a compilar.
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        compiled = CompiledLevel(cache_path)
+    except (OSError, ValueError):
+        return None
+    if not is_cache_current(compiled.header, source, ranges):
+        # Se cierra antes de que write_level_cache reemplace el archivo.
+        compiled.close()
+        return None
+    if compiled.header["source"]["mtime_ns"] != os.stat(source).st_mtime_ns:
+        try:
+            compiled = refresh_level_cache(compiled, source)
+        except (OSError, ValueError):
+            return None
+    return compiled
+
+def is_cache_current(header: dict, source, ranges) -> bool:
+    # El encabezado corresponde a esta version, este orden de bytes, estos
+    # rangos y el .tmj actual.
+    if (header.get("version") != LEVEL_CACHE_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or header.get("ranges") != sorted(set(ranges))):
+        return False
+    stat = os.stat(source)
+    info = header["source"]
+    if info["size"] != stat.st_size:
+        return False
+    if info["mtime_ns"] != stat.st_mtime_ns and info["sha1"] != get_source_hash(source):
+        return False
+    return True
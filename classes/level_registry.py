@@ -0,0 +1,123 @@
+# Modulos de python.
+import sys
+import os
+from collections import OrderedDict
+from typing import Dict, List
+
+# Modulos de pygame.
+import pygame as pg
+
+# Modulos custom.
+from utils import constants as c
+from classes.logger import LOGGER
+from classes.asset_manager import ASSETS
+from classes.level import load_level_data
+from classes.level_cache import CompiledLevel
+from config import LEVELS_DIR
+
+class LevelEntry():
+    # Imagen y datos (JSON o CompiledLevel con sus tablas) de un nivel
+    # cargado, con el tamanio estimado que ocupan en memoria.
+    __slots__ = ("name", "image", "data", "nbytes")
+
+    def __init__(self, name: str, image, data) -> None:
+        self.name = name
+        self.image = image
+        self.data = data
+        self.nbytes = 0
+        self.measure()
+
+    def measure(self) -> None:
+        # Bytes de la imagen decodificada mas los de los datos del nivel.
+        nbytes = 0
+        if self.image is not None:
+            nbytes += self.image.get_width() * self.image.get_height() * self.image.get_bytesize()
+        if isinstance(self.data, CompiledLevel):
+            nbytes += len(self.data.buffer)
+        else:
+            nbytes += os.path.getsize(LEVELS_DIR / f"{self.name}.tmj")
+        self.nbytes = nbytes
+
+class LevelRegistry():
+    # Niveles disponibles: cada par nombre.tmj / nombre.png de LEVELS_DIR.
+    # Al iniciar solo se listan los archivos; la imagen, los datos y las
+    # tablas derivadas de un nivel se cargan al elegirlo. Los ultimos niveles
+    # jugados quedan en memoria (LRU) mientras no pasen de budget bytes; el
+    # mas reciente se conserva aunque lo supere.
+    def __init__(self, levels_dir=LEVELS_DIR, budget: int = c.LEVEL_MEMORY_BUDGET) -> None:
+        self.levels_dir = levels_dir
+        self.budget = budget
+        self.names: List[str] = []
+        self.loaded: "OrderedDict[str, LevelEntry]" = OrderedDict()
+        self.discover()
+
+    def discover(self) -> List[str]:
+        # Vuelve a listar los niveles de levels_dir (sin abrir los archivos).
+        try:
+            files = set(os.listdir(self.levels_dir))
+        except OSError as e:
+            LOGGER.warning("level", "No se pudo listar %s: %s", self.levels_dir, e)
+            files = set()
+        self.names = sorted(name[:-len(".tmj")] for name in files
+                            if name.endswith(".tmj") and f"{name[:-len('.tmj')]}.png" in files)
+        for name in list(self.loaded):
+            if name not in self.names:
+                del self.loaded[name]
+                ASSETS.release(*self.get_image_asset(name))
+        return self.names
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def get_default(self) -> str:
+        # Nivel inicial: c.DEFAULT_LEVEL si existe, si no el primero.
+        if c.DEFAULT_LEVEL in self.names or not self.names:
+            return c.DEFAULT_LEVEL
+        return self.names[0]
+
+    def get_image_asset(self, name: str):
+        # (ruta, alpha) de la imagen de un nivel en ASSETS.
+        return (self.levels_dir / f"{name}.png", False)
+
+    def preload(self, name: str) -> None:
+        # Empieza a decodificar la imagen del nivel en segundo plano.
+        if name in self.names and name not in self.loaded:
+            ASSETS.preload([self.get_image_asset(name)])
+
+    def load(self, name: str) -> LevelEntry:
+        # Imagen y datos de un nivel, cargandolos si no estan en memoria.
+        entry = self.loaded.get(name)
+        if entry is not None:
+            self.loaded.move_to_end(name)
+            return entry
+        if name not in self.names:
+            raise KeyError(f"Nivel desconocido: {name}")
+
+        image = ASSETS.get_image(*self.get_image_asset(name))
+        entry = LevelEntry(name, image, load_level_data(name))
+        self.loaded[name] = entry
+        LOGGER.info("level", "Nivel %s cargado (%.1f KB)", name, entry.nbytes / 1024)
+        self.trim()
+        return entry
+
+    def convert(self, name: str) -> pg.Surface:
+        # Convierte la imagen del nivel al formato de la ventana una sola vez.
+        entry = self.load(name)
+        image = ASSETS.get_image(*self.get_image_asset(name))
+        if image is not entry.image:
+            entry.image = image
+            entry.measure()
+        return image
+
+    def get_memory(self) -> int:
+        # Bytes estimados de los niveles en memoria.
+        return sum(entry.nbytes for entry in self.loaded.values())
+
+    def trim(self) -> None:
+        # Descarta los niveles menos usados hasta entrar en el presupuesto.
+        while len(self.loaded) > 1 and self.get_memory() > self.budget:
+            name, entry = self.loaded.popitem(last=False)
+            ASSETS.release(*self.get_image_asset(name))
+            LOGGER.info("level", "Nivel %s descargado (%.1f KB)", name, entry.nbytes / 1024)
+
+LEVEL_REGISTRY = LevelRegistry()
@@ -0,0 +1,110 @@
+# Modulos de python.
+import sys
+import time
+import atexit
+import threading
+from collections import deque
+
+# Modulos custom.
+from utils import constants as c
+
+# Niveles de registro.
+DEBUG   = 10
+INFO    = 20
+WARNING = 30
+ERROR   = 40
+OFF     = 100
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR, "OFF": OFF}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+class Logger():
+    # Registro del juego por niveles y categorias. Los mensajes se guardan
+    # sin formatear en un buffer circular en memoria y un hilo aparte los
+    # escribe cada flush_interval segundos, asi que el bucle principal nunca
+    # espera a la terminal. Un mensaje de un nivel deshabilitado solo cuesta
+    # una comparacion.
+    def __init__(self,
+                 level=c.LOG_LEVEL,                        # nivel minimo por defecto
+                 capacity: int = c.LOG_BUFFER_SIZE,        # registros en memoria
+                 flush_interval: float = c.LOG_FLUSH_INTERVAL, # segundos entre escrituras
+                 stream=None                               # None escribe en sys.stderr
+                 ) -> None:
+        self.level = LEVELS.get(level, level)
+        self.category_levels = {} # categoria -> nivel minimo propio
+        self.buffer = deque(maxlen=capacity)
+        self.dropped = 0 # registros perdidos por buffer lleno
+        self.flush_interval = flush_interval
+        self.stream = stream
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def set_level(self, level, category: str = None) -> None:
+        # Cambia el nivel minimo, global o de una categoria. Con OFF la
+        # categoria queda deshabilitada.
+        level = LEVELS.get(level, level)
+        if category is None:
+            self.level = level
+        else:
+            self.category_levels[category] = level
+
+    def is_enabled(self, level: int, category: str) -> bool:
+        return level >= self.category_levels.get(category, self.level)
+
+    def log(self, level: int, category: str, message: str, *args) -> None:
+        # Guarda un registro; el texto se formatea recien al escribirlo.
+        if level < self.category_levels.get(category, self.level):
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((time.time(), level, category, message, args))
+        if self.thread is None:
+            self.start()
+
+    def debug(self, category: str, message: str, *args) -> None:
+        self.log(DEBUG, category, message, *args)
+
+    def info(self, category: str, message: str, *args) -> None:
+        self.log(INFO, category, message, *args)
+
+    def warning(self, category: str, message: str, *args) -> None:
+        self.log(WARNING, category, message, *args)
+
+    def error(self, category: str, message: str, *args) -> None:
+        self.log(ERROR, category, message, *args)
+
+    def format(self, record) -> str:
+        # Texto de un registro.
+        created, level, category, message, args = record
+        if args:
+            message = message % args
+        stamp = time.strftime("%H:%M:%S", time.localtime(created))
+        return f"{stamp} {LEVEL_NAMES.get(level, level)} [{category}] {message}"
+
+    def get_records(self) -> list:
+        # Copia de los registros que aun no se escribieron.
+        return list(self.buffer)
+
+    def flush(self) -> None:
+        # Escribe y vacia los registros pendientes.
+        with self.lock:
+            lines = []
+            while self.buffer:
+                lines.append(self.format(self.buffer.popleft()))
+            if lines:
+                stream = self.stream if self.stream is not None else sys.stderr
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+
+    def start(self) -> None:
+        # Lanza el hilo que escribe el buffer fuera del bucle principal.
+        self.thread = threading.Thread(target=self.run_flusher, name="logger", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def run_flusher(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+# Registro compartido por todo el juego.
+LOGGER = Logger()
@@ -0,0 +1,33 @@
+# Modulos de python.
+import sys
+
+# Contabilidad aproximada de memoria de las entidades del juego, para
+# depurar oleadas muy grandes. Cada clase declara en OWNED_ATTRS los
+# atributos que le pertenecen solo a ella; lo compartido (ruta, imagenes,
+# rampas de barras de vida) no se cuenta.
+
+def sizeof_entity(entity) -> int:
+    # Bytes de una entidad y de los objetos que le pertenecen.
+    size = sys.getsizeof(entity)
+    for name in getattr(entity, "OWNED_ATTRS", ()):
+        value = getattr(entity, name, None)
+        if value is None:
+            continue
+        if hasattr(value, "OWNED_ATTRS"):
+            size += sizeof_entity(value)
+        else:
+            size += sys.getsizeof(value)
+    return size
+
+def measure_entities(entities) -> dict:
+    # Cantidad, bytes totales y bytes por entidad de un conjunto.
+    count = 0
+    total = 0
+    for entity in entities:
+        count += 1
+        total += sizeof_entity(entity)
+    return {
+        "count": count,
+        "bytes": total,
+        "bytes_per_entity": total // count if count else 0
+    }
@@ -0,0 +1,101 @@
+# Modulos de python.
+import sys
+import math
+from bisect import bisect_right
+from typing import List, Tuple
+
+class Path():
+    # Ruta de los enemigos precalculada por longitud de arco.
+    # Se construye una vez por nivel y la comparten todos los enemigos: cada
+    # enemigo solo guarda la distancia recorrida y de ella se obtienen su
+    # posicion y su angulo.
+    def __init__(self, waypoints: List[Tuple[float, float]]) -> None:
+        self.waypoints = [(float(x), float(y)) for x, y in waypoints]
+
+        # Distancia acumulada hasta cada waypoint (cumulative[0] == 0).
+        self.cumulative = [0.0]
+        # Direccion unitaria y angulo (grados, como pg.transform.rotate) de
+        # cada tramo i, que va de waypoints[i] a waypoints[i + 1].
+        self.directions = []
+        self.headings = []
+
+        for (x0, y0), (x1, y1) in zip(self.waypoints, self.waypoints[1:]):
+            dx = x1 - x0
+            dy = y1 - y0
+            length = math.hypot(dx, dy)
+            self.cumulative.append(self.cumulative[-1] + length)
+            if length > 0:
+                self.directions.append((dx / length, dy / length))
+            else:
+                self.directions.append((0.0, 0.0))
+            self.headings.append(math.degrees(math.atan2(-dy, dx)))
+
+        self.length = self.cumulative[-1]
+        self.segment_count = len(self.directions)
+
+    @property
+    def start(self) -> Tuple[float, float]:
+        return self.waypoints[0]
+
+    def segment_at(self, distance: float, hint: int = 0) -> int:
+        # Indice del tramo que contiene distance. Con hint (el tramo anterior
+        # del enemigo) la busqueda es O(1) amortizado, porque los enemigos
+        # solo avanzan.
+        last = self.segment_count - 1
+        if last < 0:
+            return 0
+        segment = min(max(hint, 0), last)
+        if self.cumulative[segment] > distance:
+            return min(max(bisect_right(self.cumulative, distance) - 1, 0), last)
+        while segment < last and self.cumulative[segment + 1] <= distance:
+            segment += 1
+        return segment
+
+    def point_at(self, distance: float, segment: int = None) -> Tuple[float, float]:
+        # Posicion a una distancia del inicio de la ruta.
+        if segment is None:
+            segment = self.segment_at(distance)
+        if self.segment_count == 0:
+            return self.waypoints[0]
+        x, y = self.waypoints[segment]
+        ux, uy = self.directions[segment]
+        offset = min(distance, self.length) - self.cumulative[segment]
+        return (x + ux * offset, y + uy * offset)
+
+    def heading_at(self, distance: float, segment: int = None) -> float:
+        # Angulo de avance a una distancia del inicio de la ruta.
+        if self.segment_count == 0:
+            return 0.0
+        if segment is None:
+            segment = self.segment_at(distance)
+        return self.headings[segment]
+
+    def intervals_in_circle(self, cx: float, cy: float, radius: float) -> List[Tuple[float, float]]:
+        # Tramos de la ruta, como intervalos (inicio, fin) de distancia
+        # recorrida, que quedan a menos de radius del punto (cx, cy).
+        intervals = []
+        r2 = radius * radius
+        for i, (ux, uy) in enumerate(self.directions):
+            length = self.cumulative[i + 1] - self.cumulative[i]
+            if length <= 0:
+                continue
+            # |p0 + t*u - c|^2 <= r^2  ->  t^2 + 2*b*t + q <= 0
+            x0, y0 = self.waypoints[i]
+            b = ux * (x0 - cx) + uy * (y0 - cy)
+            q = (x0 - cx) ** 2 + (y0 - cy) ** 2 - r2
+            disc = b * b - q
+            if disc < 0:
+                continue
+            root = math.sqrt(disc)
+            t0 = max(-b - root, 0.0)
+            t1 = min(-b + root, length)
+            if t0 >= t1:
+                continue
+            start = self.cumulative[i] + t0
+            end = self.cumulative[i] + t1
+            if intervals and start - intervals[-1][1] < 1e-6:
+                # Continua el intervalo del tramo anterior.
+                intervals[-1] = (intervals[-1][0], end)
+            else:
+                intervals.append((start, end))
+        return intervals
@@ -0,0 +1,101 @@
+# Modulos de python.
+import sys
+from array import array
+from typing import Dict, List, Tuple
+
+# Modulos custom.
+from utils import constants as c
+
+class PathCoverage():
+    # Tramos de la ruta al alcance de cada casilla de construccion (mascara
+    # buildable de Level), para cada rango de torreta. Se calcula una vez al
+    # cargar el nivel y se guarda en
+    # arreglos compactos por rango: offsets[i]..offsets[i + 1] son los
+    # intervalos de la casilla i (fila * ancho + columna) dentro de bounds,
+    # que guarda pares (inicio, fin) de distancia recorrida en float32.
+    def __init__(self, path, buildable, w: int, h: int, ranges) -> None:
+        self.path = path
+        self.w = w
+        self.h = h
+        size = w * h
+        # 1 para las casillas con tabla (las de construccion).
+        self.tabled = buildable
+        self.offsets: Dict[int, array] = {}
+        self.bounds: Dict[int, array] = {}
+        self.lengths: Dict[int, array] = {} # largo cubierto por casilla (px)
+        # Casillas o rangos fuera de las tablas, calculados al pedirlos.
+        self.extra: Dict[Tuple[int, int, int], List[Tuple[float, float]]] = {}
+
+        for radius in sorted(set(ranges)):
+            offsets = array('I', bytes(4 * (size + 1)))
+            bounds = array('f')
+            lengths = array('f', bytes(4 * size))
+            for i in range(size):
+                if self.tabled[i]:
+                    for start, end in self.compute(i % w, i // w, radius):
+                        bounds.append(start)
+                        bounds.append(end)
+                        lengths[i] += end - start
+                offsets[i + 1] = len(bounds) // 2
+            self.offsets[radius] = offsets
+            self.bounds[radius] = bounds
+            self.lengths[radius] = lengths
+
+    @classmethod
+    def from_tables(cls, path, w: int, h: int, tabled, tables) -> "PathCoverage":
+        # Cobertura con tablas ya calculadas (por ejemplo, de un nivel
+        # compilado). tables es {rango: (offsets, bounds, lengths)}.
+        coverage = cls.__new__(cls)
+        coverage.path = path
+        coverage.w = w
+        coverage.h = h
+        coverage.tabled = tabled
+        coverage.offsets = {radius: t[0] for radius, t in tables.items()}
+        coverage.bounds = {radius: t[1] for radius, t in tables.items()}
+        coverage.lengths = {radius: t[2] for radius, t in tables.items()}
+        coverage.extra = {}
+        return coverage
+
+    def get_tables(self, radius: int):
+        # Tablas (offsets, bounds, lengths) de un rango.
+        return self.offsets[radius], self.bounds[radius], self.lengths[radius]
+
+    def compute(self, tile_x: int, tile_y: int, radius: float) -> List[Tuple[float, float]]:
+        # Intervalos de la ruta al alcance del centro de una casilla.
+        return self.path.intervals_in_circle((tile_x + 0.5) * c.TILE_SIZE,
+                                             (tile_y + 0.5) * c.TILE_SIZE, radius)
+
+    def get_index(self, tile_x: int, tile_y: int, radius: int):
+        # Indice de la casilla en las tablas de radius, o None si no tiene.
+        if radius not in self.offsets or not (0 <= tile_x < self.w and 0 <= tile_y < self.h):
+            return None
+        i = tile_y * self.w + tile_x
+        return i if self.tabled[i] else None
+
+    def get(self, tile_x: int, tile_y: int, radius: int) -> List[Tuple[float, float]]:
+        # Intervalos (inicio, fin) de una casilla y un rango. Para casillas
+        # sin tabla (torretas fuera de las casillas de construccion) o rangos
+        # nuevos se calculan una vez y se guardan.
+        i = self.get_index(tile_x, tile_y, radius)
+        if i is not None:
+            offsets = self.offsets[radius]
+            bounds = self.bounds[radius]
+            return [(bounds[2 * k], bounds[2 * k + 1]) for k in range(offsets[i], offsets[i + 1])]
+        key = (tile_x, tile_y, radius)
+        intervals = self.extra.get(key)
+        if intervals is None:
+            intervals = self.extra[key] = self.compute(tile_x, tile_y, radius)
+        return intervals
+
+    def get_length(self, tile_x: int, tile_y: int, radius: int) -> float:
+        # Largo de ruta cubierto por una casilla y un rango, en px.
+        i = self.get_index(tile_x, tile_y, radius)
+        if i is not None:
+            return self.lengths[radius][i]
+        return sum(end - start for start, end in self.get(tile_x, tile_y, radius))
+
+    def get_fraction(self, tile_x: int, tile_y: int, radius: int) -> float:
+        # Fraccion de la ruta cubierta (0 a 1).
+        if self.path.length <= 0:
+            return 0.0
+        return self.get_length(tile_x, tile_y, radius) / self.path.length
@@ -0,0 +1,189 @@
+# Modulos de python.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple
+
+# Modulos custom.
+from utils import constants as c
+from data.turret_data import TURRET_DATA
+from data.enemy_data import ENEMY_DATA
+from data.wave_data import WAVE_DATA
+from classes.turret import Turret
+from classes.simulation import TURRET_COSTS, create_headless_simulation
+
+class PlacementOption():
+    # Una torreta candidata: tipo y nivel en una casilla, con su costo total
+    # (compra y mejoras) y su puntaje analitico.
+    __slots__ = ("tile", "type", "level", "cost", "coverage", "score")
+
+    def __init__(self, tile, turret_type, level, cost, coverage, score) -> None:
+        self.tile = tile
+        self.type = turret_type
+        self.level = level
+        self.cost = cost
+        self.coverage = coverage # largo de ruta dentro del rango (px)
+        self.score = score       # danio esperado a cada enemigo que pasa
+
+    def to_entry(self) -> Dict:
+        # Elemento de layout como lo leen simulate.py y balance.py.
+        entry = {"type": self.type, "tile": list(self.tile)}
+        if self.level > 1:
+            entry["level"] = self.level
+        return entry
+
+class PlacementOptimizer():
+    # Busca disposiciones de torretas para un nivel dentro de un presupuesto.
+    # Primero puntua cada torreta posible con un modelo analitico (largo de
+    # ruta cubierto por el rango, danio por segundo y danio en area) y arma
+    # disposiciones con busqueda en haz; luego, opcionalmente, verifica las
+    # mejores con partidas sin ventana en paralelo, descartando por etapas
+    # las que van claramente peor.
+    def __init__(self,
+                 level,                  # Level con path y tiles
+                 budget: int,
+                 turret_costs: Dict[str, int] = TURRET_COSTS,
+                 turret_data=TURRET_DATA,
+                 enemy_data=ENEMY_DATA,
+                 wave_data=WAVE_DATA,
+                 occupied=()             # casillas ya ocupadas
+                 ) -> None:
+        self.level = level
+        self.budget = budget
+        self.turret_costs = turret_costs
+        self.turret_data = turret_data
+        self.enemy_data = enemy_data
+        self.wave_data = wave_data
+        self.occupied = set(occupied)
+
+        # Separacion media entre enemigos de una oleada, en px de ruta.
+        speeds = [d["speed"] for d in enemy_data.values()]
+        self.mean_speed = sum(speeds) / len(speeds)
+        self.spacing = self.mean_speed * wave_data["spawn_gap"] / 1000.0
+
+        self.options = self.build_options()
+
+    def get_buildable_tiles(self) -> List[Tuple[int, int]]:
+        # Casillas donde se puede construir y que no estan ocupadas.
+        level = self.level
+        return [(x, y) for y in range(level.h) for x in range(level.w)
+                if level.is_free(x, y) and (x, y) not in self.occupied]
+
+    def score_stats(self, stats: Dict, coverage: float) -> float:
+        # Danio esperado a un enemigo que cruza el rango a velocidad media; el
+        # danio en area cuenta los vecinos que caben en el radio.
+        dps = stats["damage"] * 1000.0 / stats["cooldown"]
+        splash = 1.0 + 2.0 * stats["splash_radius"] / self.spacing
+        return dps * coverage / self.mean_speed * splash
+
+    def build_options(self) -> List[PlacementOption]:
+        # Todas las torretas posibles (casilla, tipo, nivel) que cubren ruta.
+        # Cobertura precalculada del nivel (PathCoverage).
+        coverage_map = self.level.coverage
+        options = []
+        for tile in self.get_buildable_tiles():
+            for turret_type, base_cost in self.turret_costs.items():
+                levels = self.turret_data[turret_type]
+                cost = base_cost
+                for level in range(1, min(len(levels), Turret.level_limit) + 1):
+                    if level > 1:
+                        # Igual que Turret.get_upgrade_cost.
+                        cost += levels[level - 1].get("upgrade_cost", 0)
+                    if cost > self.budget:
+                        break
+                    stats = levels[level - 1]
+                    coverage = coverage_map.get_length(tile[0], tile[1], stats["range"])
+                    if coverage <= 0:
+                        continue
+                    options.append(PlacementOption(tile, turret_type, level, cost, coverage,
+                                                   self.score_stats(stats, coverage)))
+        return options
+
+    def search(self, count: int = 10, beam_width: int = 32,
+               max_options: int = 64) -> List[Dict]:
+        # Busqueda en haz sobre las max_options torretas mas eficientes
+        # (puntaje por costo). Devuelve las count mejores disposiciones segun
+        # el modelo analitico, de mayor a menor puntaje.
+        options = sorted(self.options, key=lambda o: o.score / o.cost, reverse=True)[:max_options]
+        # Estado: (puntaje, costo, casillas usadas, indices elegidos).
+        beam = [(0.0, 0, frozenset(), ())]
+        seen = {}
+        while beam:
+            expanded = []
+            for score, cost, used, chosen in beam:
+                start = chosen[-1] + 1 if chosen else 0
+                for i in range(start, len(options)):
+                    option = options[i]
+                    if option.tile in used or cost + option.cost > self.budget:
+                        continue
+                    key = chosen + (i,)
+                    if key in seen:
+                        continue
+                    state = (score + option.score, cost + option.cost,
+                             used | {option.tile}, key)
+                    seen[key] = state
+                    expanded.append(state)
+            expanded.sort(key=lambda s: s[0], reverse=True)
+            beam = expanded[:beam_width]
+
+        ranked = sorted(seen.values(), key=lambda s: (s[0], -s[1]), reverse=True)[:count]
+        return [{"layout": [options[i].to_entry() for i in chosen],
+                 "cost": cost, "score": score}
+                for score, cost, used, chosen in ranked]
+
+    def evaluate(self, candidates: List[Dict], stages=(0.25, 0.5, 1.0),
+                 keep: float = 0.5, workers: int = None, dt: float = c.SIM_STEP,
+                 duration: int = 300) -> List[Dict]:
+        # Juega cada candidata en partidas sin ventana repartidas en un pool
+        # de procesos. En cada etapa se corre hasta esa fraccion de la partida
+        # y solo la fraccion keep mejor pasa a la siguiente (las descartadas
+        # conservan su ultimo resultado). Devuelve todas, de mejor a peor.
+        workers = workers or os.cpu_count() or 1
+        alive = list(candidates)
+        finished = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(self.level.data, self.enemy_data,
+                                           self.wave_data)) as pool:
+            for n, stage in enumerate(stages):
+                max_time = duration * stage if stage < 1 else None
+                tasks = [(candidate["layout"], dt, duration, max_time) for candidate in alive]
+                for candidate, result in zip(alive, pool.map(simulate_layout, tasks)):
+                    candidate["simulation"] = result
+                    candidate["stage"] = n + 1
+                alive.sort(key=result_key, reverse=True)
+                if n < len(stages) - 1:
+                    cut = max(1, int(len(alive) * keep))
+                    finished = alive[cut:] + finished
+                    alive = alive[:cut]
+        return alive + finished
+
+    def optimize(self, count: int = 5, candidates: int = 16, simulate: bool = True,
+                 **kwargs) -> List[Dict]:
+        # Disposiciones recomendadas: las mejores del modelo analitico,
+        # verificadas con simulacion si simulate es True.
+        ranked = self.search(max(count, candidates) if simulate else count)
+        if simulate and ranked:
+            ranked = self.evaluate(ranked, **kwargs)
+        return ranked[:count]
+
+def result_key(candidate: Dict) -> tuple:
+    # Orden de las partidas simuladas: victoria, vida de la base, enemigos
+    # eliminados y tiempo sobrevivido; a igualdad, el modelo analitico.
+    result = candidate["simulation"]
+    return (candidate["stage"], result["victory"], result["base_health"],
+            result["stats"]["enemies_killed"], result["sim_time"], candidate["score"])
+
+# Datos del nivel en cada proceso trabajador (se envian una sola vez).
+worker_setup = {}
+
+def init_worker(level_data, enemy_data, wave_data) -> None:
+    worker_setup.update(level_data=level_data, enemy_data=enemy_data, wave_data=wave_data)
+
+def simulate_layout(task) -> Dict:
+    # Juega una disposicion hasta max_time segundos de simulacion.
+    layout, dt, duration, max_time = task
+    sim = create_headless_simulation(layout=layout,
+                                     level_data=worker_setup["level_data"],
+                                     enemy_data=worker_setup["enemy_data"],
+                                     wave_data=worker_setup["wave_data"],
+                                     game_duration=duration)
+    return sim.run(dt, max_time)
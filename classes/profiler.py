@@ -0,0 +1,143 @@
+# Modulos de python.
+import sys
+from time import perf_counter_ns
+from collections import deque
+
+# Modulos de pygame.
+import pygame as pg
+from pygame.locals import *
+
+# Modulos custom.
+from utils import constants as c
+from classes.text_cache import get_font
+from config import FONTS_DIR
+
+class Profiler():
+    # Tiempos por fase del frame medidos con perf_counter_ns en ventanas
+    # moviles de las ultimas muestras. Deshabilitado, begin() y end() solo
+    # revisan un booleano, asi que puede quedar siempre en el codigo.
+    def __init__(self,
+                 enabled: bool = False,
+                 samples: int = c.PROFILER_SAMPLES # muestras por fase
+                 ) -> None:
+        self.enabled = enabled
+        self.samples = samples
+        self.timings = {} # fase -> deque de duraciones (ns)
+        self.starts = {}  # fase -> inicio de la medicion en curso
+        self.counts = {}  # nombre -> cantidad de entidades
+        self.frame_times = deque(maxlen=samples) # duracion de cada frame (ns)
+        self.last_frame = None
+
+        # Imagen del overlay; se recompone cada PROFILER_REFRESH ms.
+        self.overlay = None
+        self.overlay_time = 0
+
+    def toggle(self) -> None:
+        # Activa o desactiva la medicion y el overlay.
+        self.enabled = not self.enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.starts.clear()
+        self.counts.clear()
+        self.frame_times.clear()
+        self.last_frame = None
+        self.overlay = None
+
+    def begin(self, phase: str) -> None:
+        # Empieza a medir una fase.
+        if self.enabled:
+            self.starts[phase] = perf_counter_ns()
+
+    def end(self, phase: str) -> None:
+        # Termina de medir una fase y guarda la muestra.
+        if not self.enabled:
+            return
+        start = self.starts.pop(phase, None)
+        if start is None:
+            return
+        timing = self.timings.get(phase)
+        if timing is None:
+            timing = self.timings[phase] = deque(maxlen=self.samples)
+        timing.append(perf_counter_ns() - start)
+
+    def count(self, name: str, value: int) -> None:
+        # Registra una cantidad de entidades para el overlay.
+        if self.enabled:
+            self.counts[name] = value
+
+    def frame(self) -> None:
+        # Marca el final de un frame para la tendencia de FPS.
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        if self.last_frame is not None:
+            self.frame_times.append(now - self.last_frame)
+        self.last_frame = now
+
+    def get_percentiles(self, phase: str) -> tuple:
+        # p50, p95 y p99 de una fase, en milisegundos.
+        values = sorted(self.timings.get(phase, ()))
+        if not values:
+            return (0.0, 0.0, 0.0)
+        last = len(values) - 1
+        return tuple(values[int(last * p)] / 1e6 for p in (0.50, 0.95, 0.99))
+
+    def get_fps(self) -> float:
+        # FPS promedio de la ventana.
+        if not self.frame_times:
+            return 0.0
+        return 1e9 * len(self.frame_times) / sum(self.frame_times)
+
+    def get_report(self) -> dict:
+        # Resumen para reportes: percentiles por fase, conteos y FPS.
+        return {
+            "phases": {phase: dict(zip(("p50", "p95", "p99"), self.get_percentiles(phase)))
+                       for phase in sorted(self.timings)},
+            "counts": dict(self.counts),
+            "fps": self.get_fps()
+        }
+
+    def build_overlay(self) -> pg.Surface:
+        # Compone el overlay con una fila por fase y la grafica de FPS.
+        font = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 16)
+        # Filas de celdas: texto de la izquierda y columnas alineadas a la derecha.
+        rows = [(f"FPS {self.get_fps():.1f}", "p50", "p95", "p99 ms")]
+        for phase in sorted(self.timings):
+            rows.append((phase,) + tuple(f"{value:.2f}" for value in self.get_percentiles(phase)))
+        if self.counts:
+            rows.append(("  ".join(f"{name}: {value}" for name, value in self.counts.items()),))
+
+        line_h = font.get_linesize()
+        graph_h = 40
+        width = 300
+        columns = (180, 230, 290) # borde derecho de cada columna
+        overlay = pg.Surface((width, line_h * len(rows) + graph_h + 12), SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 4 + i * line_h
+            overlay.blit(font.render(row[0], True, c.COLOUR_CREAM), (6, y))
+            for right, cell in zip(columns, row[1:]):
+                cell_surf = font.render(cell, True, c.COLOUR_CREAM)
+                overlay.blit(cell_surf, cell_surf.get_rect(topright=(right, y)))
+
+        # Tendencia: duracion de cada frame, 33 ms arriba del todo.
+        if len(self.frame_times) > 1:
+            top = 8 + line_h * len(rows)
+            step = (width - 12) / (self.frame_times.maxlen - 1)
+            points = [(6 + i * step, top + graph_h - min(t / 33.3e6, 1.0) * graph_h)
+                      for i, t in enumerate(self.frame_times)]
+            pg.draw.lines(overlay, c.COLOUR_GREEN, False, points)
+        return overlay
+
+    def draw(self, surface: pg.Surface) -> pg.Rect:
+        # Dibuja el overlay en la esquina superior izquierda.
+        now = pg.time.get_ticks()
+        if self.overlay is None or now - self.overlay_time >= c.PROFILER_REFRESH:
+            self.overlay = self.build_overlay()
+            self.overlay_time = now
+        return surface.blit(self.overlay, (8, 8))
+
+# Profiler compartido por la maquina de estados y la simulacion.
+PROFILER = Profiler()
@@ -0,0 +1,229 @@
+# Modulos de python.
+import sys
+import math
+
+# Modulos de pygame.
+import pygame as pg
+from pygame.locals import *
+
+# NumPy es opcional: sin el, los proyectiles se avanzan uno por uno.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Modulos custom.
+from utils import constants as c
+from data.projectile_data import PROJECTILE_DATA
+from classes.rotation_cache import ROTATION_CACHE
+
+# Tipos de proyectil.
+ARROW = 0
+SHELL = 1
+KINDS = {"arrow": ARROW, "shell": SHELL}
+
+# Imagenes de los proyectiles, creadas la primera vez que se dibujan.
+projectile_images = {}
+
+def get_projectile_images() -> dict:
+    # Devuelve las imagenes de flecha, bala y sombra de la bala.
+    if not projectile_images:
+        arrow = pg.Surface((14, 3), SRCALPHA)
+        arrow.fill(c.COLOUR_DARK_BROWN)
+        arrow.fill(c.COLOUR_CREAM, (11, 0, 3, 3))
+        shell = pg.Surface((9, 9), SRCALPHA)
+        pg.draw.circle(shell, c.COLOUR_BLACK, (4, 4), 4)
+        shadow = pg.Surface((10, 5), SRCALPHA)
+        pg.draw.ellipse(shadow, (0, 0, 0, 90), shadow.get_rect())
+        projectile_images["arrow"] = arrow
+        projectile_images["shell"] = shell
+        projectile_images["shadow"] = shadow
+    return projectile_images
+
+class ProjectilePool():
+    # Proyectiles en vuelo guardados como arreglos paralelos de capacidad
+    # fija (un slot por proyectil), para disparar sin crear objetos. Con
+    # NumPy, update() avanza el tiempo y detecta los impactos de todos en
+    # operaciones sobre los arreglos y draw() calcula las posiciones de una
+    # vez; solo los que impactan pasan por Python. Sin NumPy se usan listas.
+    # Las flechas siguen a su objetivo y danian solo a el; las balas de
+    # mortero caen donde estaba el objetivo al disparar y danian en area.
+    def __init__(self,
+                 events, # EventQueue donde se publican los impactos
+                 capacity: int = c.PROJECTILE_CAPACITY,
+                 sound_manager=None # None para simular sin audio
+                 ) -> None:
+        self.events = events
+        self.capacity = capacity
+        self.sound_manager = sound_manager
+
+        if np is not None:
+            self.kind = np.zeros(capacity, dtype=np.int8)
+            self.start_x = np.zeros(capacity)
+            self.start_y = np.zeros(capacity)
+            self.end_x = np.zeros(capacity)
+            self.end_y = np.zeros(capacity)
+            self.elapsed = np.zeros(capacity)  # segundos en vuelo
+            self.duration = np.ones(capacity)  # segundos hasta el impacto
+            self.arc_height = np.zeros(capacity)
+        else:
+            self.kind = [ARROW] * capacity
+            self.start_x = [0.0] * capacity
+            self.start_y = [0.0] * capacity
+            self.end_x = [0.0] * capacity
+            self.end_y = [0.0] * capacity
+            self.elapsed = [0.0] * capacity
+            self.duration = [1.0] * capacity
+            self.arc_height = [0.0] * capacity
+        self.damage = [0] * capacity
+        self.splash_radius = [0] * capacity
+        self.targets = {} # slot -> enemy seguido (solo mientras vive)
+
+        self.live = []  # slots en vuelo, en orden de disparo
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.last_dt = 0.0
+        self.overflow = 0 # disparos resueltos al instante por falta de slots
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def clear(self) -> None:
+        # Elimina todos los proyectiles en vuelo.
+        self.targets.clear()
+        self.live = []
+        self.free_slots = list(range(self.capacity - 1, -1, -1))
+        self.overflow = 0
+
+    def play_sound(self, name: str) -> None:
+        if self.sound_manager is not None:
+            self.sound_manager.play_sound(name)
+
+    def fire(self, turret_type: str, x: float, y: float, target, damage, splash_radius,
+             enemy_group) -> None:
+        # Lanza el proyectil de una torreta desde (x, y) hacia target.
+        data = PROJECTILE_DATA[turret_type]
+        kind = KINDS[data["kind"]]
+        end_x, end_y = target.pos
+        if not self.free_slots:
+            # Sin espacio: el disparo impacta de inmediato.
+            self.overflow += 1
+            self.impact(kind, end_x, end_y, target, damage, splash_radius, enemy_group)
+            return
+
+        slot = self.free_slots.pop()
+        self.kind[slot] = kind
+        self.start_x[slot] = x
+        self.start_y[slot] = y
+        self.end_x[slot] = end_x
+        self.end_y[slot] = end_y
+        self.elapsed[slot] = 0.0
+        self.duration[slot] = max(math.hypot(end_x - x, end_y - y) / data["speed"], 1e-6)
+        self.arc_height[slot] = data.get("arc_height", 0)
+        self.damage[slot] = damage
+        self.splash_radius[slot] = splash_radius
+        self.targets[slot] = target
+        self.live.append(slot)
+
+    def impact(self, kind, x, y, target, damage, splash_radius, enemy_group) -> None:
+        # Aplica el danio de un proyectil que llego a (x, y).
+        if kind == SHELL and splash_radius > 0:
+            for enemy in enemy_group.find_in_range(x, y, splash_radius):
+                self.events.damage(enemy, damage)
+            self.play_sound("mortar_explosion")
+        elif target is not None and target.alive():
+            self.events.damage(target, damage)
+
+    def follow_targets(self) -> None:
+        # Las flechas apuntan a la posicion actual de su objetivo. Si el
+        # objetivo murio o escapo el proyectil sigue hasta su ultimo destino
+        # y no se guarda la referencia.
+        slots = []
+        xs = []
+        ys = []
+        for slot, target in list(self.targets.items()):
+            if not target.alive():
+                del self.targets[slot]
+            elif self.kind[slot] == ARROW:
+                x, y = target.pos
+                slots.append(slot)
+                xs.append(x)
+                ys.append(y)
+        if np is not None:
+            self.end_x[slots] = xs
+            self.end_y[slots] = ys
+        else:
+            for slot, x, y in zip(slots, xs, ys):
+                self.end_x[slot] = x
+                self.end_y[slot] = y
+
+    def advance(self, dt: float) -> list:
+        # Suma dt al tiempo de vuelo y devuelve los slots que llegaron, en
+        # orden de disparo; self.live queda con los que siguen volando.
+        if np is not None:
+            live = np.array(self.live, dtype=np.intp)
+            self.elapsed[live] += dt
+            landed = self.elapsed[live] >= self.duration[live]
+            self.live = live[~landed].tolist()
+            return live[landed].tolist()
+        hits = []
+        still_flying = []
+        for slot in self.live:
+            self.elapsed[slot] += dt
+            if self.elapsed[slot] < self.duration[slot]:
+                still_flying.append(slot)
+            else:
+                hits.append(slot)
+        self.live = still_flying
+        return hits
+
+    def update(self, dt: float, enemy_group) -> None:
+        # Avanza todos los proyectiles dt segundos y resuelve los impactos.
+        self.last_dt = dt
+        if not self.live:
+            return
+        self.follow_targets()
+        for slot in self.advance(dt):
+            self.impact(self.kind[slot], float(self.end_x[slot]), float(self.end_y[slot]),
+                        self.targets.pop(slot, None), self.damage[slot],
+                        self.splash_radius[slot], enemy_group)
+            self.free_slots.append(slot)
+
+    def get_positions(self, back: float):
+        # Fraccion de vuelo t, posicion (x, y) y direccion (dx, dy) de cada
+        # proyectil en vuelo, back segundos antes del ultimo paso.
+        if np is not None:
+            live = np.array(self.live, dtype=np.intp)
+            t = np.clip((self.elapsed[live] - back) / self.duration[live], 0.0, 1.0)
+            dx = self.end_x[live] - self.start_x[live]
+            dy = self.end_y[live] - self.start_y[live]
+            x = self.start_x[live] + dx * t
+            y = self.start_y[live] + dy * t
+            return zip(self.live, t.tolist(), x.tolist(), y.tolist(), dx.tolist(), dy.tolist())
+        rows = []
+        for slot in self.live:
+            t = min(max(self.elapsed[slot] - back, 0.0) / self.duration[slot], 1.0)
+            dx = self.end_x[slot] - self.start_x[slot]
+            dy = self.end_y[slot] - self.start_y[slot]
+            rows.append((slot, t, self.start_x[slot] + dx * t, self.start_y[slot] + dy * t, dx, dy))
+        return rows
+
+    def draw(self, surface: pg.Surface, alpha: float = 1.0) -> list:
+        # Dibuja todos los proyectiles en una sola llamada a blits y devuelve
+        # los rectangulos ocupados.
+        if not self.live:
+            return []
+        images = get_projectile_images()
+        back = (1.0 - alpha) * self.last_dt
+        blits = []
+        for slot, t, x, y, dx, dy in self.get_positions(back):
+            if self.kind[slot] == ARROW:
+                image = ROTATION_CACHE.get(images["arrow"], math.degrees(math.atan2(-dy, dx)))
+            else:
+                # Parabola sobre la linea de vuelo; la sombra marca el suelo.
+                shadow = images["shadow"]
+                blits.append((shadow, shadow.get_rect(center=(x, y))))
+                image = images["shell"]
+                y -= 4 * float(self.arc_height[slot]) * t * (1 - t)
+            blits.append((image, image.get_rect(center=(x, y))))
+        surface.blits(blits, False)
+        return [rect for _, rect in blits]
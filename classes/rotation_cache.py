@@ -0,0 +1,41 @@
+# Modulos de python.
+import sys
+
+# Modulos de pygame.
+import pygame as pg
+
+# Modulos custom.
+from utils import constants as c
+
+class RotationCache():
+    # Cache de imagenes rotadas, con el angulo cuantizado a un numero fijo de
+    # pasos. Dibujar una entidad rotada pasa a ser una busqueda y un blit en
+    # lugar de crear una Surface nueva cada frame.
+    def __init__(self, steps: int = c.ROTATION_STEPS) -> None:
+        self.steps = steps
+        self.step_angle = 360.0 / steps
+        self.images = {} # (imagen original, paso) -> imagen rotada
+
+    def quantize(self, angle: float) -> int:
+        # Paso mas cercano al angulo (grados).
+        return int(round(angle / self.step_angle)) % self.steps
+
+    def get(self, image: pg.Surface, angle: float) -> pg.Surface:
+        # Devuelve la imagen rotada al paso mas cercano, creandola si falta.
+        key = (image, self.quantize(angle))
+        rotated = self.images.get(key)
+        if rotated is None:
+            rotated = pg.transform.rotate(image, key[1] * self.step_angle)
+            self.images[key] = rotated
+        return rotated
+
+    def warm(self, image: pg.Surface) -> None:
+        # Precalcula todas las rotaciones de una imagen.
+        for step in range(self.steps):
+            self.get(image, step * self.step_angle)
+
+    def clear(self) -> None:
+        self.images.clear()
+
+# Cache compartida por enemigos y torretas.
+ROTATION_CACHE = RotationCache()
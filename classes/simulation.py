@@ -0,0 +1,327 @@
+# Modulos de python.
+import sys
+from typing import List, Dict
+
+# Modulos de pygame.
+import pygame as pg
+
+# Modulos custom.
+from classes.level import Level, load_level_data
+from classes.turret import Turret
+from classes.enemy import EnemyGroup
+from classes.memory_stats import measure_entities
+from classes.enemy_store import EnemyStore
+from classes.wave_manager import WaveManager
+from classes.projectile import ProjectilePool
+from classes.event_queue import EventQueue, DEATH, ESCAPE, REWARD
+from classes.profiler import PROFILER
+from data.enemy_data import ENEMY_DATA
+from data.wave_data import WAVE_DATA
+from utils import constants as c
+
+# Costos base de compra de cada torreta.
+TURRET_COSTS = {
+    "shortbow": 100,
+    "longbow": 150,
+    "mortar": 200
+}
+
+class Simulation():
+    # Nucleo de reglas de la defensa de torres, sin video ni audio obligatorios.
+    # Todo avanza con un unico reloj de simulacion (self.time, en ms) que solo
+    # se mueve con step(), por lo que una partida puede correr tan rapido como
+    # permita el CPU.
+    def __init__(self,
+                 level: Level,
+                 enemy_types: Dict[str, tuple], # nombre -> (imagen, vida, velocidad, recompensa)
+                 turret_costs: Dict[str, int] = TURRET_COSTS,
+                 game_duration: int = 300,       # segundos
+                 start_money: int = 200,
+                 sound_manager=None,             # None para simular sin audio
+                 use_enemy_store: bool = False,  # enemigos en arreglos NumPy
+                 wave_data: Dict = WAVE_DATA     # curva de oleadas
+                 ) -> None:
+        self.level = level
+        self.enemy_types = enemy_types
+        self.turret_costs = turret_costs
+        self.game_duration = game_duration
+        self.wave_data = wave_data
+        self.sound_manager = sound_manager
+
+        # Danio, muertes, escapes y recompensas pasan por una sola cola.
+        self.events = EventQueue()
+        self.turret_group = pg.sprite.Group()
+        if use_enemy_store:
+            self.enemy_group = EnemyStore(self.level.path, self.events)
+        else:
+            self.enemy_group = EnemyGroup(self.level.path, self.events)
+        self.projectiles = ProjectilePool(self.events, sound_manager=self.sound_manager)
+
+        self.multipliers = {"purchase_cost": 1.0, "upgrade_cost": 1.0,
+                            "cooldown": 1.0, "damage": 1.0}
+        self.start_money = start_money
+
+        self.reset()
+
+    def reset(self) -> None:
+        # Reinicia la partida a sus valores iniciales.
+        self.turret_group.empty()
+        self.level.clear_occupants()
+        self.enemy_group.empty()
+        self.projectiles.clear()
+        self.events.clear()
+        self.time = 0.0
+        self.tick = 0          # pasos corridos (marca de las acciones grabadas)
+        self.accumulator = 0.0 # tiempo real pendiente de simular (segundos)
+        self.money = self.start_money
+        self.base_health = 10
+        self.game_over = False
+        self.wave_manager = WaveManager(self.enemy_group, self.enemy_types,
+                                        self.game_duration, self.wave_data)
+
+        # Estadisticas de la partida.
+        self.stats = {
+            "waves_completed": 0,
+            "enemies_killed": 0,
+            "money_spent": 0,
+            "money_earned": 0,
+            "time_played": 0.0
+        }
+        self.start_time = None
+        self.end_time = None
+
+    @property
+    def victory(self) -> bool:
+        return self.wave_manager.victory
+
+    @property
+    def finished(self) -> bool:
+        # La partida termino (derrota o victoria).
+        return self.game_over or self.wave_manager.victory
+
+    def play_sound(self, name: str) -> None:
+        # Reproduce un sonido solo si hay audio disponible.
+        if self.sound_manager is not None:
+            self.sound_manager.play_sound(name)
+
+    def start(self) -> None:
+        # Inicia las oleadas.
+        self.wave_manager.start()
+        self.start_time = self.time
+
+    def finish(self) -> None:
+        # Registra el final de la partida y cierra las estadisticas.
+        self.end_time = self.time
+        if self.start_time is not None:
+            self.stats["time_played"] = (self.end_time - self.start_time) / 1000.0
+        self.stats["waves_completed"] = self.wave_manager.wave_number
+
+    def set_multipliers(self, multipliers) -> None:
+        # Aplica multiplicadores por mejoras de edificios.
+        self.multipliers = multipliers
+
+    def set_initial_money(self, money) -> None:
+        self.money = money
+        self.start_money = money
+
+    def get_purchase_cost(self, turret_type: str) -> int:
+        # Costo real de compra con los multiplicadores aplicados.
+        return int(self.turret_costs[turret_type] * self.multipliers["purchase_cost"])
+
+    def get_turret_at(self, tile_x, tile_y):
+        # Devuelve la torreta de una casilla, o None.
+        return self.level.get_occupant(tile_x, tile_y)
+
+    def is_tile_occupied(self, tile_x, tile_y) -> bool:
+        # Verifica si una casilla ya tiene una torreta.
+        return self.get_turret_at(tile_x, tile_y) is not None
+
+    def add_turret(self, turret_type: str, tile_x: int, tile_y: int, image=None) -> Turret:
+        # Coloca una torreta sin cobrarla.
+        turret = Turret(image, tile_x, tile_y, turret_type, self.sound_manager, self.time,
+                        self.level.coverage)
+        turret.cooldown = int(turret.cooldown * self.multipliers["cooldown"])
+        turret.damage = int(turret.damage * self.multipliers["damage"])
+        self.turret_group.add(turret)
+        self.level.occupy(tile_x, tile_y, turret)
+        return turret
+
+    def remove_turret(self, turret: Turret) -> None:
+        # Quita una torreta y libera su casilla.
+        turret.kill()
+        self.level.vacate(turret.tile_x, turret.tile_y, turret)
+
+    def buy_turret(self, turret_type: str, tile_x: int, tile_y: int, image=None):
+        # Compra y coloca una torreta. Devuelve None si no se pudo.
+        cost = self.get_purchase_cost(turret_type)
+        if self.money < cost or self.is_tile_occupied(tile_x, tile_y):
+            return None
+        turret = self.add_turret(turret_type, tile_x, tile_y, image)
+        self.money -= cost
+        self.stats["money_spent"] += cost
+        return turret
+
+    def upgrade_turret(self, turret: Turret) -> bool:
+        # Mejora una torreta si hay dinero suficiente.
+        base_cost = turret.get_upgrade_cost()
+        if not base_cost:
+            return False
+        cost = int(base_cost * self.multipliers["upgrade_cost"])
+        if self.money < cost:
+            return False
+        turret.upgrade()
+        # upgrade() carga los valores base del nuevo nivel.
+        turret.cooldown = int(turret.cooldown * self.multipliers["cooldown"])
+        turret.damage = int(turret.damage * self.multipliers["damage"])
+        self.money -= cost
+        self.stats["money_spent"] += cost
+        return True
+
+    def enemy_escaped(self) -> None:
+        # Reduce la vida de la base cuando un enemigo escapa.
+        if self.game_over:
+            return
+        self.base_health -= 1
+        if self.base_health <= 0:
+            self.play_sound("game_over")
+            self.game_over = True
+            return
+        self.play_sound("enemy_escape")
+
+    def step(self, dt: float) -> None:
+        # Avanza la simulacion dt segundos.
+        if self.finished:
+            return
+        self.time += dt * 1000.0
+        self.tick += 1
+
+        PROFILER.begin("sim.enemies")
+        self.enemy_group.update(dt)
+        self.wave_manager.update(dt)
+        PROFILER.end("sim.enemies")
+        # Un solo indice espacial por tick para objetivos y danio en area.
+        PROFILER.begin("sim.index")
+        self.enemy_group.build_index()
+        PROFILER.end("sim.index")
+
+        PROFILER.begin("sim.turrets")
+        for turret in self.turret_group:
+            turret.update(self.enemy_group, self.time, self.projectiles)
+        PROFILER.end("sim.turrets")
+        PROFILER.begin("sim.projectiles")
+        self.projectiles.update(dt, self.enemy_group)
+        PROFILER.end("sim.projectiles")
+        # Torretas y proyectiles ya soltaron a los enemigos que salieron del juego.
+        self.enemy_group.recycle()
+
+        PROFILER.begin("sim.events")
+        self.process_events()
+        PROFILER.end("sim.events")
+
+        if self.wave_manager.victory and self.end_time is None:
+            self.play_sound("victory")
+            self.finish()
+
+        if self.game_over and self.end_time is None:
+            self.finish()
+
+    def process_events(self) -> None:
+        # Vacia la cola de eventos del tick. Las muertes publican su
+        # recompensa, que se procesa en la siguiente vuelta del mismo tick.
+        while self.events:
+            for kind, enemy, amount in self.events.drain():
+                if kind == DEATH:
+                    enemy.kill()
+                    self.stats["enemies_killed"] += 1
+                    self.events.post(REWARD, enemy, amount)
+                elif kind == REWARD:
+                    self.money += amount
+                    self.stats["money_earned"] += amount
+                elif kind == ESCAPE:
+                    self.enemy_escaped()
+
+    def advance(self, dt: float, speed: int = 1, step: float = c.SIM_STEP,
+                before_step=None) -> float:
+        # Avanza la simulacion con paso fijo: el tiempo real del frame se
+        # acumula y se consume en pasos de step segundos, speed veces mas
+        # rapido. Devuelve la fraccion de paso sobrante (0 a 1) para
+        # interpolar el dibujo entre el paso anterior y el actual.
+        # before_step() se llama antes de cada paso y devuelve False para
+        # cortar el avance (repeticiones grabadas que pausan la partida).
+        self.accumulator += min(dt, c.MAX_FRAME_TIME) * speed
+        while self.accumulator >= step:
+            if before_step is not None and not before_step():
+                break
+            self.step(step)
+            self.accumulator -= step
+        if self.finished:
+            self.accumulator = 0.0
+            return 1.0
+        return self.accumulator / step
+
+    def run(self, dt: float = c.SIM_STEP, max_time: float = None) -> Dict:
+        # Corre la partida hasta que termine, sin esperar al reloj real.
+        # max_time (segundos de simulacion) corta partidas que no terminan.
+        if not self.wave_manager.started:
+            self.start()
+        while not self.finished:
+            if max_time is not None and self.time >= max_time * 1000.0:
+                self.finish()
+                break
+            self.step(dt)
+        return self.get_result()
+
+    def get_memory_report(self) -> Dict:
+        # Memoria aproximada de las entidades vivas y reservadas, por tipo.
+        entities = {
+            "Turret": measure_entities(self.turret_group),
+            "Enemy": measure_entities(self.enemy_group)
+        }
+        total = entities["Turret"]["bytes"] + entities["Enemy"]["bytes"]
+        pool = getattr(self.enemy_group, "pool", None)
+        if pool is not None:
+            entities["EnemyPool"] = measure_entities(
+                enemy for free in pool.free.values() for enemy in free)
+            total += entities["EnemyPool"]["bytes"]
+        else:
+            array_bytes = self.enemy_group.get_array_bytes()
+            entities["EnemyStore"] = {"count": self.enemy_group.capacity,
+                                      "bytes": array_bytes,
+                                      "bytes_per_entity": array_bytes // max(self.enemy_group.capacity, 1)}
+            total += array_bytes
+        return {"entities": entities, "total_bytes": total}
+
+    def get_result(self) -> Dict:
+        # Resumen de la partida para reportes.
+        return {
+            "victory": self.wave_manager.victory,
+            "game_over": self.game_over,
+            "base_health": self.base_health,
+            "money": self.money,
+            "sim_time": self.time / 1000.0,
+            "ticks": self.tick,
+            "stats": dict(self.stats)
+        }
+
+def build_headless_enemy_types(enemy_data=ENEMY_DATA) -> Dict[str, tuple]:
+    # Tipos de enemigo sin imagenes, para simular sin video.
+    return {name: (None, d["health"], d["speed"], d["reward"])
+            for name, d in enemy_data.items()}
+
+def create_headless_simulation(level_name: str = "level1",
+                               layout: List[Dict] = None,
+                               enemy_data=ENEMY_DATA,
+                               level_data: Dict = None, # datos ya cargados del nivel
+                               **kwargs) -> Simulation:
+    # Crea una simulacion sin video ni audio, con las torretas de layout
+    # colocadas sin costo. Cada elemento de layout es
+    # {"type": str, "tile": [x, y], "level": int (opcional)}.
+    if level_data is None:
+        level_data = load_level_data(level_name)
+    level = Level(None, level_data, None)
+    sim = Simulation(level, build_headless_enemy_types(enemy_data), **kwargs)
+    for entry in layout or []:
+        turret = sim.add_turret(entry["type"], entry["tile"][0], entry["tile"][1])
+        for _ in range(entry.get("level", 1) - 1):
+            turret.upgrade()
+    return sim
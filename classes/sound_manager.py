@@ -1,6 +1,8 @@
 import pygame as pg
 import os
 
+from classes.logger import LOGGER
+
 class SoundManager:
     # Gestiona la carga y reproduccion de efectos de sonido y musica.
     def __init__(self):
@@ -15,7 +17,7 @@ class SoundManager:
             sound = pg.mixer.Sound(path)
             self.sounds[name] = sound
         except Exception as e:
-            print(f"Error cargando sonido {name} desde {path}: {e}")
+            LOGGER.error("sound", "Error cargando sonido %s desde %s: %s", name, path, e)
 
     def play_sound(self, name, volume=None):
         # Reproduce un sonido por su nombre.
@@ -27,7 +29,7 @@ class SoundManager:
                 sound.set_volume(self.sfx_volume)
             sound.play()
         else:
-            print(f"Sonido {name} no encontrado")
+            LOGGER.warning("sound", "Sonido %s no encontrado", name)
 
     def set_sfx_volume(self, volume):
         # Ajusta el volumen de los efectos (0.0 a 1.0).
@@ -43,7 +45,7 @@ class SoundManager:
             else:
                 pg.mixer.music.play()
         except Exception as e:
-            print(f"Error cargando musica {path}: {e}")
+            LOGGER.error("sound", "Error cargando musica %s: %s", path, e)
 
     def stop_music(self):
         # Detiene la musica.
@@ -0,0 +1,64 @@
+# Modulos de python.
+import sys
+import math
+
+# Modulos custom.
+from utils import constants as c
+
+class SpatialHash():
+    # Indice espacial de rejilla uniforme (celdas de TILE_SIZE pixeles).
+    # Se reconstruye una vez por tick y responde consultas de rango tocando
+    # solo las celdas cercanas en lugar de recorrer todos los elementos.
+    def __init__(self, cell_size: int = c.TILE_SIZE) -> None:
+        self.cell_size = cell_size
+        self.cells = {} # (celda_x, celda_y) -> lista de (orden, elemento, x, y)
+        self.count = 0
+
+    def clear(self) -> None:
+        # Vacia el indice.
+        self.cells.clear()
+        self.count = 0
+
+    def insert(self, item, x: float, y: float) -> None:
+        # Agrega un elemento en la posicion (x, y).
+        key = (int(x // self.cell_size), int(y // self.cell_size))
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = []
+        cell.append((self.count, item, x, y))
+        self.count += 1
+
+    def query(self, x: float, y: float, radius: float) -> list:
+        # Devuelve los elementos a menos de radius de (x, y), en el orden en
+        # que fueron insertados.
+        size = self.cell_size
+        min_cx = int((x - radius) // size)
+        max_cx = int((x + radius) // size)
+        min_cy = int((y - radius) // size)
+        max_cy = int((y + radius) // size)
+
+        # Si el rango cubre mas celdas de las que estan ocupadas, es mas
+        # barato recorrer solo las ocupadas.
+        box_cells = (max_cx - min_cx + 1) * (max_cy - min_cy + 1)
+        if box_cells > len(self.cells):
+            cells = [cell for (cx, cy), cell in self.cells.items()
+                     if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy]
+        else:
+            cells = []
+            for cy in range(min_cy, max_cy + 1):
+                for cx in range(min_cx, max_cx + 1):
+                    cell = self.cells.get((cx, cy))
+                    if cell is not None:
+                        cells.append(cell)
+
+        radius_sq = radius * radius
+        found = []
+        for cell in cells:
+            for entry in cell:
+                dx = entry[2] - x
+                dy = entry[3] - y
+                if dx * dx + dy * dy < radius_sq:
+                    found.append(entry)
+        if len(cells) > 1:
+            found.sort(key=lambda entry: entry[0])
+        return [entry[1] for entry in found]
@@ -8,6 +8,7 @@ import pygame as pg
 from pygame.locals import *
 
 # Modulos custom.
+from classes.profiler import PROFILER
 
 class State(ABC):
     # Clase base abstracta para un estado de la maquina de estados.
@@ -26,6 +27,16 @@ class State(ABC):
     def draw(self, surface: pg.Surface) -> None:
         pass
 
+    def invalidate(self) -> None:
+        # Avisa que la superficie fue dibujada por otro estado; los estados
+        # que redibujan por zonas deben dibujar el proximo frame completo.
+        pass
+
+    def get_dirty_rects(self):
+        # Zonas que cambiaron en el ultimo draw, o None si hay que presentar
+        # la pantalla completa.
+        return None
+
 class StateMachine():
     # Maquina de estados que gestiona la transicion entre diferentes estados.
     def __init__(self) -> None:
@@ -34,6 +45,8 @@ class StateMachine():
         self.current_state = None
         self.exit_state = None
         self.shared_data = {}
+        self.drawn_state = None # ultimo estado dibujado
+        self.dirty_rects = None # zonas a presentar del ultimo frame (None = todo)
 
     def set_starting_state(self, key: str):
         # Establece el estado inicial.
@@ -52,14 +65,42 @@ class StateMachine():
         self.exit_state = exit_state
 
     def handle_events(self, events: List[pg.event.Event]) -> None:
-        # Pasa los eventos al estado actual.
+        # Pasa los eventos al estado actual. F3 muestra u oculta el profiler.
+        PROFILER.begin("events")
+        for event in events:
+            if event.type == KEYUP and event.key == K_F3:
+                PROFILER.toggle()
+                self.states[self.current_state].invalidate()
         self.states[self.current_state].handle_events(events)
+        PROFILER.end("events")
 
     def update(self, dt: float) -> None:
         # Actualiza el estado actual si no hay estado de salida.
         if self.exit_state == None:
+            PROFILER.begin("update")
             self.states[self.current_state].update(dt)
+            PROFILER.end("update")
 
     def draw(self, surface: pg.Surface) -> None:
         # Dibuja el estado actual.
-        self.states[self.current_state].draw(surface)
\ No newline at end of file
+        if self.drawn_state != self.current_state:
+            self.states[self.current_state].invalidate()
+            self.drawn_state = self.current_state
+        PROFILER.begin("draw")
+        self.states[self.current_state].draw(surface)
+        PROFILER.end("draw")
+        self.dirty_rects = self.states[self.current_state].get_dirty_rects()
+        if PROFILER.enabled:
+            PROFILER.draw(surface)
+            # El overlay tapa zonas que el estado no sabe restaurar.
+            self.states[self.current_state].invalidate()
+            self.dirty_rects = None
+        PROFILER.frame()
+
+    def present(self) -> None:
+        # Muestra en la ventana el ultimo frame: solo las zonas que cambiaron
+        # si el estado las informa, o la pantalla completa.
+        if self.dirty_rects is None:
+            pg.display.flip()
+        else:
+            pg.display.update(self.dirty_rects)
\ No newline at end of file
@@ -0,0 +1,52 @@
+# Modulos de python.
+import sys
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# Modulos de pygame.
+import pygame as pg
+
+# Modulos custom.
+from utils import constants as c
+
+# Registro de fuentes, una por (archivo, tamano).
+fonts: Dict[Tuple[str, int], pg.font.Font] = {}
+
+def get_font(path, size: int) -> pg.font.Font:
+    # Devuelve la fuente del archivo y tamano dados, cargandola una sola vez.
+    key = (str(path), size)
+    font = fonts.get(key)
+    if font is None:
+        font = pg.font.Font(key[0], size)
+        fonts[key] = font
+    return font
+
+class TextCache():
+    # Cache LRU de textos renderizados, por (fuente, texto, color). Un texto
+    # del HUD solo se vuelve a renderizar cuando cambia su valor.
+    def __init__(self, max_entries: int = c.TEXT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, font: pg.font.Font, text: str, colour) -> pg.Surface:
+        # Devuelve el texto renderizado, reutilizandolo si ya existe.
+        key = (font, text, tuple(colour))
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, colour)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+
+# Cache compartida por todos los estados.
+TEXT_CACHE = TextCache()
+
+def render_text(font: pg.font.Font, text: str, colour) -> pg.Surface:
+    # Renderiza texto con antialiasing usando la cache compartida.
+    return TEXT_CACHE.render(font, text, colour)
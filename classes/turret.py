@@ -12,29 +12,61 @@ from pygame.locals import *
 # Custom modules
 from utils import constants as c
 from data.turret_data import TURRET_DATA
+from classes.rotation_cache import ROTATION_CACHE
+from classes.logger import LOGGER
+
+# Indicadores de rango compartidos, por radio. Se crean la primera vez que
+# se muestran; hay tantos como rangos distintos en TURRET_DATA.
+range_images: Dict[int, pg.Surface] = {}
+
+def get_range_image(radius: int) -> pg.Surface:
+    # Devuelve el circulo semitransparente de un rango, creandolo si falta.
+    image = range_images.get(radius)
+    if image is None:
+        image = pg.Surface((radius * 2, radius * 2))
+        image.fill((0, 0, 0))
+        image.set_colorkey((0, 0, 0))
+        pg.draw.circle(image, (245, 245, 245), (radius, radius), radius)
+        image.set_alpha(75)
+        range_images[radius] = image
+    return image
 
 class Turret(pg.sprite.Sprite):
     # Representa una torreta que dispara a los enemigos.
+    # Los atributos propios van en __slots__. Sprite no declara __slots__,
+    # asi que la instancia sigue teniendo __dict__ (vacio, reservado solo si
+    # alguien lo pide). El indicador de rango y las imagenes rotadas son
+    # compartidos.
+    __slots__ = ("_Sprite__g", "sound_manager", "type", "level", "splash_radius",
+                 "range", "damage", "cooldown", "last_shot", "target", "tile_x",
+                 "tile_y", "x", "y", "angle", "image", "rotated_image", "rect",
+                 "show_range", "coverage")
+    OWNED_ATTRS = ("_Sprite__g", "rect")
+    level_limit = 2 # Nivel maximo (inclusive).
+
     def __init__(self,
                  image: pg.Surface,
                  tile_x: int,
                  tile_y: int,
                  type: str,
-                 sound_manager) -> None:
+                 sound_manager=None,
+                 now: float = 0.0, # Tiempo de simulacion (ms) al colocarla.
+                 coverage=None     # PathCoverage del nivel (None: busqueda por area)
+                 ) -> None:
         # Inicializar clase padre Sprite
         pg.sprite.Sprite.__init__(self)
         self.sound_manager = sound_manager
 
         # Parametros basicos de la torreta.
         self.type = type
-        self.level_limit = 2 # Nivel maximo (inclusive).
         self.level = 1
         self.splash_radius = TURRET_DATA[self.type][self.level - 1]["splash_radius"]
         self.range = TURRET_DATA[self.type][self.level - 1]["range"]
         self.damage = TURRET_DATA[self.type][self.level -1]["damage"]
         self.cooldown = TURRET_DATA[self.type][self.level - 1]["cooldown"]
-        self.last_shot = pg.time.get_ticks()
+        self.last_shot = now
         self.target = None
+        self.coverage = coverage
 
         # Localizacion en casillas.
         self.tile_x = tile_x
@@ -47,86 +79,85 @@ class Turret(pg.sprite.Sprite):
         # Datos del sprite.
         self.angle = 90
         self.image = image
-        self.rotated_image = pg.transform.rotate(self.image, self.angle)
-        self.rect = image.get_rect()
+        if self.image is not None:
+            self.rotated_image = ROTATION_CACHE.get(self.image, self.angle)
+            self.rect = image.get_rect()
+        else:
+            self.rotated_image = None
+            self.rect = pg.Rect(0, 0, c.TILE_SIZE, c.TILE_SIZE)
         self.rect.center = (self.x, self.y)
 
-        # Datos del rango de la torreta.
+        # Datos del rango de la torreta (la imagen se obtiene al dibujar).
         self.show_range = False
-        # Crear superficie para mostrar el rango.
-        self.range_img = pg.Surface((self.range * 2, self.range * 2))
-        self.range_img.fill((0, 0, 0))
-        self.range_img.set_colorkey((0, 0, 0))
-        pg.draw.circle(self.range_img, (245, 245, 245), (self.range, self.range), self.range)
-        self.range_img.set_alpha(75)
-        self.range_rect = self.range_img.get_rect()
-        self.range_rect.center = self.rect.center
-
-    def update(self, enemy_group, dt: float) -> None:
+
+    def update(self, enemy_group, now: float, projectiles) -> None:
         # Actualiza el objetivo y dispara si es posible.
+        # now es el tiempo de simulacion en milisegundos y projectiles el
+        # ProjectilePool que lleva los disparos hasta el impacto.
+        if self.target != None and not self.target.alive():
+            # El objetivo murio o escapo desde el ultimo tick.
+            self.target = None
         if self.target != None:
             x_dist = self.target.pos[0] - self.x
             y_dist = self.target.pos[1] - self.y
             dist = math.sqrt(x_dist ** 2 + y_dist ** 2)
             if dist < self.range:
-                if (pg.time.get_ticks() - self.last_shot) > self.cooldown:
-                    self.shoot_to_target(enemy_group)
+                if (now - self.last_shot) > self.cooldown:
+                    self.shoot_to_target(enemy_group, now, projectiles)
             else:
                 self.target = None
-                print("Target lost!")
+                LOGGER.debug("turret", "Target lost!")
 
             self.angle = math.degrees(math.atan2(-y_dist, x_dist))
         else:
             self.pick_target(enemy_group)
             if self.target:
-                if pg.time.get_ticks() - self.last_shot > self.cooldown:
-                    self.shoot_to_target(enemy_group)
-
-    def shoot_to_target(self, enemy_group) -> None:
-        # Dispara al objetivo, aplica daño y daño en area si corresponde.
-        self.last_shot = pg.time.get_ticks()
-        self.target.current_health -= self.damage
-        if self.splash_radius > 0 and self.target is not None:
-            for enemy in enemy_group:
-                if enemy != self.target:
-                    dist = math.hypot(enemy.pos[0] - self.target.pos[0],
-                                      enemy.pos[1] - self.target.pos[1])
-                    if dist < self.splash_radius:
-                        enemy.current_health -= self.damage
-        if self.target.current_health <= 0:
-            self.target = None
-        print("Shot!")
+                if now - self.last_shot > self.cooldown:
+                    self.shoot_to_target(enemy_group, now, projectiles)
+
+    def shoot_to_target(self, enemy_group, now: float, projectiles) -> None:
+        # Lanza un proyectil al objetivo; el daño (y el daño en area) se
+        # aplica cuando impacta.
+        self.last_shot = now
+        projectiles.fire(self.type, self.x, self.y, self.target, self.damage,
+                         self.splash_radius, enemy_group)
+        LOGGER.debug("turret", "Shot!")
         # Reproducir sonido segun el tipo.
+        if self.sound_manager is None:
+            return
         if self.type == "shortbow":
             self.sound_manager.play_sound("bow_shot")
         elif self.type == "longbow":
             self.sound_manager.play_sound("longbow_shot")
         elif self.type == "mortar":
-            if self.splash_radius > 0:
-                self.sound_manager.play_sound("mortar_explosion")
+            self.sound_manager.play_sound("mortar_shell")
 
     def pick_target(self, enemy_group):
         # Busca un enemigo dentro del rango y lo asigna como objetivo.
-        x_dist = 0
-        y_dist = 0
-        dist = math.sqrt(x_dist ** 2 + y_dist ** 2)
-        for enemy in enemy_group:
-            x_dist = enemy.pos[0] - self.x
-            y_dist = enemy.pos[1] - self.y
-            dist = math.sqrt(x_dist ** 2 + y_dist ** 2)
-            if dist < self.range:
-                self.target = enemy
-                print("New target locked!")
-
-    def draw(self, surface):
-        # Dibuja la torreta rotada y opcionalmente el rango.
-        self.rotated_image = pg.transform.rotate(self.image, self.angle - 90)
+        # Se queda con el ultimo encontrado (el que aparecio mas tarde).
+        # Con la cobertura precalculada solo se miran los enemigos en los
+        # tramos de ruta al alcance, sin geometria por enemigo.
+        if self.coverage is not None:
+            intervals = self.coverage.get(self.tile_x, self.tile_y, self.range)
+            in_range = enemy_group.find_on_path(intervals)
+        else:
+            in_range = enemy_group.find_in_range(self.x, self.y, self.range)
+        if in_range:
+            self.target = in_range[-1]
+            LOGGER.debug("turret", "New target locked!")
+
+    def draw(self, surface) -> pg.Rect:
+        # Dibuja la torreta rotada y opcionalmente el rango. Devuelve el
+        # rectangulo ocupado.
+        self.rotated_image = ROTATION_CACHE.get(self.image, self.angle - 90)
         self.rect = self.rotated_image.get_rect()
         self.rect.center = (self.x, self.y)
-        surface.blit(self.rotated_image, self.rect)
+        drawn = surface.blit(self.rotated_image, self.rect)
 
         if self.show_range:
-            surface.blit(self.range_img, self.range_rect)
+            range_img = get_range_image(self.range)
+            drawn = drawn.union(surface.blit(range_img, range_img.get_rect(center=(self.x, self.y))))
+        return drawn
 
     def get_upgrade_cost(self):
         # Devuelve el costo de mejora para el siguiente nivel, o None si no hay.
@@ -141,14 +172,5 @@ class Turret(pg.sprite.Sprite):
             self.level += 1
             self.range = TURRET_DATA[self.type][self.level - 1]["range"]
             self.cooldown = TURRET_DATA[self.type][self.level - 1]["cooldown"]
-            self.damge = TURRET_DATA[self.type][self.level - 1]["damage"]
-            self.splash_radius = TURRET_DATA[self.type][self.level - 1]["splash_radius"]
-
-            # Actualizar imagen de rango.
-            self.range_img = pg.Surface((self.range * 2, self.range * 2))
-            self.range_img.fill((0, 0, 0))
-            self.range_img.set_colorkey((0, 0, 0))
-            pg.draw.circle(self.range_img, (245, 245, 245), (self.range, self.range), self.range)
-            self.range_img.set_alpha(75)
-            self.range_rect = self.range_img.get_rect()
-            self.range_rect.center = self.rect.center
\ No newline at end of file
+            self.damage = TURRET_DATA[self.type][self.level - 1]["damage"]
+            self.splash_radius = TURRET_DATA[self.type][self.level - 1]["splash_radius"]
\ No newline at end of file
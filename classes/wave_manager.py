@@ -0,0 +1,103 @@
+# Modulos de python.
+import sys
+
+# Modulos custom.
+from data.wave_data import WAVE_DATA
+
+class WaveManager:
+    # Gestiona la generacion de oleadas de enemigos.
+    def __init__(self, enemy_group, enemy_types, game_duration=300, wave_data=WAVE_DATA):
+        # enemy_group crea los enemigos con spawn() (EnemyGroup o EnemyStore).
+        self.enemy_group = enemy_group
+        self.enemy_types = enemy_types      # dict: nombre -> (imagen, vida, velocidad, recompensa)
+        self.game_duration = game_duration  # segundos
+        self.wave_data = wave_data          # curva de oleadas (ver data/wave_data.py)
+
+        # Tiempo de simulacion en milisegundos (avanza solo con update).
+        self.current_time = 0.0
+        self.elapsed = 0.0
+
+        # Parametros de oleadas.
+        self.wave_interval = wave_data["interval"]
+        self.initial_delay = wave_data["initial_delay"]
+        self.spawn_gap = wave_data["spawn_gap"]
+        self.wave_number = 0
+        self.next_wave_time = self.initial_delay * 1000.0
+
+        self.current_wave_enemies = []
+        self.spawn_index = 0
+        self.next_spawn_time = 0.0
+        self.spawning = False
+
+        self.game_over = False
+        self.victory = False
+        self.started = False
+        self.wave_in_progress = False
+
+    def start(self):
+        # Inicia el contador de oleadas.
+        self.started = True
+        self.current_time = 0.0
+        self.elapsed = 0.0
+        self.next_wave_time = 0.0
+        self.wave_in_progress = False
+
+    def update(self, dt):
+        # Actualiza el estado de las oleadas (tiempo, spawn).
+        dt_ms = dt * 1000.0
+        self.current_time += dt_ms
+        self.elapsed = self.current_time
+
+        if not self.started:
+            return
+
+        # Comprobar si se acabo el tiempo.
+        if self.elapsed >= self.game_duration * 1000.0:
+            if not self.spawning and len(self.enemy_group) == 0:
+                self.victory = True
+                self.game_over = True
+                self.wave_in_progress = False
+            return
+
+        if not self.spawning:
+            if self.current_time >= self.next_wave_time:
+                self.start_next_wave()
+        else:
+            if self.spawn_index < len(self.current_wave_enemies):
+                if self.current_time >= self.next_spawn_time:
+                    self.spawn_enemy()
+            else:
+                self.spawning = False
+
+    def start_next_wave(self):
+        # Prepara la siguiente oleada.
+        self.wave_number += 1
+        self.current_wave_enemies = self.generate_wave(self.wave_number)
+        self.spawn_index = 0
+        self.spawning = True
+        self.wave_in_progress = True
+        self.next_spawn_time = self.current_time
+        self.next_wave_time = self.current_time + self.wave_interval * 1000.0
+
+    def generate_wave(self, wave_num):
+        # Genera una lista de nombres de enemigos para la oleada.
+        enemies = []
+        waves = self.wave_data["waves"]
+        if wave_num <= len(waves):
+            for name, count in waves[wave_num - 1]:
+                enemies += [name] * count
+        else:
+            base = wave_num - len(waves)
+            for name, growth in self.wave_data["growth"].items():
+                enemies += [name] * (growth["start"] + base // growth["every"])
+        return enemies
+
+    def spawn_enemy(self):
+        # Crea un enemigo y lo agrega al grupo.
+        enemy_type = self.current_wave_enemies[self.spawn_index]
+        self.spawn_index += 1
+        img, health, speed, reward = self.enemy_types[enemy_type]
+
+        self.enemy_group.spawn(enemy_type, img, health, speed, reward)
+
+        self.next_spawn_time = self.current_time + self.spawn_gap
@@ -11,4 +11,6 @@ TOWN_DIR = ASSETS_DIR / "town"
 ENEMIES_DIR = ASSETS_DIR / "enemies"
 TURRETS_DIR = ASSETS_DIR / "turrets"
 
-SAVE_DIR = BASE_DIR / "saves"
\ No newline at end of file
+SAVE_DIR = BASE_DIR / "saves"
+REPLAYS_DIR = BASE_DIR / "replays"
+LEVEL_CACHE_DIR = BASE_DIR / "cache" / "levels"
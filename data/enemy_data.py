@@ -0,0 +1,5 @@
+ENEMY_DATA = {
+    "goblin": {"health":50, "speed":120, "reward":10},
+    "troll":  {"health":120, "speed":80, "reward":25},
+    "giant":  {"health":250, "speed":50, "reward":50}
+}
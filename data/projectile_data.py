@@ -0,0 +1,5 @@
+PROJECTILE_DATA = {
+    "shortbow": {"kind":"arrow", "speed":600},
+    "longbow":  {"kind":"arrow", "speed":900},
+    "mortar":   {"kind":"shell", "speed":260, "arc_height":60}
+}
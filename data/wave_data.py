@@ -0,0 +1,18 @@
+WAVE_DATA = {
+    "initial_delay":5,   # segundos antes de la primera oleada (sin SPACE)
+    "interval":30,       # segundos entre oleadas
+    "spawn_gap":500,     # ms entre enemigos de una oleada
+    # Oleadas fijas del inicio, en orden de aparicion.
+    "waves": [
+        [["goblin", 5]],
+        [["goblin", 3], ["troll", 2]],
+        [["goblin", 2], ["troll", 2], ["giant", 1]]
+    ],
+    # Oleadas siguientes: start + n // every de cada enemigo, con n las
+    # oleadas pasadas desde la ultima fija.
+    "growth": {
+        "goblin": {"start":2, "every":1},
+        "troll":  {"start":2, "every":2},
+        "giant":  {"start":1, "every":3}
+    }
+}
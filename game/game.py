@@ -10,9 +10,9 @@ from pygame.locals import *
 from enfocate import GameBase, GameMetadata, COLORS
 from classes.state_machine import StateMachine
 from gamestates.main_menu.main_menu import MainMenu
-from gamestates.tower_defence.tower_defence import TowerDefence
 from gamestates.town.town import Town
 from classes.sound_manager import SoundManager
+from classes.asset_manager import ASSETS
 from config import SOUNDS_DIR
 
 class PomodoroTD(GameBase):
@@ -46,20 +46,26 @@ class PomodoroTD(GameBase):
 
         # Instanciar estados de la maquina.
         main_menu = MainMenu(self.state_machine, self.sound_manager)
+        # El estado tower_defence lo crea Town al empezar la primera defensa,
+        # cargando solo el nivel elegido (ver LEVEL_REGISTRY).
         town = Town(self.state_machine)
-        tower_defence = TowerDefence(self.state_machine, "level1", self.sound_manager)
 
         # Agregar estados a la maquina.
         self.state_machine.add_state("main_menu", main_menu)
-        self.state_machine.add_state("tower_defence", tower_defence)
         self.state_machine.add_state("town", town)
 
         # Establecer estado inicial.
         self.state_machine.set_starting_state("main_menu")
 
     def on_start(self) -> None:
-        # Se ejecuta al iniciar el juego. Optimiza imagenes del estado tower_defence.
-        self.state_machine.states["tower_defence"].optimize_images()
+        # Se ejecuta al iniciar el juego, ya con la ventana. El menu y el
+        # pueblo se crearon antes: se convierten sus imagenes y se vuelven a
+        # pedir. Las de la defensa se optimizan al crear el estado
+        # (Town.get_tower_defence).
+        ASSETS.convert_all()
+        self.state_machine.states["main_menu"].optimize_images()
+        self.state_machine.states["town"].optimize_images()
+        ASSETS.log_report()
 
     def handle_events(self, events: List[pg.event.Event]) -> None:
         # Pasa los eventos a la maquina de estados.
@@ -79,5 +85,7 @@ class PomodoroTD(GameBase):
             self._stop_context()
 
     def draw(self) -> None:
-        # Dibuja el estado actual en la superficie de la ventana.
+        # Dibuja el estado actual en la superficie de la ventana. GameBase
+        # presenta la superficie completa; state_machine.present() (solo las
+        # zonas que cambiaron) lo usa por ahora solo replay.py.
         self.state_machine.draw(self.surface)
\ No newline at end of file
@@ -5,6 +5,7 @@ import pygame as pg
 from pygame.locals import *
 from classes.state_machine import State, StateMachine
 from classes.gui import Button, TextBox
+from classes.text_cache import render_text
 from utils import constants as c
 from config import SAVE_DIR
 
@@ -179,13 +180,13 @@ class LoadGame(State):
 
             if data is None:
                 # Archivo vacio.
-                empty_text = self.font.render("Vacio", True, c.COLOUR_BLACK)
+                empty_text = render_text(self.font, "Vacio", c.COLOUR_BLACK)
                 surface.blit(empty_text, (x, y))
             else:
                 # Mostrar recursos.
-                money_text = self.font.render(f"Oro: {data.get('money', 0)}", True, c.COLOUR_BLACK)
+                money_text = render_text(self.font, f"Oro: {data.get('money', 0)}", c.COLOUR_BLACK)
                 surface.blit(money_text, (x, y))
-                time_text = self.font.render(f"Tiempo: {data.get('time_units', 0)}", True, c.COLOUR_BLACK)
+                time_text = render_text(self.font, f"Tiempo: {data.get('time_units', 0)}", c.COLOUR_BLACK)
                 surface.blit(time_text, (x, y + 25))
 
                 # Mostrar niveles de edificios.
@@ -200,7 +201,7 @@ class LoadGame(State):
                         display = "Tiro"
                     else:
                         display = name
-                    lvl_text = self.font.render(f"{display}: {info.get('level', 0)}", True, c.COLOUR_BLACK)
+                    lvl_text = render_text(self.font, f"{display}: {info.get('level', 0)}", c.COLOUR_BLACK)
                     surface.blit(lvl_text, (x, y_offset))
                     y_offset += 22
 
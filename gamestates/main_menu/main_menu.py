@@ -10,9 +10,11 @@ from pygame.locals import *
 # Modulos custom.
 from classes.state_machine import State, StateMachine
 from classes.gui import Button
+from classes.text_cache import get_font
 from gamestates.main_menu.title import Title
 from gamestates.main_menu.load_game import LoadGame
-from gamestates.town.town import Town
+from gamestates.town.town import Town, TOWN_IMAGES
+from classes.asset_manager import ASSETS
 
 from utils import constants as c
 from config import FONTS_DIR, MAIN_MENU_DIR, SAVE_DIR
@@ -24,13 +26,15 @@ class MainMenu(State):
         self.parent_state_machine = parent_state_machine
 
         # Fuente para el texto.
-        font_pirata_one = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 23)
-        font_pirata_one_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 50)
+        font_pirata_one = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 23)
+        font_pirata_one_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 50)
 
         # Cargar imagenes de la pantalla de titulo.
         title_images: Dict[str, pg.Surface] = load_title_images()
         # Cargar botones de la pantalla de titulo.
         title_buttons: Dict[str, Button] = load_title_buttons(font_pirata_one)
+        # Al elegir partida se pasa al pueblo: sus imagenes se decodifican ya.
+        ASSETS.preload(TOWN_IMAGES.values())
 
         # Crear state machine interna.
         self.state_machine = StateMachine()
@@ -48,6 +52,16 @@ class MainMenu(State):
         # Establecer estado inicial.
         self.state_machine.set_starting_state("title")
 
+    def optimize_images(self) -> None:
+        # Vuelve a pedir a ASSETS las imagenes de titulo, ya convertidas al
+        # formato de la ventana (el menu se crea antes que ella).
+        images = load_title_images()
+        self.state_machine.states["title"].images.update(images)
+        load_game = self.state_machine.states["load_game"]
+        load_game.background = images["background"]
+        load_game.text1 = images["pomodoro"]
+        load_game.text2 = images["tower_defense"]
+
     def handle_events(self, events: List[pg.event.Event]) -> None:
         # Pasa eventos a la sub-maquina.
         self.state_machine.handle_events(events)
@@ -140,10 +154,10 @@ def load_title_buttons(font_text: pg.font.Font) -> Dict[str, Button]:
 def load_title_images() -> Dict[str, pg.Surface]:
     # Carga las imagenes necesarias para la pantalla de titulo.
     title_images: Dict[str, pg.Surface] = {}
-    title_images["background"] = pg.image.load(str(MAIN_MENU_DIR / "main_menu_bg.png"))
-    title_images["container_centre"] = pg.image.load(str(MAIN_MENU_DIR / "container_centre.png"))
+    title_images["background"] = ASSETS.get_image(MAIN_MENU_DIR / "main_menu_bg.png", alpha=False)
+    title_images["container_centre"] = ASSETS.get_image(MAIN_MENU_DIR / "container_centre.png", alpha=False)
     title_images["title"] = None
-    title_images["pomodoro"] = pg.image.load(str(MAIN_MENU_DIR / "pomodoro.png"))
-    title_images["tower_defense"] = pg.image.load(str(MAIN_MENU_DIR / "tower_defense.png"))
+    title_images["pomodoro"] = ASSETS.get_image(MAIN_MENU_DIR / "pomodoro.png")
+    title_images["tower_defense"] = ASSETS.get_image(MAIN_MENU_DIR / "tower_defense.png")
 
     return title_images
\ No newline at end of file
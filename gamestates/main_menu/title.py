@@ -9,6 +9,7 @@ from pygame.locals import *
 # Modulos custom.
 from classes.state_machine import State, StateMachine
 from classes.gui import Button
+from classes.logger import LOGGER
 from utils import constants as c
 
 class Title(State):
@@ -33,7 +34,7 @@ class Title(State):
                             self.buttons[button].is_clicked = True
             elif event.type == KEYUP:
                 if event.key == K_UP:
-                    print("UP")
+                    LOGGER.debug("ui", "UP")
 
     def update(self, dt: float) -> None:
         # Actualiza botones y maneja clics.
@@ -4,6 +4,7 @@
 import sys
 from typing import List, Dict
 import json
+import time
 
 # Modulos de pygame.
 import pygame as pg
@@ -12,156 +13,59 @@ from pygame.locals import *
 # Modulos custom.
 from classes.state_machine import State, StateMachine
 from classes.gui import Button, ButtonCustom
+from classes.text_cache import get_font, render_text
 from classes.level import Level
-from classes.turret import Turret
-from classes.enemy import Enemy
+from classes.level_registry import LEVEL_REGISTRY
+from classes.asset_manager import ASSETS
+from classes.simulation import Simulation, TURRET_COSTS
+from classes.rotation_cache import ROTATION_CACHE
+from classes.turret import get_range_image
+from classes.dirty_renderer import DirtyRenderer
+from classes.logger import LOGGER
+from classes.profiler import PROFILER
+from classes.input_recorder import (InputRecorder, InputReplay, SELECT_TURRET, CLICK_TILE,
+                                    UPGRADE, START, PAUSE, FREE_TURRET, FORCE_VICTORY)
+from data.enemy_data import ENEMY_DATA
+from data.turret_data import TURRET_DATA
 
 from utils import constants as c
-from config import LEVELS_DIR, ENEMIES_DIR, TURRETS_DIR, FONTS_DIR
-
-class WaveManager:
-    # Gestiona la generacion de oleadas de enemigos.
-    def __init__(self, enemy_group, waypoints, enemy_types, game_duration=300,
-                 on_enemy_escape=None):
-        self.enemy_group = enemy_group
-        self.waypoints = waypoints
-        self.enemy_types = enemy_types      # dict: nombre -> (imagen, vida, velocidad, recompensa)
-        self.game_duration = game_duration  # segundos
-
-        self.start_time = pg.time.get_ticks()
-        self.current_time = 0.0
-        self.elapsed = 0.0
-
-        # Parametros de oleadas.
-        self.wave_interval = 30
-        self.initial_delay = 5
-        self.wave_number = 0
-        self.next_wave_time = self.initial_delay * 1000.0
-
-        self.current_wave_enemies = []
-        self.spawn_index = 0
-        self.next_spawn_time = 0.0
-        self.spawning = False
-
-        self.game_over = False
-        self.victory = False
-        self.started = False
-        self.wave_in_progress = False
-        self.on_enemy_escape = on_enemy_escape
-
-    def start(self):
-        # Inicia el contador de oleadas.
-        self.started = True
-        self.current_time = 0.0
-        self.elapsed = 0.0
-        self.next_wave_time = 0.0
-        self.wave_in_progress = False
-
-    def update(self, dt):
-        # Actualiza el estado de las oleadas (tiempo, spawn).
-        dt_ms = dt * 1000.0
-        self.current_time += dt_ms
-        self.elapsed = self.current_time
-
-        if not self.started:
-            return
-
-        # Comprobar si se acabo el tiempo.
-        if self.elapsed >= self.game_duration * 1000.0:
-            if not self.spawning and len(self.enemy_group) == 0:
-                self.victory = True
-                self.game_over = True
-                self.wave_in_progress = False
-            return
-
-        if not self.spawning:
-            if self.current_time >= self.next_wave_time:
-                self.start_next_wave()
-        else:
-            if self.spawn_index < len(self.current_wave_enemies):
-                if self.current_time >= self.next_spawn_time:
-                    self.spawn_enemy()
-            else:
-                self.spawning = False
-
-    def start_next_wave(self):
-        # Prepara la siguiente oleada.
-        self.wave_number += 1
-        self.current_wave_enemies = self.generate_wave(self.wave_number)
-        self.spawn_index = 0
-        self.spawning = True
-        self.wave_in_progress = True
-        self.next_spawn_time = self.current_time
-        self.next_wave_time = self.current_time + self.wave_interval * 1000.0
-
-    def generate_wave(self, wave_num):
-        # Genera una lista de nombres de enemigos para la oleada.
-        enemies = []
-        if wave_num == 1:
-            enemies = ["goblin"] * 5
-        elif wave_num == 2:
-            enemies = ["goblin"] * 3 + ["troll"] * 2
-        elif wave_num == 3:
-            enemies = ["goblin"] * 2 + ["troll"] * 2 + ["giant"] * 1
-        else:
-            base = wave_num - 3
-            enemies = (["goblin"] * (2 + base) +
-                       ["troll"] * (2 + base // 2) +
-                       ["giant"] * (1 + base // 3))
-        return enemies
-
-    def spawn_enemy(self):
-        # Crea un enemigo y lo agrega al grupo.
-        enemy_type = self.current_wave_enemies[self.spawn_index]
-        self.spawn_index += 1
-        img, health, speed, reward = self.enemy_types[enemy_type]
-
-        enemy = Enemy(self.waypoints, img, health, speed, self.on_enemy_escape)
-        enemy.reward = reward
-        self.enemy_group.add(enemy)
-
-        self.next_spawn_time = self.current_time + 500.0
+from config import LEVELS_DIR, ENEMIES_DIR, TURRETS_DIR, FONTS_DIR, REPLAYS_DIR
+
+# Imagenes del estado: nombre -> (ruta, alpha). La imagen del nivel la da
+# LEVEL_REGISTRY.
+TOWER_DEFENCE_IMAGES = {
+    "select_tile": (LEVELS_DIR / "select_tile.png", True),
+    "sidebar": (LEVELS_DIR / "sidebar.png", False),
+    "goblin": (ENEMIES_DIR / "goblin.png", True),
+    "troll": (ENEMIES_DIR / "troll.png", True),
+    "giant": (ENEMIES_DIR / "giant.png", True),
+    "shortbow": (TURRETS_DIR / "shortbow.png", True),
+    "longbow": (TURRETS_DIR / "longbow.png", True),
+    "mortar": (TURRETS_DIR / "mortar.png", True)
+}
+
+def get_tower_defence_assets(level: str) -> list:
+    # Imagenes que usa una defensa en level, para ASSETS.preload.
+    return list(TOWER_DEFENCE_IMAGES.values()) + [LEVEL_REGISTRY.get_image_asset(level)]
 
 class TowerDefence(State):
     # Estado principal del modo defensa de torres.
     def __init__(self, parent_state_machine, level: str, sound_manager) -> None:
         self.parent_state_machine = parent_state_machine
-        self.sound_manager = sound_manager
-
-        # Cargar datos del mapa.
-        if level == "level1":
-            with open(LEVELS_DIR / "level1.tmj", 'r') as file:
-                level_data = json.load(file)
-            level_img  = pg.image.load(str(LEVELS_DIR / "level1.png"))
-            select_img = pg.image.load(str(LEVELS_DIR / "select_tile.png"))
-
-        self.level = Level(level_img, level_data, select_img)
-
-        # Cargar texturas de enemigos.
-        self.enemy1_img = pg.image.load(str(ENEMIES_DIR / "goblin.png"))
-        self.enemy2_img = pg.image.load(str(ENEMIES_DIR / "troll.png"))
-        self.enemy3_img = pg.image.load(str(ENEMIES_DIR / "giant.png"))
-
-        self.enemy_types = {
-            "goblin": (self.enemy1_img, 50, 120, 10),
-            "troll":  (self.enemy2_img, 120, 80, 25),
-            "giant":  (self.enemy3_img, 250, 50, 50)
-        }
+        self.sound_manager = sound_manager # None para repetir partidas sin audio
+        self.level_name = level
 
-        self.money = 200
-        self.selected_turret_type = None
-        self.turret_costs = {
-            "shortbow": 100,
-            "longbow": 150,
-            "mortar": 200
-        }
+        # Cargar texturas (selector, barra lateral, enemigos y torretas).
+        self.load_images()
 
-        # Cargar imagenes de torretas.
-        self.turret_images = {
-            "shortbow": pg.image.load(str(TURRETS_DIR / "shortbow.png")),
-            "longbow": pg.image.load(str(TURRETS_DIR / "longbow.png")),
-            "mortar": pg.image.load(str(TURRETS_DIR / "mortar.png"))
-        }
+        # Cargar datos del mapa (LEVEL_REGISTRY carga el nivel al pedirlo).
+        entry = LEVEL_REGISTRY.load(level)
+        self.level = Level(entry.image, entry.data, self.select_img)
+
+        self.enemy_types = self.build_enemy_types()
+
+        self.selected_turret_type = None
+        self.turret_costs = TURRET_COSTS
 
         self.turret_names = {
             "shortbow": "Arco Corto",
@@ -169,22 +73,19 @@ class TowerDefence(State):
             "mortar": "Canon"
         }
 
-        self.turret_group = pg.sprite.Group()
-        self.enemy_group  = pg.sprite.Group()
-
-        self.base_health = 10
-        self.game_over = False
+        # Nucleo de la simulacion; este estado solo dibuja y traduce la entrada.
+        self.sim = Simulation(self.level, self.enemy_types, self.turret_costs,
+                              300, 200, self.sound_manager, c.USE_ENEMY_STORE)
         self.paused = False
+        self.speed = 1          # multiplicador de avance rapido
+        self.render_alpha = 1.0 # fraccion de paso para interpolar el dibujo
 
-        self.multipliers = {"purchase_cost": 1.0, "upgrade_cost": 1.0,
-                            "cooldown": 1.0, "damage": 1.0}
-        self.start_money = 200
-
-        self.wave_manager = WaveManager(self.enemy_group, self.level.waypoints,
-                                        self.enemy_types, 300, self.enemy_escaped)
+        # Acciones del jugador marcadas con el tick de simulacion, y la
+        # repeticion en curso (None si se juega normalmente).
+        self.recorder = InputRecorder()
+        self.replay = None
 
         # Elementos de la interfaz.
-        self.sidebar_img = pg.image.load(str(LEVELS_DIR / "sidebar.png"))
         self.sidebar_rect = self.sidebar_img.get_rect()
         self.sidebar_rect.topleft = ((self.level.w) * c.TILE_SIZE, 0)
         self.buttons_list = []
@@ -197,9 +98,19 @@ class TowerDefence(State):
         self.mouse_posx = self.mouse_pos[0] // c.TILE_SIZE
         self.mouse_posy = self.mouse_pos[1] // c.TILE_SIZE
 
-        self.font = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 20)
+        self.font = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 20)
         # Fuente mas grande para titulos de seccion
-        self.font_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 27)
+        self.font_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 27)
+
+        # Capa estatica (mapa, barra lateral y titulos) y dibujo por zonas.
+        self.static_layer = None
+        self.renderer = DirtyRenderer(c.DIRTY_RECT_RENDERING)
+        self.dirty_rects = []
+        self.map_rect = pg.Rect(0, 0, self.level.w * c.TILE_SIZE, c.WIN_HEIGHT)
+
+        # Oscurecedor de los overlays, creado una sola vez.
+        self.dim_overlay = pg.Surface((c.WIN_WIDTH, c.WIN_HEIGHT), pg.SRCALPHA)
+        self.dim_overlay.fill((0, 0, 0, 180))
 
         # Botones de torreta en la barra lateral.
         self.turret_buttons = {}
@@ -257,70 +168,125 @@ class TowerDefence(State):
                            self.font, "Regresar", radius=5)
         }
 
-        # Estadisticas de la partida.
-        self.stats = {
-            "waves_completed": 0,
-            "enemies_killed": 0,
-            "money_spent": 0,
-            "money_earned": 0,
-            "time_played": 0.0
+    def load_images(self) -> None:
+        # Toma las imagenes del estado de ASSETS (ya convertidas si existe
+        # la ventana).
+        images = {name: ASSETS.get_image(path, alpha)
+                  for name, (path, alpha) in TOWER_DEFENCE_IMAGES.items()}
+        self.select_img = images["select_tile"]
+        self.sidebar_img = images["sidebar"]
+        self.enemy1_img = images["goblin"]
+        self.enemy2_img = images["troll"]
+        self.enemy3_img = images["giant"]
+        self.turret_images = {
+            "shortbow": images["shortbow"],
+            "longbow": images["longbow"],
+            "mortar": images["mortar"]
         }
-        self.start_time = 0
-        self.end_time = 0
+
+    def build_enemy_types(self):
+        # Combina las estadisticas de ENEMY_DATA con las texturas cargadas.
+        images = {"goblin": self.enemy1_img, "troll": self.enemy2_img,
+                  "giant": self.enemy3_img}
+        return {name: (images[name], d["health"], d["speed"], d["reward"])
+                for name, d in ENEMY_DATA.items()}
+
+    @property
+    def wave_manager(self):
+        return self.sim.wave_manager
+
+    @property
+    def game_over(self):
+        return self.sim.game_over
 
     def restart(self):
         # Reinicia el estado a valores iniciales.
-        self.turret_group.empty()
-        self.enemy_group.empty()
-        self.money = self.start_money
-        self.base_health = 10
-        self.game_over = False
+        if self.replay is None and c.RECORD_INPUTS and len(self.recorder):
+            self.save_recording()
+        self.recorder.clear()
+        self.replay = None
+        self.sim.reset()
         self.paused = False
-        self.wave_manager = WaveManager(self.enemy_group, self.level.waypoints,
-                                        self.enemy_types, 300, self.enemy_escaped)
+        self.speed = 1
+        self.render_alpha = 1.0
         self.level.selected_tile = None
         self.selected_turret_type = None
         self.selected_turret = None
-        self.stats = {
-            "waves_completed": 0,
-            "enemies_killed": 0,
-            "money_spent": 0,
-            "money_earned": 0,
-            "time_played": 0.0
-        }
-        self.start_time = 0
-        self.end_time = 0
+        self.renderer.invalidate()
+
+    def load_level(self, name: str) -> None:
+        # Cambia al nivel name y empieza una partida nueva en el, con el
+        # mismo dinero inicial y multiplicadores.
+        if self.replay is None and c.RECORD_INPUTS and len(self.recorder):
+            self.save_recording()
+        self.recorder.clear()
+        self.replay = None
+        entry = LEVEL_REGISTRY.load(name)
+        self.level_name = name
+        self.level = Level(entry.image, entry.data, self.select_img)
+        old_sim = self.sim
+        self.sim = Simulation(self.level, self.enemy_types, self.turret_costs,
+                              old_sim.game_duration, old_sim.start_money,
+                              self.sound_manager, c.USE_ENEMY_STORE)
+        self.sim.set_multipliers(old_sim.multipliers)
+        self.sidebar_rect.topleft = (self.level.w * c.TILE_SIZE, 0)
+        self.map_rect = pg.Rect(0, 0, self.level.w * c.TILE_SIZE, c.WIN_HEIGHT)
+        self.static_layer = None
+        self.restart()
+
+    def invalidate(self) -> None:
+        # Otro estado dibujo sobre la superficie.
+        self.renderer.invalidate()
+
+    def get_static_layer(self, surface: pg.Surface) -> pg.Surface:
+        # Compone una sola vez todo lo que no cambia entre frames.
+        if self.static_layer is None or self.static_layer.get_size() != surface.get_size():
+            layer = pg.Surface(surface.get_size(), 0, surface)
+            self.level.draw(layer)
+            layer.blit(self.sidebar_img, self.sidebar_rect)
+            # Tienda (arriba)
+            tienda_surf = render_text(self.font_big, "Tienda", c.COLOUR_CREAM)
+            layer.blit(tienda_surf, (self.sidebar_rect.x + 125, 32))
+            # Mejoras (encima del boton de mejora)
+            mejoras_surf = render_text(self.font_big, "Mejoras", c.COLOUR_CREAM)
+            layer.blit(mejoras_surf, (self.sidebar_rect.x + 118, 273))
+            # Estadisticas (encima de los datos de oleada)
+            estadisticas_surf = render_text(self.font_big, "Estadisticas", c.COLOUR_CREAM)
+            layer.blit(estadisticas_surf, (self.sidebar_rect.x + 100, 512))
+            self.static_layer = layer
+            self.renderer.invalidate()
+        return self.static_layer
 
     def handle_events(self, events: List[pg.event.Event]) -> None:
         # Procesa eventos de teclado y mouse.
         for event in events:
             if event.type == KEYUP:
+                if self.replay is not None and event.key != K_f:
+                    # Durante una repeticion solo se cambia la velocidad.
+                    continue
                 if event.key == K_ESCAPE:
                     if self.game_over or self.wave_manager.victory:
                         pass
                     else:
-                        self.paused = not self.paused
+                        self.set_paused(not self.paused)
                 elif event.key == K_SPACE:
-                    if not self.wave_manager.started and not self.game_over and not self.paused:
-                        self.wave_manager.start()
-                        self.start_time = pg.time.get_ticks()
-                        print("Inicio de oleadas!")
+                    self.start_waves()
                 elif event.key == K_F1:
-                    if not self.paused and not self.game_over and not self.wave_manager.victory:
-                        if self.level.selected_tile and self.selected_turret_type:
-                            img = self.turret_images[self.selected_turret_type]
-                            turret = Turret(img, self.level.selected_tile[0], self.level.selected_tile[1], self.selected_turret_type)
-                            self.turret_group.add(turret)
+                    self.place_free_turret()
                 elif event.key == K_F2:
-                    self.wave_manager.victory = True
+                    self.force_victory()
+                elif event.key == K_f:
+                    # Alterna la velocidad de avance rapido (x1, x2, x4, x8).
+                    speeds = c.FAST_FORWARD_SPEEDS
+                    self.speed = speeds[(speeds.index(self.speed) + 1) % len(speeds)]
 
             elif event.type == MOUSEBUTTONUP and event.button == 1:
                 if self.game_over or self.wave_manager.victory:
                     for key, btn in self.end_buttons.items():
                         if btn.is_hovered:
-                            self.sound_manager.play_sound("click")
+                            self.play_sound("click")
                             if key == "return":
-                                reward = self.money - self.start_money
+                                reward = self.sim.money - self.sim.start_money
                                 if reward >= 0:
                                     self.parent_state_machine.shared_data["defense_reward"] = reward
                                 self.parent_state_machine.current_state = "town"
@@ -329,102 +295,185 @@ class TowerDefence(State):
                 elif self.paused:
                     for i, btn in enumerate(self.pause_buttons):
                         if btn.is_hovered:
-                            self.sound_manager.play_sound("click")
-                            if i == 0:
-                                self.paused = False
+                            self.play_sound("click")
+                            if i == 0 and self.replay is None:
+                                self.set_paused(False)
                             elif i == 1:
                                 self.parent_state_machine.current_state = "town"
                                 self.restart()
                             return
-                else:
+                elif self.replay is None:
                     clicked_button = None
                     for ttype, btn in self.turret_buttons.items():
                         if btn.is_hovered:
                             clicked_button = ttype
                             break
                     if clicked_button:
-                        self.sound_manager.play_sound("click")
-                        self.selected_turret_type = clicked_button
-                        print(f"Torreta seleccionada: {clicked_button}")
+                        self.play_sound("click")
+                        self.select_turret_type(clicked_button)
                         continue
 
                     if self.upgrade_button.is_hovered:
-                        if self.selected_turret:
-                            base_cost = self.selected_turret.get_upgrade_cost()
-                            if base_cost:
-                                cost = int(base_cost * self.multipliers["upgrade_cost"])
-                                if self.money >= cost:
-                                    self.sound_manager.play_sound("upgrade")
-                                    self.selected_turret.upgrade()
-                                    self.money -= cost
-                                    self.stats["money_spent"] += cost
+                        self.upgrade_selected_turret()
                         continue
 
-                    if self.mouse_posx < self.level.w:
-                        tile_index = self.mouse_posy * self.level.w + self.mouse_posx
-                        if self.level.tiles[tile_index] == 43:
-                            if self.selected_turret_type and self.money >= self.turret_costs[self.selected_turret_type]:
-                                cost = int(self.turret_costs[self.selected_turret_type] * self.multipliers["purchase_cost"])
-                                if self.money >= cost:
-                                    if not self.is_tile_occupied(self.mouse_posx, self.mouse_posy):
-                                        self.sound_manager.play_sound("purchase")
-                                        img = self.turret_images[self.selected_turret_type]
-                                        turret = Turret(img, self.mouse_posx, self.mouse_posy, self.selected_turret_type, self.sound_manager)
-                                        turret.cooldown = int(turret.cooldown * self.multipliers["cooldown"])
-                                        turret.damage = int(turret.damage * self.multipliers["damage"])
-                                        self.turret_group.add(turret)
-                                        self.money -= cost
-                                        self.stats["money_spent"] += cost
-                                        self.level.selected_tile = (self.mouse_posx, self.mouse_posy)
-                                        self.selected_turret_type = None
-                                    else:
-                                        print("Casilla ocupada por otra torreta")
-                                        self.level.selected_tile = (self.mouse_posx, self.mouse_posy)
-                            else:
-                                self.level.selected_tile = (self.mouse_posx, self.mouse_posy)
-                        else:
-                            self.level.selected_tile = None
-                    else:
-                        self.level.selected_tile = None
-
-                    if self.level.selected_tile:
-                        tx, ty = self.level.selected_tile
-                        found = None
-                        for turret in self.turret_group:
-                            if turret.tile_x == tx and turret.tile_y == ty:
-                                found = turret
-                                break
-                        self.selected_turret = found
+                    self.click_tile(self.mouse_posx, self.mouse_posy)
+
+    def play_sound(self, name: str) -> None:
+        # Reproduce un sonido de la interfaz solo si hay audio.
+        if self.sound_manager is not None:
+            self.sound_manager.play_sound(name)
+
+    def record(self, action: str, *args) -> None:
+        # Graba una accion con el tick actual (no durante una repeticion).
+        if self.replay is None:
+            self.recorder.record(self.sim.tick, action, *args)
+
+    def set_paused(self, paused: bool) -> None:
+        # Pausa o reanuda la partida.
+        self.paused = paused
+        self.record(PAUSE, int(paused))
+
+    def start_waves(self) -> None:
+        # Inicia las oleadas (SPACE).
+        if not self.wave_manager.started and not self.game_over and not self.paused:
+            self.record(START)
+            self.sim.start()
+            LOGGER.info("wave", "Inicio de oleadas!")
+
+    def place_free_turret(self) -> None:
+        # Coloca sin costo la torreta elegida en la casilla seleccionada (F1).
+        if not self.paused and not self.game_over and not self.wave_manager.victory:
+            if self.level.selected_tile and self.selected_turret_type:
+                self.record(FREE_TURRET)
+                img = self.turret_images[self.selected_turret_type]
+                self.sim.add_turret(self.selected_turret_type, self.level.selected_tile[0],
+                                    self.level.selected_tile[1], img)
+
+    def force_victory(self) -> None:
+        # Gana la partida de inmediato (F2).
+        self.record(FORCE_VICTORY)
+        self.wave_manager.victory = True
+
+    def select_turret_type(self, turret_type: str) -> None:
+        # Elige el tipo de torreta a comprar.
+        self.record(SELECT_TURRET, turret_type)
+        self.selected_turret_type = turret_type
+        LOGGER.debug("ui", "Torreta seleccionada: %s", turret_type)
+
+    def upgrade_selected_turret(self) -> None:
+        # Mejora la torreta seleccionada si alcanza el dinero.
+        if self.selected_turret:
+            self.record(UPGRADE)
+            if self.sim.upgrade_turret(self.selected_turret):
+                self.play_sound("upgrade")
+
+    def click_tile(self, tile_x: int, tile_y: int) -> None:
+        # Click en una casilla: compra la torreta elegida o selecciona la casilla.
+        self.record(CLICK_TILE, tile_x, tile_y)
+        if self.level.is_buildable(tile_x, tile_y):
+            if self.selected_turret_type and self.sim.money >= self.turret_costs[self.selected_turret_type]:
+                cost = self.sim.get_purchase_cost(self.selected_turret_type)
+                if self.sim.money >= cost:
+                    if not self.sim.is_tile_occupied(tile_x, tile_y):
+                        self.play_sound("purchase")
+                        img = self.turret_images[self.selected_turret_type]
+                        self.sim.buy_turret(self.selected_turret_type, tile_x, tile_y, img)
+                        self.level.selected_tile = (tile_x, tile_y)
+                        self.selected_turret_type = None
                     else:
-                        self.selected_turret = None
-
-    def is_tile_occupied(self, tile_x, tile_y):
-        # Verifica si una casilla ya tiene una torreta.
-        for turret in self.turret_group:
-            if turret.tile_x == tile_x and turret.tile_y == tile_y:
-                return True
-        return False
-
-    def enemy_escaped(self):
-        # Reduce la vida de la base cuando un enemigo escapa.
-        if self.game_over:
-            return
-        self.base_health -= 1
-        if self.base_health <= 0:
-            self.sound_manager.play_sound("game_over")
-            self.game_over = True
-            self.end_time = pg.time.get_ticks()
-            return
-        self.sound_manager.play_sound("enemy_escape")
+                        LOGGER.info("ui", "Casilla ocupada por otra torreta")
+                        self.level.selected_tile = (tile_x, tile_y)
+            else:
+                self.level.selected_tile = (tile_x, tile_y)
+        else:
+            self.level.selected_tile = None
+
+        if self.level.selected_tile:
+            self.selected_turret = self.level.get_occupant(*self.level.selected_tile)
+        else:
+            self.selected_turret = None
+
+    def get_session_header(self) -> Dict:
+        # Configuracion de la partida que hace falta para repetirla.
+        return {"level": self.level_name, "step": c.SIM_STEP,
+                "duration": self.sim.game_duration, "money": self.sim.start_money,
+                "multipliers": dict(self.sim.multipliers)}
+
+    def save_recording(self) -> None:
+        # Guarda las acciones de la partida que termina en REPLAYS_DIR. El
+        # nombre lleva fecha y milisegundos; si igual ya existe (otra sesion
+        # en el mismo instante) se agrega un contador en vez de pisarlo.
+        now = time.time()
+        stem = time.strftime("session_%Y%m%d_%H%M%S", time.localtime(now))
+        stem += f"_{int(now * 1000) % 1000:03d}"
+        name = f"{stem}.json"
+        try:
+            for count in range(1, 1000):
+                try:
+                    self.recorder.save(REPLAYS_DIR / name, self.get_session_header(),
+                                       self.sim.get_result(), exclusive=True)
+                    break
+                except FileExistsError:
+                    name = f"{stem}_{count}.json"
+            else:
+                raise FileExistsError(f"ya existen {stem}_*.json")
+            LOGGER.info("replay", "Partida grabada en %s", name)
+        except OSError as e:
+            LOGGER.error("replay", "No se pudo guardar la grabacion %s: %s", name, e)
+
+    def start_replay(self, log: Dict) -> None:
+        # Reinicia la partida con la configuracion de un registro y empieza a
+        # aplicar sus acciones en los ticks grabados.
+        self.restart()
+        self.set_multipliers(dict(log["multipliers"]))
+        self.set_initial_money(log["money"])
+        self.replay = InputReplay(log)
+
+    def apply_replay_inputs(self) -> bool:
+        # Aplica las acciones grabadas hasta el tick actual. Devuelve False si
+        # la partida quedo en pausa.
+        for tick, action, *args in self.replay.pop_due(self.sim.tick):
+            if action == SELECT_TURRET:
+                self.select_turret_type(*args)
+            elif action == CLICK_TILE:
+                self.click_tile(*args)
+            elif action == UPGRADE:
+                self.upgrade_selected_turret()
+            elif action == START:
+                self.start_waves()
+            elif action == PAUSE:
+                self.set_paused(bool(args[0]))
+            elif action == FREE_TURRET:
+                self.place_free_turret()
+            elif action == FORCE_VICTORY:
+                self.force_victory()
+        return not self.paused
+
+    def run_replay(self, log: Dict) -> Dict:
+        # Repite un registro a maxima velocidad, sin dibujar. Corta al llegar
+        # al tick final grabado (la partida pudo abandonarse antes de terminar).
+        self.start_replay(log)
+        replay = self.replay
+        step = log.get("step", c.SIM_STEP)
+        while not self.sim.finished:
+            # Una pausa grabada que no se levanta en el mismo tick solo pudo
+            # terminar saliendo de la partida.
+            if not self.apply_replay_inputs():
+                break
+            if replay.done and self.sim.tick >= replay.end_tick:
+                break
+            self.sim.step(step)
+        self.replay = None
+        return self.sim.get_result()
 
     def set_multipliers(self, multipliers):
         # Aplica multiplicadores por mejoras de edificios.
-        self.multipliers = multipliers
+        self.sim.set_multipliers(multipliers)
         self.update_turret_button_captions()
 
     def set_initial_money(self, money):
-        self.money = money
-        self.start_money = money
+        self.sim.set_initial_money(money)
 
     def update(self, dt: float) -> None:
         # Actualiza la logica del juego (enemigos, torretas, oleadas).
@@ -441,123 +490,131 @@ class TowerDefence(State):
             btn.update()
         self.upgrade_button.update()
 
+        if self.replay is not None:
+            # Acciones grabadas en el tick actual (incluso en pausa).
+            self.apply_replay_inputs()
+            if self.replay.done and self.sim.tick >= self.replay.end_tick and not self.sim.finished:
+                # Fin de una partida abandonada: el menu de pausa permite salir.
+                self.paused = True
+
         if self.paused or self.game_over or self.wave_manager.victory:
             return
 
-        self.enemy_group.update(dt)
-        self.wave_manager.update(dt)
-
-        if self.wave_manager.victory and self.end_time == 0:
-            self.sound_manager.play_sound("victory")
-            self.end_time = pg.time.get_ticks()
-
-        if self.game_over and self.end_time == 0:
-            self.end_time = pg.time.get_ticks()
-
-        same_location = False
-        for turret in self.turret_group:
-            turret.update(self.enemy_group, dt)
+        if self.replay is not None:
+            self.render_alpha = self.sim.advance(dt, self.speed,
+                                                 before_step=self.apply_replay_inputs)
+        else:
+            self.render_alpha = self.sim.advance(dt, self.speed)
+        PROFILER.count("enemigos", len(self.sim.enemy_group))
+        PROFILER.count("torretas", len(self.sim.turret_group))
+        PROFILER.count("proyectiles", len(self.sim.projectiles))
 
+        for turret in self.sim.turret_group:
             if self.level.selected_tile is not None:
                 if (self.level.selected_tile[0] == turret.tile_x and
                     self.level.selected_tile[1] == turret.tile_y):
-                    same_location = True
                     turret.show_range = True
                 else:
                     turret.show_range = False
             else:
                 turret.show_range = False
 
-        for enemy in self.enemy_group:
-            if enemy.current_health <= 0:
-                self.money += enemy.reward
-                self.stats["enemies_killed"] += 1
-                self.stats["money_earned"] += enemy.reward
-                enemy.kill()
-
     def draw(self, surface: pg.Surface) -> None:
-        # Dibuja todos los elementos del juego.
-        self.level.draw(surface)
-
-        for turret in self.turret_group:
-            turret.draw(surface)
-
-        self.enemy_group.draw(surface)
-        for enemy in self.enemy_group:
-            enemy.health_bar.draw(surface)
-
-        surface.blit(self.sidebar_img, self.sidebar_rect)
-        self.level.draw_overlay(surface)
-
-        if self.mouse_posx < self.level.w:
-            tile_index = self.mouse_posy * self.level.w + self.mouse_posx
-            if self.level.tiles[tile_index] == 43:
-                self.highlight_hover_rect.topleft = (c.TILE_SIZE * self.mouse_posx,
-                                                      c.TILE_SIZE * self.mouse_posy)
-                surface.blit(self.highlight_hover, self.highlight_hover_rect)
-
-        # Tienda (arriba)
-        tienda_surf = self.font_big.render("Tienda", True, c.COLOUR_CREAM)
-        surface.blit(tienda_surf, (self.sidebar_rect.x + 125, 32))
-        # Mejoras (encima del boton de mejora)
-        mejoras_surf = self.font_big.render("Mejoras", True, c.COLOUR_CREAM)
-        surface.blit(mejoras_surf, (self.sidebar_rect.x + 118, 273))
-        # Estadisticas (encima de los datos de oleada)
-        estadisticas_surf = self.font_big.render("Estadisticas", True, c.COLOUR_CREAM)
-        surface.blit(estadisticas_surf, (self.sidebar_rect.x + 100, 512))
+        # Dibuja todos los elementos del juego. El fondo sale de la capa
+        # estatica; cada elemento dinamico registra su rectangulo en
+        # self.renderer y al final self.dirty_rects tiene las zonas que
+        # StateMachine.present pasa a pg.display.update.
+        renderer = self.renderer
+        overlay = self.paused or self.game_over or self.wave_manager.victory
+        if overlay:
+            # El oscurecedor cubre toda la pantalla.
+            renderer.invalidate()
+        renderer.begin(surface, self.get_static_layer(surface))
+
+        # Torretas y enemigos no se dibujan sobre la barra lateral.
+        PROFILER.begin("draw.world")
+        surface.set_clip(self.map_rect)
+        for turret in self.sim.turret_group:
+            renderer.mark(turret.draw(surface))
+
+        for rect in self.sim.enemy_group.draw(surface, self.render_alpha):
+            renderer.mark(rect)
+        for rect in self.sim.enemy_group.draw_health_bars(surface, self.render_alpha):
+            renderer.mark(rect)
+        for rect in self.sim.projectiles.draw(surface, self.render_alpha):
+            renderer.mark(rect)
+        surface.set_clip(None)
+        PROFILER.end("draw.world")
+
+        PROFILER.begin("draw.hud")
+        renderer.mark(self.level.draw_overlay(surface))
+
+        if self.level.is_buildable(self.mouse_posx, self.mouse_posy):
+            self.highlight_hover_rect.topleft = (c.TILE_SIZE * self.mouse_posx,
+                                                  c.TILE_SIZE * self.mouse_posy)
+            renderer.blit(surface, self.highlight_hover, self.highlight_hover_rect)
+            if self.selected_turret_type and not self.paused:
+                self.draw_coverage_hint(surface)
 
         if hasattr(self, 'wave_manager'):
             wm = self.wave_manager
-            wave_surf = self.font.render(f"Oleada: {wm.wave_number}", True, c.COLOUR_BLACK)
-            surface.blit(wave_surf, (self.sidebar_rect.x + 20, 560))
+            wave_surf = render_text(self.font, f"Oleada: {wm.wave_number}", c.COLOUR_BLACK)
+            renderer.blit(surface, wave_surf, (self.sidebar_rect.x + 20, 560))
 
             if not wm.started:
-                time_surf = self.font.render("Tiempo: 0:00", True, c.COLOUR_BLACK)
+                time_surf = render_text(self.font, "Tiempo: 0:00", c.COLOUR_BLACK)
             else:
-                remaining = max(0, 300 - wm.elapsed / 1000.0)
+                remaining = max(0, self.sim.game_duration - wm.elapsed / 1000.0)
                 minutes = int(remaining // 60)
                 seconds = int(remaining % 60)
-                time_surf = self.font.render(f"Tiempo: {minutes}:{seconds:02d}", True, c.COLOUR_BLACK)
-            surface.blit(time_surf, (self.sidebar_rect.x + 18, 582))
+                time_surf = render_text(self.font, f"Tiempo: {minutes}:{seconds:02d}", c.COLOUR_BLACK)
+            renderer.blit(surface, time_surf, (self.sidebar_rect.x + 18, 582))
+
+            health_surf = render_text(self.font, f"Base: {self.sim.base_health}", c.COLOUR_BLACK)
+            renderer.blit(surface, health_surf, (self.sidebar_rect.x + 20, 605))
 
-            health_surf = self.font.render(f"Base: {self.base_health}", True, c.COLOUR_BLACK)
-            surface.blit(health_surf, (self.sidebar_rect.x + 20, 605))
+            money_surf = render_text(self.font, f"Dinero: ${self.sim.money}", c.COLOUR_BLACK)
+            renderer.blit(surface, money_surf, (self.sidebar_rect.x + 20, 627))
 
-            money_surf = self.font.render(f"Dinero: ${self.money}", True, c.COLOUR_BLACK)
-            surface.blit(money_surf, (self.sidebar_rect.x + 20, 627))
+            speed_surf = render_text(self.font, f"Velocidad: x{self.speed} (F)", c.COLOUR_BLACK)
+            renderer.blit(surface, speed_surf, (self.sidebar_rect.x + 20, 649))
 
             if not wm.started and not self.game_over and not wm.victory:
                 msg = "Presiona SPACE para comenzar..."
-                msg_surf = self.font.render(msg, True, c.COLOUR_CREAM)
+                msg_surf = render_text(self.font, msg, c.COLOUR_CREAM)
                 msg_rect = msg_surf.get_rect(center=((c.WIN_WIDTH // 2) - 100, c.WIN_HEIGHT - 50))
-                surface.blit(msg_surf, msg_rect)
+                renderer.blit(surface, msg_surf, msg_rect)
 
         if not self.paused and not self.game_over and not self.wave_manager.victory:
             for btn in self.turret_buttons.values():
                 btn.draw(surface)
+                renderer.mark(btn.rect)
             self.upgrade_button.draw(surface)
+            renderer.mark(self.upgrade_button.rect)
 
             if self.selected_turret_type:
                 btn = self.turret_buttons[self.selected_turret_type]
-                pg.draw.rect(surface, c.COLOUR_GREEN, btn.rect, 3)
+                renderer.mark(pg.draw.rect(surface, c.COLOUR_GREEN, btn.rect, 3))
 
             if self.selected_turret:
                 turret = self.selected_turret
                 info_y = self.upgrade_button.rect.bottom + 5
-                lvl_surf = self.font.render(f"Nivel: {turret.level}", True, c.COLOUR_BLACK)
-                surface.blit(lvl_surf, (self.sidebar_rect.x + 20, info_y))
-                dmg_surf = self.font.render(f"Danio: {turret.damage}", True, c.COLOUR_BLACK)
-                surface.blit(dmg_surf, (self.sidebar_rect.x + 20, info_y + 22))
-                rng_surf = self.font.render(f"Rango: {turret.range}", True, c.COLOUR_BLACK)
-                surface.blit(rng_surf, (self.sidebar_rect.x + 20, info_y + 44))
-                cd_surf = self.font.render(f"CD: {turret.cooldown}ms", True, c.COLOUR_BLACK)
-                surface.blit(cd_surf, (self.sidebar_rect.x + 20, info_y + 66))
+                lvl_surf = render_text(self.font, f"Nivel: {turret.level}", c.COLOUR_BLACK)
+                renderer.blit(surface, lvl_surf, (self.sidebar_rect.x + 20, info_y))
+                dmg_surf = render_text(self.font, f"Danio: {turret.damage}", c.COLOUR_BLACK)
+                renderer.blit(surface, dmg_surf, (self.sidebar_rect.x + 20, info_y + 22))
+                rng_surf = render_text(self.font, f"Rango: {turret.range}", c.COLOUR_BLACK)
+                renderer.blit(surface, rng_surf, (self.sidebar_rect.x + 20, info_y + 44))
+                cd_surf = render_text(self.font, f"CD: {turret.cooldown}ms", c.COLOUR_BLACK)
+                renderer.blit(surface, cd_surf, (self.sidebar_rect.x + 20, info_y + 66))
                 cost = turret.get_upgrade_cost()
                 if cost:
-                    real_cost = int(cost * self.multipliers["upgrade_cost"])
-                    color = c.COLOUR_GREEN if self.money >= real_cost else c.COLOUR_RED
-                    cost_surf = self.font.render(f"Mejorar: ${real_cost}", True, color)
-                    surface.blit(cost_surf, (self.sidebar_rect.x + 20, info_y + 88))
+                    real_cost = int(cost * self.sim.multipliers["upgrade_cost"])
+                    color = c.COLOUR_GREEN if self.sim.money >= real_cost else c.COLOUR_RED
+                    cost_surf = render_text(self.font, f"Mejorar: ${real_cost}", color)
+                    renderer.blit(surface, cost_surf, (self.sidebar_rect.x + 20, info_y + 88))
+
+        PROFILER.end("draw.hud")
 
         if self.paused:
             self.draw_pause_overlay(surface)
@@ -566,14 +623,36 @@ class TowerDefence(State):
         elif self.wave_manager.victory:
             self.draw_victory_overlay(surface)
 
+        if overlay:
+            # Al cerrarse el overlay hay que recuperar toda la pantalla.
+            renderer.invalidate()
+        self.dirty_rects = renderer.end(surface)
+
+    def get_dirty_rects(self):
+        # Zonas del ultimo frame (la pantalla completa si se redibujo todo).
+        return self.dirty_rects
+
+    def draw_coverage_hint(self, surface: pg.Surface) -> None:
+        # Rango y porcentaje de ruta cubierto por la torreta elegida en la
+        # casilla bajo el mouse, leidos de la cobertura precalculada.
+        radius = TURRET_DATA[self.selected_turret_type][0]["range"]
+        center = self.highlight_hover_rect.center
+        range_img = get_range_image(radius)
+        fraction = self.level.coverage.get_fraction(self.mouse_posx, self.mouse_posy, radius)
+        hint_surf = render_text(self.font, f"Cobertura: {fraction:.0%}", c.COLOUR_BLACK)
+        hint_rect = hint_surf.get_rect(midbottom=(center[0], self.highlight_hover_rect.top))
+        hint_rect.clamp_ip(self.map_rect)
+        surface.set_clip(self.map_rect)
+        self.renderer.blit(surface, range_img, range_img.get_rect(center=center))
+        self.renderer.blit(surface, hint_surf, hint_rect)
+        surface.set_clip(None)
+
     def draw_pause_overlay(self, surface):
         # Dibuja la pantalla de pausa.
-        overlay = pg.Surface((c.WIN_WIDTH, c.WIN_HEIGHT), pg.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        surface.blit(overlay, (0, 0))
+        surface.blit(self.dim_overlay, (0, 0))
 
-        font_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 72)
-        text = font_big.render("PAUSA", True, c.COLOUR_CREAM)
+        font_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 72)
+        text = render_text(font_big, "PAUSA", c.COLOUR_CREAM)
         text_rect = text.get_rect(center=(c.WIN_WIDTH // 2, c.WIN_HEIGHT // 2 - 100))
         surface.blit(text, text_rect)
 
@@ -582,34 +661,27 @@ class TowerDefence(State):
 
     def draw_game_over_overlay(self, surface):
         # Dibuja la pantalla de game over con estadisticas.
-        overlay = pg.Surface((c.WIN_WIDTH, c.WIN_HEIGHT), pg.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        surface.blit(overlay, (0, 0))
+        surface.blit(self.dim_overlay, (0, 0))
 
-        font_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 72)
-        text = font_big.render("GAME OVER", True, c.COLOUR_RED)
+        font_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 72)
+        text = render_text(font_big, "GAME OVER", c.COLOUR_RED)
         text_rect = text.get_rect(center=(c.WIN_WIDTH // 2, c.WIN_HEIGHT // 2 - 130))
         surface.blit(text, text_rect)
 
-        if self.end_time > 0 and self.start_time > 0:
-            elapsed = (self.end_time - self.start_time) / 1000.0
-        else:
-            elapsed = 0
-
-        self.stats["time_played"] = elapsed
-        self.stats["waves_completed"] = self.wave_manager.wave_number
+        stats = self.sim.stats
+        elapsed = stats["time_played"]
 
-        font_small = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 28)
+        font_small = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 28)
         stats_lines = [
-            f"Oleadas completadas: {self.stats['waves_completed']}",
-            f"Enemigos eliminados: {self.stats['enemies_killed']}",
-            f"Dinero gastado: ${self.stats['money_spent']}",
-            f"Dinero ganado: ${self.stats['money_earned']}",
+            f"Oleadas completadas: {stats['waves_completed']}",
+            f"Enemigos eliminados: {stats['enemies_killed']}",
+            f"Dinero gastado: ${stats['money_spent']}",
+            f"Dinero ganado: ${stats['money_earned']}",
             f"Tiempo jugado: {int(elapsed//60)}:{int(elapsed%60):02d}"
         ]
         y_offset = c.WIN_HEIGHT // 2 - 60
         for line in stats_lines:
-            surf = font_small.render(line, True, c.COLOUR_CREAM)
+            surf = render_text(font_small, line, c.COLOUR_CREAM)
             rect = surf.get_rect(center=(c.WIN_WIDTH // 2, y_offset))
             surface.blit(surf, rect)
             y_offset += 30
@@ -621,39 +693,32 @@ class TowerDefence(State):
         # Actualiza los textos de los botones de torreta con los multiplicadores.
         for ttype, btn in self.turret_buttons.items():
             base_cost = self.turret_costs[ttype]
-            real_cost = int(base_cost * self.multipliers["purchase_cost"])
+            real_cost = int(base_cost * self.sim.multipliers["purchase_cost"])
             btn.set_caption(f"{self.turret_names[ttype]} (${real_cost})", self.font)
 
     def draw_victory_overlay(self, surface):
         # Dibuja la pantalla de victoria con estadisticas.
-        overlay = pg.Surface((c.WIN_WIDTH, c.WIN_HEIGHT), pg.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        surface.blit(overlay, (0, 0))
+        surface.blit(self.dim_overlay, (0, 0))
 
-        font_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 72)
-        text = font_big.render("VICTORIA!", True, c.COLOUR_GREEN)
+        font_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 72)
+        text = render_text(font_big, "VICTORIA!", c.COLOUR_GREEN)
         text_rect = text.get_rect(center=(c.WIN_WIDTH // 2, c.WIN_HEIGHT // 2 - 130))
         surface.blit(text, text_rect)
 
-        if self.end_time > 0 and self.start_time > 0:
-            elapsed = (self.end_time - self.start_time) / 1000.0
-        else:
-            elapsed = 0
-
-        self.stats["time_played"] = elapsed
-        self.stats["waves_completed"] = self.wave_manager.wave_number
+        stats = self.sim.stats
+        elapsed = stats["time_played"]
 
-        font_small = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 28)
+        font_small = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 28)
         stats_lines = [
-            f"Oleadas completadas: {self.stats['waves_completed']}",
-            f"Enemigos eliminados: {self.stats['enemies_killed']}",
-            f"Dinero gastado: ${self.stats['money_spent']}",
-            f"Dinero ganado: ${self.stats['money_earned']}",
+            f"Oleadas completadas: {stats['waves_completed']}",
+            f"Enemigos eliminados: {stats['enemies_killed']}",
+            f"Dinero gastado: ${stats['money_spent']}",
+            f"Dinero ganado: ${stats['money_earned']}",
             f"Tiempo jugado: {int(elapsed//60)}:{int(elapsed%60):02d}"
         ]
         y_offset = c.WIN_HEIGHT // 2 - 60
         for line in stats_lines:
-            surf = font_small.render(line, True, c.COLOUR_CREAM)
+            surf = render_text(font_small, line, c.COLOUR_CREAM)
             rect = surf.get_rect(center=(c.WIN_WIDTH // 2, y_offset))
             surface.blit(surf, rect)
             y_offset += 30
@@ -663,12 +728,21 @@ class TowerDefence(State):
 
     def optimize_images(self):
         # Optimiza las imagenes para mejorar el rendimiento.
-        self.level.image = self.level.image.convert()
-        self.level.select_tile_img = self.level.select_tile_img.convert_alpha()
-        self.enemy1_img = self.enemy1_img.convert_alpha()
-        self.enemy2_img = self.enemy2_img.convert_alpha()
-        self.enemy3_img = self.enemy3_img.convert_alpha()
-        self.sidebar_img = self.sidebar_img.convert()
-
-        for turret in self.turret_images:
-            self.turret_images[turret].convert_alpha()
\ No newline at end of file
+        # ASSETS convierte cada imagen una sola vez; aqui solo se vuelven a
+        # pedir por si el estado se creo antes que la ventana.
+        self.load_images()
+        self.level.image = LEVEL_REGISTRY.convert(self.level_name)
+        self.level.select_tile_img = self.select_img
+        self.dim_overlay = self.dim_overlay.convert_alpha()
+        # La capa estatica se vuelve a componer con las imagenes convertidas.
+        self.static_layer = None
+
+        # Los enemigos deben usar las texturas convertidas. Se actualiza el
+        # mismo diccionario que comparten la simulacion y el WaveManager.
+        self.enemy_types.update(self.build_enemy_types())
+
+        # Precalcular las rotaciones de cada tipo de enemigo y de torreta.
+        for image in (self.enemy1_img, self.enemy2_img, self.enemy3_img):
+            ROTATION_CACHE.warm(image)
+        for image in self.turret_images.values():
+            ROTATION_CACHE.warm(image)
\ No newline at end of file
@@ -9,9 +9,23 @@ from pygame.locals import *
 # Modulos custom.
 from classes.state_machine import State, StateMachine
 from classes.gui import Button
+from classes.text_cache import get_font, render_text
+from classes.logger import LOGGER
+from classes.level_registry import LEVEL_REGISTRY
+from classes.asset_manager import ASSETS
+from gamestates.tower_defence.tower_defence import TowerDefence, get_tower_defence_assets
 from utils import constants as c
 from config import TOWN_DIR, FONTS_DIR, SAVE_DIR
 
+# Imagenes del pueblo: nombre -> (ruta, alpha).
+TOWN_IMAGES = {
+    "background": (TOWN_DIR / "town_background.png", False),
+    "sidebar": (TOWN_DIR / "sidebar.png", True),
+    "wheat_field": (TOWN_DIR / "wheat_field.png", True),
+    "smithing_house": (TOWN_DIR / "smithing_house.png", True),
+    "shooting_range": (TOWN_DIR / "shooting_range.png", True)
+}
+
 class Town(State):
     # Estado del pueblo, donde se gestionan edificios y el pomodoro.
     def __init__(self, parent_state_machine, save_data=None, save_slot=None, sound_manager=None) -> None:
@@ -31,14 +45,7 @@ class Town(State):
         self.pomodoro_elapsed = 0.0
 
         # Cargar imagenes del pueblo.
-        self.background = pg.image.load(str(TOWN_DIR / "town_background.png"))
-        self.sidebar_img = pg.image.load(str(TOWN_DIR / "sidebar.png"))
-
-        self.building_images = {
-            "wheat_field": pg.image.load(str(TOWN_DIR / "wheat_field.png")),
-            "smithing_house": pg.image.load(str(TOWN_DIR / "smithing_house.png")),
-            "shooting_range": pg.image.load(str(TOWN_DIR / "shooting_range.png"))
-        }
+        self.optimize_images()
 
         self.building_positions = {
             "wheat_field": (12.2, 9),
@@ -56,8 +63,8 @@ class Town(State):
         self.sidebar_rect = self.sidebar_img.get_rect()
         self.sidebar_rect.topleft = (self.grid_width * self.tile_size, 0)
 
-        self.font = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 20)
-        self.font_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 27)
+        self.font = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 20)
+        self.font_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 27)
 
         # Recursos iniciales.
         if save_data is None:
@@ -73,6 +80,13 @@ class Town(State):
             self.time_units = save_data.get("time_units", 0)
             self.buildings = save_data.get("buildings", {})
 
+        # Nivel de defensa elegido (se carga recien al empezar la defensa).
+        self.level_name = (save_data or {}).get("level")
+        if self.level_name not in LEVEL_REGISTRY:
+            self.level_name = LEVEL_REGISTRY.get_default()
+        # La defensa es el proximo estado: sus imagenes se decodifican ya.
+        ASSETS.preload(get_tower_defence_assets(self.level_name))
+
         self.pomodoro_duration = 25 * 60
 
         self.selected_building = None
@@ -108,6 +122,10 @@ class Town(State):
         center_x = c.WIN_WIDTH // 2
         center_y = c.WIN_HEIGHT // 2
 
+        # Oscurecedor del pomodoro, creado una sola vez.
+        self.dim_overlay = pg.Surface((c.WIN_WIDTH, c.WIN_HEIGHT), pg.SRCALPHA)
+        self.dim_overlay.fill((0, 0, 0, 180))
+
         self.pomodoro_pause_btn = Button(
             center_x - overlay_btn_w - 10, center_y + 50, overlay_btn_w, overlay_btn_h,
             c.COLOUR_BROWN, c.COLOUR_CREAM, c.COLOUR_DARK_BROWN,
@@ -163,7 +181,7 @@ class Town(State):
         self.pomodoro_elapsed = 0.0
         self.pomodoro_remaining = 0
         self.pomodoro_btn.set_caption("Iniciar Pomodoro", self.font)
-        print("!Pomodoro completado! +1 unidad de tiempo")
+        LOGGER.info("town", "!Pomodoro completado! +1 unidad de tiempo")
         self.save_current_state()
 
     def handle_events(self, events: List[pg.event.Event]) -> None:
@@ -223,12 +241,36 @@ class Town(State):
     def start_defense(self):
         # Cambia al modo defensa aplicando los multiplicadores de los edificios.
         multipliers = self.get_upgrade_multipliers()
-        td = self.parent_state_machine.states["tower_defence"]
+        td = self.get_tower_defence()
         td.set_multipliers(multipliers)
         td.set_initial_money(200)
 
         self.parent_state_machine.current_state = "tower_defence"
 
+    def optimize_images(self) -> None:
+        # Toma las imagenes del pueblo de ASSETS. Se vuelve a llamar al
+        # crear la ventana, para usar las convertidas.
+        self.background = ASSETS.get_image(*TOWN_IMAGES["background"])
+        self.sidebar_img = ASSETS.get_image(*TOWN_IMAGES["sidebar"])
+
+        self.building_images = {
+            "wheat_field": ASSETS.get_image(*TOWN_IMAGES["wheat_field"]),
+            "smithing_house": ASSETS.get_image(*TOWN_IMAGES["smithing_house"]),
+            "shooting_range": ASSETS.get_image(*TOWN_IMAGES["shooting_range"])
+        }
+
+    def get_tower_defence(self) -> TowerDefence:
+        # Estado de defensa con el nivel elegido. Se crea la primera vez que
+        # se juega (no al iniciar el juego) y cambia de nivel si hace falta.
+        td = self.parent_state_machine.states.get("tower_defence")
+        if td is None:
+            td = TowerDefence(self.parent_state_machine, self.level_name, self.sound_manager)
+            td.optimize_images()
+            self.parent_state_machine.add_state("tower_defence", td)
+        elif td.level_name != self.level_name:
+            td.load_level(self.level_name)
+        return td
+
     def upgrade_selected_building(self):
         # Mejora el edificio seleccionado si se tienen recursos suficientes.
         if self.selected_building is None:
@@ -242,7 +284,7 @@ class Town(State):
             building["level"] += 1
             building["cost_gold"] = int(building["cost_gold"] * 1.5)
             building["cost_time"] += 1
-            print(f"{self.selected_building} mejorado a nivel {building['level']}")
+            LOGGER.info("town", "%s mejorado a nivel %s", self.selected_building, building['level'])
             self.save_current_state()
 
     def update(self, dt: float) -> None:
@@ -266,20 +308,18 @@ class Town(State):
         if reward != 0:
             self.money += reward
             self.parent_state_machine.shared_data['defense_reward'] = 0
-            print(f"!Recibiste {reward} oro de la defensa!")
+            LOGGER.info("town", "!Recibiste %s oro de la defensa!", reward)
             self.save_current_state()
 
     def draw_pomodoro_overlay(self, surface):
         # Dibuja la superposicion del pomodoro cuando esta activo.
-        overlay = pg.Surface((c.WIN_WIDTH, c.WIN_HEIGHT), pg.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        surface.blit(overlay, (0, 0))
+        surface.blit(self.dim_overlay, (0, 0))
 
         minutes = int(self.pomodoro_remaining // 60)
         seconds = int(self.pomodoro_remaining % 60)
         time_str = f"{minutes:02d}:{seconds:02d}"
-        font_big = pg.font.Font(str(FONTS_DIR / "PirataOne-Regular.ttf"), 72)
-        time_surf = font_big.render(time_str, True, c.COLOUR_CREAM)
+        font_big = get_font(FONTS_DIR / "PirataOne-Regular.ttf", 72)
+        time_surf = render_text(font_big, time_str, c.COLOUR_CREAM)
         time_rect = time_surf.get_rect(center=(c.WIN_WIDTH // 2, c.WIN_HEIGHT // 2 - 50))
         surface.blit(time_surf, time_rect)
 
@@ -296,7 +336,7 @@ class Town(State):
             surface.blit(img, rect)
 
             level = self.buildings[name]["level"]
-            level_text = self.font.render(str(level), True, c.COLOUR_WHITE)
+            level_text = render_text(self.font, str(level), c.COLOUR_WHITE)
             level_rect = level_text.get_rect(center=rect.center)
             surface.blit(level_text, level_rect)
 
@@ -308,15 +348,15 @@ class Town(State):
 
         surface.blit(self.sidebar_img, self.sidebar_rect)
 
-        stats_label = self.font_big.render("Estadisticas", True, c.COLOUR_CREAM)
+        stats_label = render_text(self.font_big, "Estadisticas", c.COLOUR_CREAM)
         surface.blit(stats_label, (self.sidebar_rect.x + 103, 32))
 
-        money_text = self.font.render(f"Oro: {self.money}", True, c.COLOUR_BLACK)
+        money_text = render_text(self.font, f"Oro: {self.money}", c.COLOUR_BLACK)
         surface.blit(money_text, (self.sidebar_rect.x + 20, 80))
-        time_text = self.font.render(f"Tiempo: {self.time_units}", True, c.COLOUR_BLACK)
+        time_text = render_text(self.font, f"Tiempo: {self.time_units}", c.COLOUR_BLACK)
         surface.blit(time_text, (self.sidebar_rect.x + 20, 100))
 
-        buildings_label = self.font_big.render("Edificios", True, c.COLOUR_CREAM)
+        buildings_label = render_text(self.font_big, "Edificios", c.COLOUR_CREAM)
         surface.blit(buildings_label, (self.sidebar_rect.x + 118, self.info_y_start - 52))
 
         if self.selected_building:
@@ -327,10 +367,10 @@ class Town(State):
                 "shooting_range": "Campo de Tiro"
             }
             name_str = building_names.get(self.selected_building, self.selected_building)
-            name_surf = self.font.render(name_str, True, c.COLOUR_BLACK)
+            name_surf = render_text(self.font, name_str, c.COLOUR_BLACK)
             surface.blit(name_surf, (self.sidebar_rect.x + 20, self.info_y_start))
 
-            level_surf = self.font.render(f"Nivel: {b['level']}", True, c.COLOUR_BLACK)
+            level_surf = render_text(self.font, f"Nivel: {b['level']}", c.COLOUR_BLACK)
             surface.blit(level_surf, (self.sidebar_rect.x + 20, self.info_y_start + 25))
 
             effects = {
@@ -338,10 +378,10 @@ class Town(State):
                 "smithing_house": "Reduce costo de mejora de torretas",
                 "shooting_range": "Aumenta cadencia y danio de torretas"
             }
-            effect_surf = self.font.render(effects[self.selected_building], True, c.COLOUR_BLACK)
+            effect_surf = render_text(self.font, effects[self.selected_building], c.COLOUR_BLACK)
             surface.blit(effect_surf, (self.sidebar_rect.x + 20, self.info_y_start + 50))
 
-            cost_surf = self.font.render(f"Costo: ${b['cost_gold']} + {b['cost_time']}t", True, c.COLOUR_BLACK)
+            cost_surf = render_text(self.font, f"Costo: ${b['cost_gold']} + {b['cost_time']}t", c.COLOUR_BLACK)
             surface.blit(cost_surf, (self.sidebar_rect.x + 20, self.info_y_start + 75))
 
             effect_x = self.upgrade_btn.rect.right + 10
@@ -353,15 +393,15 @@ class Town(State):
                 effect_text = f"{-b['level'] + 1 * 5}% costo mejora"
             elif self.selected_building == "shooting_range":
                 effect_text = f"CD {-b['level'] + 1 * 3}% | Danio +{b['level']*2}%"
-            effect_surf = self.font.render(effect_text, True, c.COLOUR_BLACK)
+            effect_surf = render_text(self.font, effect_text, c.COLOUR_BLACK)
             surface.blit(effect_surf, (self.sidebar_rect.x + 160, self.info_y_start + 110))
 
             self.upgrade_btn.draw(surface)
         else:
-            msg_surf = self.font.render("Selecciona un edificio...", True, c.COLOUR_BLACK)
+            msg_surf = render_text(self.font, "Selecciona un edificio...", c.COLOUR_BLACK)
             surface.blit(msg_surf, (self.sidebar_rect.x + 20, self.info_y_start))
 
-        phase_label = self.font_big.render("Seleccion de fase", True, c.COLOUR_CREAM)
+        phase_label = render_text(self.font_big, "Seleccion de fase", c.COLOUR_CREAM)
         surface.blit(phase_label, (self.sidebar_rect.x + 77, 512))
 
         self.pomodoro_btn.draw(surface)
@@ -375,7 +415,8 @@ class Town(State):
         return {
             "money": self.money,
             "time_units": self.time_units,
-            "buildings": self.buildings
+            "buildings": self.buildings,
+            "level": self.level_name
         }
 
     def get_upgrade_multipliers(self):
@@ -0,0 +1,69 @@
+# Sugiere disposiciones de torretas para un nivel y un presupuesto. Las
+# candidatas salen de un modelo analitico de cobertura de la ruta y se
+# verifican con partidas sin ventana en paralelo (ver PlacementOptimizer).
+#
+# Uso:
+#   python optimize.py --budget 600 --count 5 --output layouts.json
+#   python optimize.py --budget 600 --no-sim   # solo el modelo analitico
+#
+# Cada disposicion se puede pasar a simulate.py --layout o a balance.py.
+
+# Modulos de python.
+import os
+import sys
+import json
+import argparse
+import time
+
+# Sin video ni audio: se configura antes de importar pygame.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Modulos custom.
+from utils import constants as c
+from classes.level import Level, load_level_data
+from classes.placement_optimizer import PlacementOptimizer
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Optimizador de torretas de Pomodoro TD.")
+    parser.add_argument("--level", default="level1")
+    parser.add_argument("--budget", type=int, default=200, help="Dinero disponible.")
+    parser.add_argument("--count", type=int, default=5, help="Disposiciones a devolver.")
+    parser.add_argument("--candidates", type=int, default=16,
+                        help="Candidatas del modelo analitico a simular.")
+    parser.add_argument("--beam-width", type=int, default=32)
+    parser.add_argument("--no-sim", action="store_true",
+                        help="Ordenar solo con el modelo analitico.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos del pool (por defecto uno por nucleo).")
+    parser.add_argument("--duration", type=int, default=300, help="Duracion de la partida (s).")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    level = Level(None, load_level_data(args.level), None)
+    optimizer = PlacementOptimizer(level, args.budget)
+    candidates = optimizer.search(args.count if args.no_sim else max(args.count, args.candidates),
+                                  args.beam_width)
+    t_search = time.perf_counter() - t0
+    if not args.no_sim and candidates:
+        candidates = optimizer.evaluate(candidates, workers=args.workers,
+                                        duration=args.duration)
+
+    report = {
+        "config": {"level": args.level, "budget": args.budget,
+                   "options": len(optimizer.options)},
+        "search_time": t_search,
+        "wall_time": time.perf_counter() - t0,
+        "layouts": candidates[:args.count]
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+
+if __name__ == "__main__":
+    main()
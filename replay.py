@@ -0,0 +1,123 @@
+# Repite una partida de defensa de torres grabada por TowerDefence (ver
+# c.RECORD_INPUTS y la carpeta replays/). Las acciones del jugador se aplican
+# en los mismos ticks de simulacion, asi que la partida se reproduce igual y
+# sirve como prueba repetible de rendimiento y de resultados.
+#
+# Uso:
+#   python replay.py replays/session_20261018_120000.json
+#   python replay.py replays/session_20261018_120000.json --realtime --speed 2
+#
+# Sin --realtime se corre a maxima velocidad sin dibujar, se reporta el tiempo
+# y se compara el resultado con el grabado (codigo 1 si no coincide).
+
+# Modulos de python.
+import os
+import sys
+import json
+import argparse
+import time
+
+if "--realtime" not in sys.argv:
+    # Sin video ni audio: se configura antes de importar pygame.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Modulos de pygame.
+import pygame as pg
+
+# Modulos custom.
+from utils import constants as c
+from classes.state_machine import StateMachine
+from classes.input_recorder import load_replay
+from classes.profiler import PROFILER
+from gamestates.tower_defence.tower_defence import TowerDefence
+
+def run_fast(log: dict, profile: bool) -> dict:
+    # Repite el registro sin ventana ni audio, tan rapido como permita el CPU.
+    td = TowerDefence(StateMachine(), log["level"], None)
+    if profile:
+        PROFILER.samples = 100000
+        PROFILER.reset()
+        PROFILER.enabled = True
+    t0 = time.perf_counter()
+    result = td.run_replay(log)
+    wall = time.perf_counter() - t0
+    report = {"result": result, "wall_time": wall,
+              "ticks_per_second": result["ticks"] / max(wall, 1e-9)}
+    if profile:
+        PROFILER.enabled = False
+        report["profile"] = PROFILER.get_report()
+    return report
+
+def run_realtime(log: dict, speed: int) -> dict:
+    # Repite el registro en una ventana, al ritmo del reloj real.
+    from classes.sound_manager import SoundManager
+    from config import SOUNDS_DIR
+    screen = pg.display.set_mode((c.WIN_WIDTH, c.WIN_HEIGHT))
+    sound_manager = SoundManager()
+    for name in ("click", "purchase", "upgrade", "enemy_escape", "bow_shot", "mortar_shell",
+                 "mortar_explosion", "game_over", "victory"):
+        sound_manager.load_sound(name, str(SOUNDS_DIR / f"{name}.wav"))
+
+    state_machine = StateMachine()
+    td = TowerDefence(state_machine, log["level"], sound_manager)
+    td.optimize_images()
+    state_machine.add_state("tower_defence", td)
+    state_machine.set_starting_state("tower_defence")
+    td.start_replay(log)
+    td.speed = speed
+
+    clock = pg.time.Clock()
+    # "Regresar" en el menu de pausa o de fin de partida cierra la repeticion.
+    while state_machine.current_state == "tower_defence":
+        events = pg.event.get()
+        if any(event.type == pg.QUIT for event in events):
+            break
+        state_machine.handle_events(events)
+        state_machine.update(clock.tick(60) / 1000.0)
+        if state_machine.current_state != "tower_defence":
+            break
+        state_machine.draw(screen)
+        state_machine.present()
+    return {"result": td.sim.get_result()}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Repeticion de partidas grabadas de Pomodoro TD.")
+    parser.add_argument("replay", help="Archivo JSON grabado por TowerDefence.")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Repetir en una ventana al ritmo del reloj real.")
+    parser.add_argument("--speed", type=int, default=1, choices=c.FAST_FORWARD_SPEEDS,
+                        help="Velocidad inicial de la repeticion en ventana.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Agregar los tiempos por fase de la simulacion.")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados.")
+    args = parser.parse_args()
+
+    log = load_replay(args.replay)
+    pg.init()
+    if args.realtime:
+        report = run_realtime(log, args.speed)
+    else:
+        report = run_fast(log, args.profile)
+    pg.quit()
+
+    # La repeticion debe terminar igual que la partida grabada.
+    exit_code = 0
+    recorded = log.get("result")
+    if recorded is not None and not args.realtime:
+        report["matches_recording"] = report["result"] == recorded
+        if not report["matches_recording"]:
+            report["recorded"] = recorded
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
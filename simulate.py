@@ -0,0 +1,73 @@
+# Ejecuta partidas de defensa de torres sin ventana ni audio, tan rapido como
+# permita el CPU. Pensado para pruebas de balance y regresion.
+#
+# Uso:
+#   python simulate.py --layout layout.json --matches 10 --output result.json
+#
+# layout.json es una lista de torretas:
+#   [{"type": "shortbow", "tile": [3, 2]}, {"type": "mortar", "tile": [9, 8], "level": 2}]
+
+# Modulos de python.
+import os
+import sys
+import json
+import argparse
+import time
+
+# Sin video ni audio: se configura antes de importar pygame.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Modulos custom.
+from utils import constants as c
+from classes.simulation import create_headless_simulation
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulacion sin video de Pomodoro TD.")
+    parser.add_argument("--level", default="level1")
+    parser.add_argument("--layout", default=None, help="Archivo JSON con las torretas.")
+    parser.add_argument("--matches", type=int, default=1)
+    parser.add_argument("--dt", type=float, default=c.SIM_STEP, help="Paso de simulacion (s).")
+    parser.add_argument("--duration", type=int, default=300, help="Duracion de la partida (s).")
+    parser.add_argument("--money", type=int, default=200)
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados.")
+    parser.add_argument("--enemy-store", action="store_true",
+                        help="Guardar enemigos en arreglos de NumPy.")
+    parser.add_argument("--memory", action="store_true",
+                        help="Agregar la memoria de las entidades al terminar.")
+    args = parser.parse_args()
+
+    layout = []
+    if args.layout:
+        with open(args.layout, 'r') as file:
+            layout = json.load(file)
+
+    results = []
+    t0 = time.perf_counter()
+    # El registro (LOGGER) escribe en stderr, separado del reporte.
+    for _ in range(args.matches):
+        sim = create_headless_simulation(args.level, layout,
+                                         game_duration=args.duration,
+                                         start_money=args.money,
+                                         use_enemy_store=args.enemy_store)
+        result = sim.run(args.dt)
+        pool = getattr(sim.enemy_group, "pool", None)
+        if pool is not None:
+            # Aciertos y fallos de la reserva de enemigos.
+            result["pool"] = pool.get_stats()
+        if args.memory:
+            result["memory"] = sim.get_memory_report()
+        results.append(result)
+    wall = time.perf_counter() - t0
+
+    report = {"matches": results, "wall_time": wall}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,58 @@ WIN_HEIGHT = 720
 
 # Tamano de casillas del nivel.
 TILE_SIZE = 48
+BUILDABLE_TILE = 43 # id de las casillas de construccion en la capa Tilemap
+
+# Pasos de rotacion de la cache de sprites (360 / 64 = 5.625 grados).
+ROTATION_STEPS = 64
+
+# Maximo de textos renderizados que se guardan en cache.
+TEXT_CACHE_SIZE = 256
+
+# Guardar enemigos en arreglos de NumPy en lugar de un sprite por enemigo.
+USE_ENEMY_STORE = False
+
+# Paso fijo de la simulacion (segundos) y maximo de tiempo real que se
+# simula por frame, para no acumular atraso tras un tiron.
+SIM_STEP = 1 / 60
+MAX_FRAME_TIME = 0.25
+
+# Velocidades de avance rapido que puede elegir el jugador.
+FAST_FORWARD_SPEEDS = (1, 2, 4, 8)
+
+# Maximo de enemigos libres por tipo que guarda la reserva de EnemyGroup.
+ENEMY_POOL_SIZE = 64
+
+# Maximo de proyectiles en vuelo; los disparos de mas impactan al instante.
+PROJECTILE_CAPACITY = 512
+
+# Registro: nivel minimo ("DEBUG", "INFO", "WARNING", "ERROR" u "OFF"),
+# registros guardados en memoria y segundos entre escrituras.
+LOG_LEVEL = "INFO"
+LOG_BUFFER_SIZE = 1024
+LOG_FLUSH_INTERVAL = 0.5
+
+# Profiler de frames (F3): muestras por fase y ms entre refrescos del overlay.
+PROFILER_SAMPLES = 240
+PROFILER_REFRESH = 500
+
+# Omitir las barras de vida de enemigos sin danio.
+HIDE_FULL_HEALTH_BARS = False
+
+# Redibujar solo las zonas que cambian sobre una capa estatica pre-compuesta.
+# Solo replay.py presenta esas zonas con pg.display.update (StateMachine.present);
+# en el juego la ventana la presenta completa el bucle de GameBase (enfocate).
+DIRTY_RECT_RENDERING = False
+
+# Cargar los niveles compilados (cache/levels) en lugar de parsear el .tmj.
+LEVEL_CACHE = True
+
+# Niveles: el inicial y cuantos bytes de niveles cargados se conservan (LRU).
+DEFAULT_LEVEL = "level1"
+LEVEL_MEMORY_BUDGET = 32 * 1024 * 1024
+
+# Grabar las acciones de cada partida de defensa en REPLAYS_DIR (ver replay.py).
+RECORD_INPUTS = True
 
 # Colores.
 COLOUR_GREEN = (153, 225, 116)